@@ -1,15 +1,19 @@
-import json
 import os
-import random
+import atexit
 from agent import PokerAgent  # 구조에 따라 알맞게 임포트 유지
+from storage import open_store
+from state_abstraction import StateAbstraction, legacy_key_to_state
 
 class LearningAgent(PokerAgent):
     # --- [핵심] 클래스 변수로 선언하여 모든 LearningAgent가 하나를 공유합니다 ---
     shared_memory = None
-    db_filename = "LearningAgent_Shared_db.json"
+    db_filename = "LearningAgent_Shared_db.sqlite" # .qtab 으로 바꾸면 메모리 맵 기반 조밀 Q 테이블 모드
+    db_readonly = False # True 면 저장소를 읽기 전용으로 엽니다 (여러 시뮬레이션 프로세스가 같은 .qtab 공유)
+    legacy_db_filename = "LearningAgent_Shared_db.json" # 첫 실행 때 SQLite 로 자동 마이그레이션
+    abstraction = StateAbstraction() # 상태 -> 버전이 붙은 5바이트 키 (state_abstraction.py)
 
-    def __init__(self, name):
-        super().__init__(name)
+    def __init__(self, name, verbose=True, seed=None):
+        super().__init__(name, verbose, seed)
         
         # 최초의 LearningAgent가 생성될 때 딱 한 번만 DB를 읽어옵니다.
         if LearningAgent.shared_memory is None:
@@ -17,24 +21,45 @@ class LearningAgent(PokerAgent):
         
         # 내 개인 메모리 변수가 중앙 공유 메모리를 바라보게 연결합니다.
         self.memory = LearningAgent.shared_memory
+        self.decisions = [] # 이번 판에 내린 (상태 키, 액션) 목록. 판이 끝나면 손익으로 학습합니다.
 
     def _load_db(self):
-        """단일 공유 DB 파일을 불러옵니다."""
-        if os.path.exists(self.db_filename):
-            with open(self.db_filename, 'r', encoding='utf-8') as f:
+        """공유 저장소를 엽니다. 항목은 필요할 때 하나씩 읽어 옵니다 (storage.py)."""
+        existed = os.path.exists(self.db_filename) or os.path.exists(self.legacy_db_filename)
+        store = open_store(self.db_filename, self.legacy_db_filename, self._legacy_key_to_key,
+                           num_states=self.abstraction.num_states,
+                           abstraction_version=self.abstraction.version, readonly=self.db_readonly)
+        if not self.db_readonly:
+            atexit.register(store.close) # 판 도중 종료되어도 남은 변경분을 기록
+        if self.verbose:
+            if existed:
                 print(f"[시스템] 중앙 공유 학습 데이터베이스를 성공적으로 불러왔습니다.")
-                return json.load(f)
-        else:
-            print(f"[시스템] 새로운 중앙 공유 학습 데이터베이스를 생성합니다.")
-            return {}
+            else:
+                print(f"[시스템] 새로운 중앙 공유 학습 데이터베이스를 생성합니다.")
+        return store
 
     def _save_db(self):
-        """공유 메모리 상태를 단일 파일에 저장합니다."""
-        with open(self.db_filename, 'w', encoding='utf-8') as f:
-            json.dump(LearningAgent.shared_memory, f, ensure_ascii=False, indent=4)
+        """이번 판에 바뀐 항목만 한 트랜잭션으로 기록합니다."""
+        if not self.db_readonly:
+            self.memory.commit()
+
+    def end_hand(self, reward=None):
+        """
+        PokerGame.play_hand 가 판이 끝날 때 이번 판 손익(reward)과 함께 호출합니다.
+        이번 판의 모든 결정에 같은 보상을 update_memory 방식으로 더한 뒤 DB 에 기록합니다.
+        """
+        if reward is not None:
+            for state_key, action in self.decisions:
+                self.memory.record(state_key, action, reward)
+        self.decisions.clear()
+        self._save_db()
 
     def _state_to_key(self, state):
-        return json.dumps(state, sort_keys=True)
+        return self.abstraction.key(state)
+
+    def _legacy_key_to_key(self, legacy_key):
+        """예전 JSON 문자열 키를 현재 추상화 키로 바꿉니다 (마이그레이션용)."""
+        return self._state_to_key(legacy_key_to_state(legacy_key))
 
     def choose_action(self, state, valid_actions):
         if not valid_actions:
@@ -42,39 +67,38 @@ class LearningAgent(PokerAgent):
             
         state_key = self._state_to_key(state)
         
-        # 공유 메모리에 처음 보는 상태라면 0점으로 초기화
-        if state_key not in self.memory:
-            self.memory[state_key] = {action: 0 for action in valid_actions}
-            self._save_db()
+        # 공유 메모리에 처음 보는 상태라면 0점으로 초기화 (기록은 판이 끝날 때 한 번에)
+        action_scores = self.memory.get(state_key)
+        if action_scores is None:
+            action_scores = {action: 0 for action in valid_actions}
+            self.memory.put(state_key, action_scores)
 
         exploration_rate = 0.3 
         
-        if random.random() < exploration_rate:
-            chosen_action = random.choice(valid_actions)
-            print(f"[{self.name}] [탐험] 새로운 시도: '{chosen_action}'")
+        if self.rng.random() < exploration_rate:
+            chosen_action = self.rng.choice(valid_actions)
+            if self.verbose:
+                print(f"[{self.name}] [탐험] 새로운 시도: '{chosen_action}'")
         else:
-            action_scores = self.memory[state_key]
             valid_scores = {a: action_scores.get(a, 0) for a in valid_actions}
             
             max_score = max(valid_scores.values())
             best_actions = [a for a, score in valid_scores.items() if score == max_score]
-            chosen_action = random.choice(best_actions)
+            chosen_action = self.rng.choice(best_actions)
             
-            print(f"[{self.name}] [활용] 과거 경험(최고점: {max_score}) 기반: '{chosen_action}'")
+            if self.verbose:
+                print(f"[{self.name}] [활용] 과거 경험(최고점: {max_score}) 기반: '{chosen_action}'")
 
+        self.decisions.append((state_key, chosen_action))
         return chosen_action
 
     def update_memory(self, state, action, reward):
         """
         행동에 대한 결과(보상)를 중앙 공유 DB에 업데이트합니다.
+        디스크 기록은 end_hand(_save_db) 때 다른 변경분과 함께 한 트랜잭션으로 이뤄집니다.
         """
         state_key = self._state_to_key(state)
         
-        if state_key not in self.memory:
-            self.memory[state_key] = {}
-        if action not in self.memory[state_key]:
-            self.memory[state_key][action] = 0
-            
-        self.memory[state_key][action] += reward
-        self._save_db()
-        print(f"[{self.name}] 경험치 공유 완료: {action} 액션으로 {reward} 보상 획득")
+        self.memory.record(state_key, action, reward)
+        if self.verbose:
+            print(f"[{self.name}] 경험치 공유 완료: {action} 액션으로 {reward} 보상 획득")
@@ -1,8 +1,11 @@
 import random
 
 class PokerAgent:
-    def __init__(self, name):
+    def __init__(self, name, verbose=True, seed=None):
         self.name = name
+        self.verbose = verbose # False 면 선택 과정을 출력하지 않음 (대량 시뮬레이션용)
+        # 에이전트 전용 난수 생성기. seed 가 없으면 전역 random 에서 뽑으므로 random.seed 로도 재현됩니다.
+        self.rng = random.Random(seed if seed is not None else random.getrandbits(64))
 
     def choose_action(self, state, valid_actions):
         """
@@ -17,9 +20,10 @@ class PokerAgent:
             
         # [TODO] 여기에 딥러닝 모델의 예측 로직이나 확률 기반 룰을 추가하게 됩니다.
         # 현재는 주어진 가능한 액션 중 무작위로 하나를 선택하도록 기초 뼈대를 잡았습니다.
-        chosen_action = random.choice(valid_actions)
+        chosen_action = self.rng.choice(valid_actions)
         
-        print(f"[{self.name}] 에이전트가 고민 끝에 '{chosen_action}' 액션을 선택했습니다!")
+        if self.verbose:
+            print(f"[{self.name}] 에이전트가 고민 끝에 '{chosen_action}' 액션을 선택했습니다!")
         return chosen_action
 
     def choose_discard_and_reveal(self, hidden_cards):
@@ -0,0 +1,145 @@
+import numpy as np
+
+import hand_evaluator
+from hand_evaluator import HIGH_CARD, ONE_PAIR, TWO_PAIR, TRIPS, STRAIGHT, FULL_HOUSE, QUADS
+
+# --- NumPy 벡터화 배치 족보 판별 ---
+# (N, k) 정수 카드 코드 배열(k=5~7)을 받아 hand_evaluator.evaluate 와 같은 정수 점수 N개를 반환합니다.
+# 파이썬 루프 없이 랭크 히스토그램, 무늬 카운트, 13비트 랭크 마스크 룩업만으로 계산합니다.
+
+CHUNK_SIZE = 1 << 16 # 한 번에 처리할 최대 행 수 (임시 배열 메모리 제한용)
+
+_RANK_BITS = (1 << np.arange(13)).astype(np.int64)
+_RANK_ONE_HOT = np.eye(13, dtype=np.int8)
+_SUIT_ONE_HOT = np.eye(4, dtype=np.int8)
+
+
+def _build_top5_table():
+    """13비트 랭크 마스크 -> 상위 5개 값(2~14)을 4비트씩 채운 정수 (부족한 칸은 0)."""
+    table = np.zeros(1 << 13, dtype=np.int64)
+    for mask in range(1 << 13):
+        packed = 0
+        taken = 0
+        for r in range(12, -1, -1):
+            if mask >> r & 1 and taken < 5:
+                packed |= (r + 2) << (16 - 4 * taken)
+                taken += 1
+        table[mask] = packed
+    return table
+
+
+_TOP5 = _build_top5_table()
+_STRAIGHT_TOP = np.array([hand_evaluator._best_straight(m) for m in range(1 << 13)], dtype=np.int64)
+_FLUSH_SCORE = np.array(hand_evaluator._FLUSH_TABLE, dtype=np.int64)
+
+
+def _top_value(mask):
+    """마스크에서 가장 높은 값(2~14)."""
+    return _TOP5[mask] >> 16
+
+
+def _value_bit(value):
+    return np.left_shift(1, value - 2)
+
+
+def _evaluate_chunk(codes):
+    ranks = codes >> 2
+    suits = codes & 3
+
+    counts = _RANK_ONE_HOT[ranks].sum(axis=1, dtype=np.int8)        # (N, 13) 랭크 히스토그램
+    suit_counts = _SUIT_ONE_HOT[suits].sum(axis=1, dtype=np.int8)   # (N, 4) 무늬 카운트
+
+    rank_mask = (counts > 0) @ _RANK_BITS
+    pair_mask = (counts >= 2) @ _RANK_BITS
+    trips_mask = (counts >= 3) @ _RANK_BITS
+    quads_mask = (counts == 4) @ _RANK_BITS
+
+    # 플러시: 5장 이상인 무늬의 랭크 마스크를 룩업 (7장 이하에서는 포카드/풀하우스와 공존 불가)
+    flush_suit = suit_counts.argmax(axis=1)
+    is_flush = suit_counts.max(axis=1) >= 5
+    in_suit = suits == flush_suit[:, None]
+    flush_mask = np.where(in_suit, np.left_shift(1, ranks), 0).sum(axis=1)
+    flush_score = _FLUSH_SCORE[np.where(is_flush, flush_mask, 0)]
+
+    straight_top = _STRAIGHT_TOP[rank_mask]
+
+    quad = _top_value(quads_mask)
+    trips = _top_value(trips_mask)
+    high_pair = _top_value(pair_mask)
+    full_pair = _top_value(pair_mask & ~np.where(trips > 0, _value_bit(np.maximum(trips, 2)), 0))
+    low_pair = (_TOP5[pair_mask] >> 12) & 0xF
+
+    quad_kicker = _top_value(rank_mask & ~_value_bit(np.maximum(quad, 2)))
+    trips_kickers = _TOP5[rank_mask & ~_value_bit(np.maximum(trips, 2))] >> 12
+    two_pair_kicker = _top_value(rank_mask & ~_value_bit(np.maximum(high_pair, 2))
+                                 & ~_value_bit(np.maximum(low_pair, 2)))
+    pair_kickers = (_TOP5[rank_mask & ~_value_bit(np.maximum(high_pair, 2))] >> 8) << 4
+
+    conditions = [
+        is_flush,
+        quad > 0,
+        (trips > 0) & (full_pair > 0),
+        straight_top > 0,
+        trips > 0,
+        low_pair > 0,
+        high_pair > 0,
+    ]
+    choices = [
+        flush_score,
+        (QUADS << 20) | (quad << 16) | (quad_kicker << 12),
+        (FULL_HOUSE << 20) | (trips << 16) | (full_pair << 12),
+        (STRAIGHT << 20) | (straight_top << 16),
+        (TRIPS << 20) | (trips << 16) | (trips_kickers << 8),
+        (TWO_PAIR << 20) | (high_pair << 16) | (low_pair << 12) | (two_pair_kicker << 8),
+        (ONE_PAIR << 20) | (high_pair << 16) | pair_kickers,
+    ]
+    return np.select(conditions, choices, default=(HIGH_CARD << 20) | _TOP5[rank_mask])
+
+
+def evaluate_batch(codes):
+    """
+    (N, k) 카드 코드 배열(k = 5~7)의 족보 점수를 한 번에 계산합니다.
+    반환값은 길이 N 의 int64 배열이며, hand_evaluator.evaluate 와 같은 값/순서를 가집니다.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    if codes.ndim != 2 or not 5 <= codes.shape[1] <= 7:
+        raise ValueError(f"(N, 5~7) 형태의 카드 코드 배열이 필요합니다: {codes.shape}")
+
+    scores = np.empty(len(codes), dtype=np.int64)
+    for start in range(0, len(codes), CHUNK_SIZE):
+        chunk = codes[start:start + CHUNK_SIZE]
+        scores[start:start + len(chunk)] = _evaluate_chunk(chunk)
+    return scores
+
+
+def encode_hands(hands):
+    """Card 객체 리스트들의 리스트를 (N, k) 카드 코드 배열로 변환합니다."""
+    return np.array([[c.code for c in cards] for cards in hands], dtype=np.int64)
+
+
+# --- 기준 구현(poker_env.evaluate_5_cards)과의 일치 검사 ---
+if __name__ == "__main__":
+    import itertools
+    import time
+    from poker_env import Deck, evaluate_5_cards
+
+    hands = []
+    for _ in range(20000):
+        deck = Deck()
+        hands.append([deck.draw() for _ in range(7)])
+
+    codes = encode_hands(hands)
+    start = time.perf_counter()
+    scores = evaluate_batch(codes)
+    elapsed = time.perf_counter() - start
+
+    mismatches = 0
+    for cards, score in zip(hands[:2000], scores[:2000]):
+        best = max(evaluate_5_cards(combo) for combo in itertools.combinations(cards, 5))
+        if hand_evaluator.score_to_tuple(int(score)) != best:
+            mismatches += 1
+    scalar = [hand_evaluator.evaluate(list(row)) for row in codes.tolist()]
+    mismatches += int((np.array(scalar) != scores).sum())
+
+    print(f"배치 평가: {len(hands)}핸드 {elapsed:.3f}초 ({len(hands) / elapsed:,.0f} hands/sec)")
+    print(f"기준 구현과 불일치: {mismatches}건")
@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import poker_env
+from poker_env import PokerGame, Deck, CARDS, get_best_hand, evaluate_5_cards, derive_seed
+from agent import PokerAgent
+from LearningAgent import LearningAgent
+from events import JsonlSink, BinarySink
+
+# --- 성능 측정 모음 ---
+# 핵심 경로마다 초당 처리량(또는 지연 시간)을 재서 JSON 으로 남깁니다. 커밋마다 결과를 저장해 두고
+# --compare 로 이전 결과와 비교하면 회귀를 찾을 수 있습니다.
+#
+#   python benchmarks.py --json bench.json
+#   python benchmarks.py --quick --compare bench.json
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _rate(count, elapsed):
+    return count / elapsed if elapsed > 0 else 0.0
+
+
+class CountingAgent(PokerAgent):
+    """결정 횟수를 세는 무작위 에이전트."""
+
+    def __init__(self, name, seed=None):
+        super().__init__(name, verbose=False, seed=seed)
+        self.decisions = 0
+
+    def choose_action(self, state, valid_actions):
+        self.decisions += 1
+        return self.rng.choice(valid_actions)
+
+
+def _random_hands(count, size, seed):
+    rng = random.Random(seed)
+    return [[CARDS[c] for c in rng.sample(range(52), size)] for _ in range(count)]
+
+
+# --- 족보 판별 ---
+def bench_evaluate(scale):
+    count = int(20000 * scale)
+    five = _random_hands(count, 5, 1)
+    seven = _random_hands(count, 7, 2)
+
+    start = time.perf_counter()
+    for cards in five:
+        evaluate_5_cards(cards)
+    reference = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for cards in seven:
+        get_best_hand(cards)
+    best = time.perf_counter() - start
+
+    result = {
+        "evaluate_5_cards_per_sec": _rate(count, reference),
+        "get_best_hand_7_per_sec": _rate(count, best),
+    }
+    try:
+        from batch_evaluator import evaluate_batch, encode_hands
+    except ImportError:
+        return result
+    codes = encode_hands(seven)
+    start = time.perf_counter()
+    evaluate_batch(codes)
+    result["evaluate_batch_7_per_sec"] = _rate(count, time.perf_counter() - start)
+    return result
+
+
+# --- 베팅 라운드 ---
+def bench_betting_round(scale, players=4):
+    """4구까지 진행한 게임에서 play_betting_round 만 잽니다 (딜/앤티 시간 제외)."""
+    rounds = int(2000 * scale)
+    names = [f"P{i}" for i in range(players)]
+    agents = {name: CountingAgent(name, seed=derive_seed(0, name)) for name in names}
+    elapsed = 0.0
+    for i in range(rounds):
+        game = PokerGame(names, seed=derive_seed(1, i))
+        game.start_game()
+        for p in game.players:
+            p.discard_and_reveal(0, 1)
+        game.deal_cards_to_active(is_public=True)
+        start = time.perf_counter()
+        game.play_betting_round(agents)
+        elapsed += time.perf_counter() - start
+    decisions = sum(a.decisions for a in agents.values())
+    return {"rounds": rounds, "decisions": decisions, "decisions_per_sec": _rate(decisions, elapsed)}
+
+
+# --- 한 판 전체 ---
+def _play_hands(hands, players, sink_factory=None):
+    names = [f"P{i}" for i in range(players)]
+    agents = {name: CountingAgent(name, seed=derive_seed(2, name)) for name in names}
+    deck = Deck()
+    sink = sink_factory() if sink_factory is not None else None
+    start = time.perf_counter()
+    for i in range(hands):
+        PokerGame(names, sink=sink, deck=deck, seed=derive_seed(3, i)).play_hand(agents)
+    elapsed = time.perf_counter() - start
+    if sink is not None:
+        sink.close()
+    return _rate(hands, elapsed)
+
+
+def bench_play_hand(scale, players=4):
+    hands = int(2000 * scale)
+    result = {"hands": hands, "players": players, "null_sink_per_sec": _play_hands(hands, players)}
+    with tempfile.TemporaryDirectory() as tmp:
+        result["jsonl_sink_per_sec"] = _play_hands(hands, players, lambda: JsonlSink(os.path.join(tmp, "log.jsonl")))
+        result["binary_sink_per_sec"] = _play_hands(hands, players, lambda: BinarySink(os.path.join(tmp, "log.bin")))
+
+        # 진행 로그(logger INFO)를 켠 경우: 실제 포맷팅까지 하되 출력은 버림
+        logger = poker_env.logger
+        handler = logging.StreamHandler(open(os.devnull, 'w'))
+        level, propagate = logger.level, logger.propagate
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        try:
+            result["logger_info_per_sec"] = _play_hands(hands, players)
+        finally:
+            logger.removeHandler(handler)
+            handler.stream.close()
+            logger.setLevel(level)
+            logger.propagate = propagate
+    return result
+
+
+# --- LearningAgent 결정 지연 ---
+class _TimedLearningAgent(LearningAgent):
+    def __init__(self, name, seed=None):
+        super().__init__(name, verbose=False, seed=seed)
+        self.latencies = []
+
+    def choose_action(self, state, valid_actions):
+        start = time.perf_counter()
+        action = super().choose_action(state, valid_actions)
+        self.latencies.append(time.perf_counter() - start)
+        return action
+
+
+def bench_learning_agent(scale, players=3, checkpoints=5):
+    """임시 DB 에서 LearningAgent 끼리 판을 이어가며, 구간마다 DB 크기와 choose_action 지연을 기록합니다."""
+    hands_per_checkpoint = int(400 * scale)
+    saved = (LearningAgent.shared_memory, LearningAgent.db_filename, LearningAgent.legacy_db_filename)
+    curve = []
+    with tempfile.TemporaryDirectory() as tmp:
+        LearningAgent.shared_memory = None
+        LearningAgent.db_filename = os.path.join(tmp, "bench.sqlite")
+        LearningAgent.legacy_db_filename = os.path.join(tmp, "missing.json")
+        try:
+            names = [f"P{i}" for i in range(players)]
+            agents = {name: _TimedLearningAgent(name, seed=derive_seed(4, name)) for name in names}
+            hand_index = 0
+            for _ in range(checkpoints):
+                for agent in agents.values():
+                    agent.latencies.clear()
+                start = time.perf_counter()
+                for _ in range(hands_per_checkpoint):
+                    PokerGame(names, seed=derive_seed(5, hand_index)).play_hand(agents)
+                    hand_index += 1
+                elapsed = time.perf_counter() - start
+                latencies = sorted(x for a in agents.values() for x in a.latencies)
+                curve.append({
+                    "hands": hand_index,
+                    "db_entries": len(LearningAgent.shared_memory),
+                    "decision_mean_us": sum(latencies) / len(latencies) * 1e6 if latencies else 0.0,
+                    "decision_p99_us": latencies[int(len(latencies) * 0.99)] * 1e6 if latencies else 0.0,
+                    "hands_per_sec": _rate(hands_per_checkpoint, elapsed),
+                })
+            LearningAgent.shared_memory.close()
+        finally:
+            LearningAgent.shared_memory, LearningAgent.db_filename, LearningAgent.legacy_db_filename = saved
+    return {"curve": curve}
+
+
+# --- 사이드 팟이 많은 쇼다운 ---
+def _side_pot_game(names, seed):
+    """모두 7장을 들고 투자금이 전부 달라 사이드 팟이 좌석 수만큼 생기는 쇼다운 직전 상태."""
+    rng = random.Random(seed)
+    game = PokerGame(names, seed=seed)
+    codes = rng.sample(range(52), 7 * len(names))
+    for i, p in enumerate(game.players):
+        p.hidden_cards = [CARDS[c] for c in codes[7 * i:7 * i + 3]]
+        p.public_cards = [CARDS[c] for c in codes[7 * i + 3:7 * i + 7]]
+        p.invested = 100 * (i + 1)
+        p.is_all_in = True
+        game.pot += p.invested
+    return game
+
+
+def bench_showdown(scale, players=5):
+    games_count = int(5000 * scale)
+    names = [f"P{i}" for i in range(players)]
+    games = [_side_pot_game(names, i) for i in range(games_count)]
+    start = time.perf_counter()
+    for game in games:
+        game.resolve_showdown()
+    elapsed = time.perf_counter() - start
+    return {"showdowns": games_count, "side_pots": players, "showdowns_per_sec": _rate(games_count, elapsed)}
+
+
+BENCHMARKS = {
+    "evaluate": bench_evaluate,
+    "betting_round": bench_betting_round,
+    "play_hand": bench_play_hand,
+    "learning_agent": bench_learning_agent,
+    "showdown": bench_showdown,
+}
+
+
+def run_benchmarks(names=None, scale=1):
+    results = {}
+    for name in names or BENCHMARKS:
+        start = time.perf_counter()
+        results[name] = BENCHMARKS[name](scale)
+        results[name]["elapsed_sec"] = time.perf_counter() - start
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline):
+    """두 결과의 *_per_sec 지표 비율(현재 / 기준)을 {벤치마크: {지표: 비율}} 로 반환합니다."""
+    ratios = {}
+    for name, metrics in current["results"].items():
+        base = baseline.get("results", {}).get(name, {})
+        for key, value in metrics.items():
+            if key.endswith("_per_sec") and base.get(key):
+                ratios.setdefault(name, {})[key] = value / base[key]
+    return ratios
+
+
+# --- 실행 메인 블록 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="7 Poker benchmark suite")
+    parser.add_argument('-b', '--bench', nargs='+', choices=list(BENCHMARKS), default=None, help='실행할 벤치마크')
+    parser.add_argument('--scale', type=float, default=1, help='반복 횟수 배율')
+    parser.add_argument('--quick', action='store_true', help='1/4 분량으로 짧게 (--scale 0.25 와 같음)')
+    parser.add_argument('--json', type=str, default=None, help='결과를 저장할 JSON 파일 경로')
+    parser.add_argument('--compare', type=str, default=None, help='비교할 이전 결과 JSON')
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.bench, 0.25 if args.quick else args.scale)
+
+    for name, metrics in report["results"].items():
+        print(f"=== {name} ===")
+        for key, value in metrics.items():
+            if key == "curve":
+                for point in value:
+                    print("  " + " | ".join(f"{k} {v:,.1f}" for k, v in point.items()))
+            else:
+                print(f"  {key}: {value:,.1f}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n=== 비교 (기준 커밋 {baseline['meta'].get('commit')}) ===")
+        for name, ratios in compare(report, baseline).items():
+            for key, ratio in ratios.items():
+                print(f"  {name}.{key}: x{ratio:.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
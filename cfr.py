@@ -0,0 +1,287 @@
+import os
+import time
+import logging
+import random
+import argparse
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from agent import PokerAgent
+from events import ACTIONS, ACTION_INDEX
+from game_state import GameState
+from hand_evaluator import code_from_str, evaluate
+from range_model import strength_batch, NUM_STRENGTHS
+from state_abstraction import board_bucket, BOARD_BUCKETS
+from tournament import session_seed
+
+logger = logging.getLogger("cfr")
+
+# --- 외부 표본(external sampling) MCCFR 학습기 ---
+# PokerGame 과 같은 베팅 규칙(get_valid_actions 의 FOLD/CALL/QUARTER/HALF/BBING, 4구~7구 스트리트, 사이드 팟 결산)을
+# 카드 없는 game_state.GameState 로 순회합니다. 반복마다 카드를 한 번 뽑아 두고, 학습 대상 좌석(traverser)의 결정에서는
+# 모든 액션으로 가지를 치고 다른 좌석의 결정과 카드는 표본 하나만 따라갑니다.
+#
+# 정보 집합(조밀 인덱스)은 get_ai_state 로 알 수 있는 값만 씁니다:
+#   스트리트 | 내 패 강도(range_model 강도 버킷) | 살아있는 상대 중 가장 위협적인 공개 패(state_abstraction.board_bucket)
+#   | 콜 금액 / (팟 + 콜 금액) 버킷(0 은 콜 없음) | 살아있는 상대 수
+# 베팅 추상화: 한 스트리트의 레이즈는 max_raises 번까지만 가지를 치고, 그 뒤로는 FOLD/CALL 만 봅니다.
+# 3구의 버리기/공개는 학습하지 않고 PokerAgent 기본값(0번 버림, 1번 공개)으로 고정합니다.
+#
+# 학습 결과: 누적 후회(regrets)와 누적 전략(strategy) 조밀 배열 (정보 집합 수 x 5). 평균 전략은 strategy 를 행마다
+# 정규화한 표이며 CFRAgent 가 결정마다 인덱스 하나로 조회합니다.
+
+ABSTRACTION_VERSION = 1
+NUM_ACTIONS = len(ACTIONS)
+NUM_STREETS = 4
+POT_ODDS_EDGES = (0.1, 0.2, 0.33)
+MAX_OPPONENTS = 3 # 상대 수 버킷 (1, 2, 3 이상)
+RADICES = (NUM_STREETS, NUM_STRENGTHS, BOARD_BUCKETS, len(POT_ODDS_EDGES) + 2, MAX_OPPONENTS)
+NUM_INFOSETS = int(np.prod(RADICES))
+DEFAULT_PATH = "cfr_strategy.npz"
+
+
+def infoset_index(street, strength, threat, call, pot, opponents):
+    """정보 집합 필드 -> 0 ~ NUM_INFOSETS-1 조밀 인덱스."""
+    odds = 0 if call <= 0 else 1 + bisect_left(POT_ODDS_EDGES, call / (pot + call))
+    index = street
+    for value, radix in zip((strength, threat, odds, min(opponents, MAX_OPPONENTS) - 1), RADICES[1:]):
+        index = index * radix + value
+    return index
+
+
+def state_infoset(state):
+    """get_ai_state 딕셔너리 -> 정보 집합 인덱스 (CFRAgent 의 조회 키)."""
+    my_cards = [code_from_str(c) for c in state["my_hidden_cards"] + state["my_public_cards"]]
+    street = min(max(len(my_cards) - 4, 0), NUM_STREETS - 1)
+    strength = int(strength_batch(np.array([my_cards]))[0])
+    live = [opp for opp in state["opponents"].values() if not opp["is_folded"]]
+    threat = max((board_bucket([code_from_str(c) for c in opp["public_cards"]]) for opp in live), default=0)
+    return infoset_index(street, strength, threat, state["call_amount"], state["pot"], max(len(live), 1))
+
+
+# --- 카드 표본 ---
+def _deal(num_players, rng):
+    """
+    한 반복의 카드: 좌석별 (스트리트별 강도 버킷, 스트리트별 공개 패 버킷), 최종 점수.
+    좌석마다 8장: 0~3 첫 4장(0 버림, 1 공개), 4~6 4구~6구 공개, 7 7구 히든.
+    """
+    codes = rng.sample(range(52), 8 * num_players)
+    hands = [codes[8 * s:8 * s + 8] for s in range(num_players)]
+    strengths = [strength_batch(np.array([h[1:4 + street + 1] for h in hands])).tolist() for street in range(NUM_STREETS)]
+    strength = [[strengths[street][s] for street in range(NUM_STREETS)] for s in range(num_players)]
+    boards = [[board_bucket([h[1]] + h[4:min(5 + street, 7)]) for street in range(NUM_STREETS)] for h in hands]
+    scores = [evaluate(h[1:]) for h in hands]
+    return strength, boards, scores
+
+
+# --- 순회 ---
+class _Traversal:
+    """한 워커의 학습 상태. 배열은 순회 중 빠른 스칼라 접근을 위해 평평한 파이썬 리스트로 들고 있습니다."""
+
+    def __init__(self, regrets, num_players, starting_chips, ante, max_raises, seed):
+        self.regrets = regrets.ravel().tolist()
+        self.d_regrets = [0.0] * len(self.regrets)
+        self.d_strategy = [0.0] * len(self.regrets)
+        self.num_players = num_players
+        self.starting_chips = starting_chips
+        self.ante = ante
+        self.max_raises = max_raises
+        self.rng = random.Random(seed)
+        self.nodes = 0
+
+    def iterate(self):
+        """카드를 한 번 뽑고 좌석마다 한 번씩 학습 대상으로 순회합니다."""
+        self.strength, self.boards, self.scores = _deal(self.num_players, self.rng)
+        for traverser in range(self.num_players):
+            self.traverse(GameState([self.starting_chips] * self.num_players, self.ante), traverser)
+
+    def _infoset(self, hand):
+        seat, street = hand.seat, hand.street
+        threat, opponents = 0, 0
+        for s in range(self.num_players):
+            if s != seat and not hand.folded[s]:
+                opponents += 1
+                threat = max(threat, self.boards[s][street])
+        return infoset_index(street, self.strength[seat][street], threat, hand.call_amount(), hand.pot, opponents)
+
+    def _strategy(self, base, actions):
+        positive = [max(self.regrets[base + a] + self.d_regrets[base + a], 0.0) for a in actions]
+        total = sum(positive)
+        if total > 0:
+            return [p / total for p in positive]
+        return [1.0 / len(actions)] * len(actions)
+
+    def traverse(self, hand, traverser):
+        self.nodes += 1
+        if hand.seat is None:
+            return hand.payoffs(self.scores)[traverser]
+        actions = hand.legal_actions(self.max_raises)
+        base = self._infoset(hand) * NUM_ACTIONS
+        strategy = self._strategy(base, actions)
+
+        if hand.seat == traverser:
+            values = []
+            for a in actions:
+                child = hand.clone()
+                child.step(a)
+                values.append(self.traverse(child, traverser))
+            node_value = sum(p * v for p, v in zip(strategy, values))
+            for a, v in zip(actions, values):
+                self.d_regrets[base + a] += v - node_value
+            return node_value
+
+        # 다른 좌석: 평균 전략을 쌓고 현재 전략에서 액션 하나만 따라감
+        for a, p in zip(actions, strategy):
+            self.d_strategy[base + a] += p
+        hand.step(self.rng.choices(actions, strategy)[0])
+        return self.traverse(hand, traverser)
+
+
+def _run_batch(task):
+    """워커에서 iterations 번 반복하고 (후회 변화량, 전략 변화량, 방문 노드 수) 를 반환합니다."""
+    regrets, num_players, starting_chips, ante, max_raises, iterations, seed = task
+    walker = _Traversal(regrets, num_players, starting_chips, ante, max_raises, seed)
+    for _ in range(iterations):
+        walker.iterate()
+    shape = (NUM_INFOSETS, NUM_ACTIONS)
+    return (np.array(walker.d_regrets).reshape(shape), np.array(walker.d_strategy).reshape(shape), walker.nodes)
+
+
+# --- 학습기 ---
+class CFRTrainer:
+    """
+    누적 후회/전략 배열을 들고 배치 단위로 학습합니다. 배치마다 워커들이 같은 후회 배열 스냅샷에서 각자 다른 시드로
+    반복하고, 돌려준 변화량을 합칩니다. checkpoint() 는 임시 파일에 쓴 뒤 이름을 바꿔 원자적으로 교체합니다.
+    """
+
+    def __init__(self, num_players=3, starting_chips=1000, ante=1, max_raises=1, seed=0):
+        self.num_players = num_players
+        self.starting_chips = starting_chips
+        self.ante = ante
+        self.max_raises = max_raises
+        self.seed = seed
+        self.regrets = np.zeros((NUM_INFOSETS, NUM_ACTIONS))
+        self.strategy = np.zeros((NUM_INFOSETS, NUM_ACTIONS))
+        self.iterations = 0
+        self.batches = 0
+        self.nodes = 0
+
+    def train(self, iterations, workers=1, batch_iterations=100, checkpoint_path=None, checkpoint_every=10):
+        """iterations 번 더 반복합니다. checkpoint_path 가 있으면 checkpoint_every 배치마다, 그리고 끝날 때 저장합니다."""
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            remaining = iterations
+            while remaining > 0:
+                per_worker = min(batch_iterations, -(-remaining // workers))
+                tasks = []
+                for w in range(workers):
+                    n = min(per_worker, remaining)
+                    if n <= 0:
+                        break
+                    remaining -= n
+                    tasks.append((self.regrets, self.num_players, self.starting_chips, self.ante, self.max_raises, n,
+                                  session_seed(self.seed, self.batches * workers + w)))
+                results = pool.map(_run_batch, tasks) if pool is not None else map(_run_batch, tasks)
+                for (d_regrets, d_strategy, nodes), task in zip(results, tasks):
+                    self.regrets += d_regrets
+                    self.strategy += d_strategy
+                    self.nodes += nodes
+                    self.iterations += task[5]
+                self.batches += 1
+                if checkpoint_path and self.batches % checkpoint_every == 0:
+                    self.checkpoint(checkpoint_path)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if checkpoint_path:
+            self.checkpoint(checkpoint_path)
+
+    def average_strategy(self):
+        """정보 집합마다 누적 전략을 정규화한 평균 전략 (한 번도 안 가 본 행은 0)."""
+        totals = self.strategy.sum(axis=1, keepdims=True)
+        return np.divide(self.strategy, totals, out=np.zeros_like(self.strategy), where=totals > 0).astype(np.float32)
+
+    def checkpoint(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, regrets=self.regrets, strategy=self.strategy, average=self.average_strategy(),
+                     meta=np.array([ABSTRACTION_VERSION, self.num_players, self.starting_chips, self.ante,
+                                    self.max_raises, self.seed, self.iterations, self.batches, self.nodes]))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def resume(cls, path):
+        with np.load(path) as data:
+            version, num_players, starting_chips, ante, max_raises, seed, iterations, batches, nodes = data["meta"].tolist()
+            if version != ABSTRACTION_VERSION:
+                raise ValueError(f"CFR 체크포인트의 추상화 버전이 맞지 않습니다: {path}")
+            trainer = cls(num_players, starting_chips, ante, max_raises, seed)
+            trainer.regrets = data["regrets"]
+            trainer.strategy = data["strategy"]
+        trainer.iterations, trainer.batches, trainer.nodes = iterations, batches, nodes
+        return trainer
+
+
+def load_average_strategy(path):
+    """체크포인트에서 평균 전략 표만 읽습니다 (NUM_INFOSETS x 5, float32)."""
+    with np.load(path) as data:
+        if int(data["meta"][0]) != ABSTRACTION_VERSION:
+            raise ValueError(f"CFR 체크포인트의 추상화 버전이 맞지 않습니다: {path}")
+        return data["average"]
+
+
+# --- 학습된 전략으로 두는 에이전트 ---
+class CFRAgent(PokerAgent):
+    # 모든 CFRAgent 가 같은 표를 공유합니다 (처음 만들 때 한 번 읽음)
+    strategy_path = DEFAULT_PATH
+    table = None
+
+    def __init__(self, name, verbose=True, seed=None):
+        super().__init__(name, verbose, seed)
+        if CFRAgent.table is None:
+            if os.path.exists(self.strategy_path):
+                CFRAgent.table = load_average_strategy(self.strategy_path)
+            else:
+                # verbose 와 상관없이 알립니다: 헤드리스 대전에서 체크포인트 없이 무작위로 둔 결과를 CFR 성적으로 오해하지 않도록
+                logger.warning("CFR 체크포인트 %s 가 없어 균등 무작위 전략으로 둡니다.", self.strategy_path)
+                CFRAgent.table = np.zeros((NUM_INFOSETS, NUM_ACTIONS), dtype=np.float32)
+
+    def choose_action(self, state, valid_actions):
+        if not valid_actions:
+            return None
+        row = CFRAgent.table[state_infoset(state)]
+        weights = [float(row[ACTION_INDEX[a]]) for a in valid_actions]
+        if sum(weights) <= 0:
+            weights = None # 학습 중 못 가 본 정보 집합, 또는 추상화가 막아 둔 레이즈만 남은 경우
+        chosen_action = self.rng.choices(valid_actions, weights)[0]
+        if self.verbose:
+            print(f"[{self.name}] CFR 평균 전략으로 '{chosen_action}' 액션을 선택했습니다!")
+        return chosen_action
+
+
+# --- 실행 메인 블록 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="7 Poker external-sampling MCCFR trainer")
+    parser.add_argument('-n', '--iterations', type=int, default=1000, help='반복 수 (반복마다 좌석 수만큼 순회)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1, help='워커 프로세스 수')
+    parser.add_argument('-p', '--players', type=int, default=3, help='좌석 수')
+    parser.add_argument('--batch', type=int, default=100, help='워커가 한 번에 도는 반복 수')
+    parser.add_argument('--max-raises', type=int, default=1, help='스트리트당 가지를 치는 레이즈 수')
+    parser.add_argument('--out', type=str, default=DEFAULT_PATH, help='체크포인트 경로 (있으면 이어서 학습)')
+    parser.add_argument('--checkpoint-every', type=int, default=10, help='체크포인트 간격 (배치 수)')
+    parser.add_argument('--seed', type=int, default=0, help='루트 시드')
+    args = parser.parse_args()
+
+    if os.path.exists(args.out):
+        trainer = CFRTrainer.resume(args.out)
+        print(f"[시스템] {args.out} 에서 이어서 학습합니다 ({trainer.iterations}회 학습됨).")
+    else:
+        trainer = CFRTrainer(args.players, max_raises=args.max_raises, seed=args.seed)
+    start = time.perf_counter()
+    trainer.train(args.iterations, args.workers, args.batch, args.out, args.checkpoint_every)
+    elapsed = time.perf_counter() - start
+    visited = int((trainer.strategy.sum(axis=1) > 0).sum())
+    print(f"=== {args.iterations}회 반복 | {elapsed:.1f}초 ({args.iterations / elapsed:.1f}회/초) | "
+          f"누적 노드 {trainer.nodes:,} | 방문한 정보 집합 {visited}/{NUM_INFOSETS} ===")
@@ -0,0 +1,174 @@
+import os
+import time
+import shutil
+import argparse
+import multiprocessing as mp
+from queue import Empty
+
+import numpy as np
+
+from events import ACTION_INDEX
+from qtable import QTable, QTableStore
+from poker_env import PokerGame, create_agent, derive_seed
+from LearningAgent import LearningAgent
+from tournament import session_seed
+
+# --- 멀티 프로세스 셀프 플레이 학습 (learner / actor) ---
+# LearningAgent.shared_memory 는 한 프로세스 안에서만 공유되므로, 여러 프로세스가 같은 DB 파일에 직접 쓰면
+# 서로의 갱신을 덮어씁니다. 여기서는 쓰기를 learner 한 곳으로 모읍니다.
+#
+#   actor (N개 프로세스): 읽기 전용 스냅샷을 보고 판을 진행하고, 판이 끝날 때 LearningAgent.end_hand 가 내는
+#                         (상태 index, 액션, 보상) 을 모아 batch_hands 판마다 큐로 보냅니다.
+#   learner (메인 프로세스): 큐의 배치를 조밀 Q 테이블에 update_memory 방식(점수 += 보상, 방문 += 1)으로 더하고,
+#                         publish_every 배치마다 테이블을 스냅샷 파일로 복사해 원자적으로 교체(os.replace)합니다.
+#                         actor 는 공유 버전 번호가 바뀌면 새 스냅샷을 다시 엽니다.
+
+
+class ActorStore(QTableStore):
+    """
+    actor 용 저장소: 읽기는 읽기 전용 스냅샷에서 하고, record() 는 디스크 대신 버퍼에 쌓습니다.
+    버퍼는 drain() 으로 꺼내 learner 에게 보냅니다.
+    """
+
+    def __init__(self, snapshot_path, version=0):
+        super().__init__(snapshot_path, readonly=True)
+        self.path = snapshot_path
+        self.version = version
+        self.indices = []
+        self.actions = []
+        self.rewards = []
+
+    def put(self, key, scores):
+        pass # 처음 보는 상태의 0점 초기화는 조밀 테이블에서 이미 0 이므로 할 일이 없습니다.
+
+    def record(self, key, action, reward):
+        self.indices.append(self._index(key))
+        self.actions.append(ACTION_INDEX[action])
+        self.rewards.append(reward)
+
+    def commit(self):
+        pass
+
+    def drain(self):
+        """쌓인 경험을 (indices, action_indices, rewards) 배열로 꺼내고 버퍼를 비웁니다."""
+        batch = (np.array(self.indices, dtype=np.int64), np.array(self.actions, dtype=np.uint8),
+                 np.array(self.rewards, dtype=np.float64))
+        self.indices, self.actions, self.rewards = [], [], []
+        return batch
+
+    def reload(self, version):
+        """learner 가 새로 발행한 스냅샷을 엽니다. 이전 스냅샷의 메모리 맵은 참조가 사라지면 해제됩니다."""
+        self.table = QTable(self.path, readonly=True)
+        self.version = version
+
+
+def publish_snapshot(table, snapshot_path):
+    """테이블을 임시 파일로 복사한 뒤 이름을 바꿔, actor 가 반쯤 쓰인 스냅샷을 여는 일이 없게 합니다."""
+    table.flush()
+    tmp_path = snapshot_path + ".tmp"
+    shutil.copyfile(table.path, tmp_path)
+    os.replace(tmp_path, snapshot_path)
+
+
+def _actor(actor_id, agent_types, hands, seed, snapshot_path, queue, version, batch_hands):
+    store = ActorStore(snapshot_path, version.value)
+    LearningAgent.shared_memory = store
+    LearningAgent.db_readonly = True # 디스크 기록은 learner 만 합니다
+
+    names = [f"Player_{i + 1}" for i in range(len(agent_types))]
+    agents = {name: create_agent(a_type, name, verbose=False, seed=derive_seed(seed, "agent", name))
+              for name, a_type in zip(names, agent_types)}
+
+    for hand_index in range(hands):
+        shift = (hand_index + actor_id) % len(names)
+        seating = names[shift:] + names[:shift]
+        PokerGame(seating, seed=derive_seed(seed, "hand", hand_index)).play_hand({name: agents[name] for name in seating})
+
+        if (hand_index + 1) % batch_hands == 0:
+            queue.put(store.drain())
+            if version.value != store.version:
+                store.reload(version.value)
+
+    queue.put(store.drain())
+    queue.put(None) # 종료 신호
+
+
+def run_self_play(agent_types, hands, actors=2, table_path="LearningAgent_Shared_db.qtab", snapshot_path=None,
+                  batch_hands=50, publish_every=20, seed=0):
+    """
+    actors 개 프로세스가 각각 hands 판씩 셀프 플레이하고, 메인 프로세스가 learner 로서 table_path 의
+    조밀 Q 테이블에 경험을 합칩니다. 학습 통계 딕셔너리를 반환합니다.
+    """
+    if snapshot_path is None:
+        snapshot_path = os.path.splitext(table_path)[0] + ".snapshot.qtab"
+    abstraction = LearningAgent.abstraction
+    table = QTable(table_path, abstraction.num_states, abstraction.version)
+    publish_snapshot(table, snapshot_path)
+
+    queue = mp.Queue(maxsize=actors * 4) # actor 가 learner 보다 너무 앞서가지 않도록 제한
+    version = mp.Value('L', 0)
+    processes = [mp.Process(target=_actor, args=(i, list(agent_types), hands, session_seed(seed, i), snapshot_path,
+                                                 queue, version, batch_hands))
+                 for i in range(actors)]
+    start = time.perf_counter()
+    for p in processes:
+        p.start()
+
+    running, batches, experiences = actors, 0, 0
+    while running:
+        try:
+            batch = queue.get(timeout=1.0)
+        except Empty:
+            # 종료 신호 없이 죽은 actor 가 있으면 영원히 기다리지 않도록 나머지를 정리하고 알립니다
+            failed = [p for p in processes if p.exitcode not in (None, 0)]
+            if failed:
+                for p in processes:
+                    if p.is_alive():
+                        p.terminate()
+                    p.join()
+                raise RuntimeError(f"actor 프로세스 {len(failed)}개가 비정상 종료했습니다 "
+                                   f"(exitcode {[p.exitcode for p in failed]}).")
+            continue
+        if batch is None:
+            running -= 1
+            continue
+        indices, action_indices, rewards = batch
+        if len(indices):
+            table.add_batch(indices, action_indices, rewards)
+            experiences += len(indices)
+        batches += 1
+        if batches % publish_every == 0:
+            publish_snapshot(table, snapshot_path)
+            version.value += 1
+
+    for p in processes:
+        p.join()
+    publish_snapshot(table, snapshot_path)
+    version.value += 1
+
+    return {
+        "hands": hands * actors,
+        "batches": batches,
+        "experiences": experiences,
+        "snapshots": version.value,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+# --- 실행 메인 블록 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="7 Poker multi-process self-play learner")
+    parser.add_argument('-a', '--agents', nargs='+', default=['learning', 'learning', 'learning'],
+                        help='에이전트 타입 목록 (random, learning)')
+    parser.add_argument('-n', '--hands', type=int, default=1000, help='actor 당 판 수')
+    parser.add_argument('-j', '--actors', type=int, default=os.cpu_count() or 1, help='actor 프로세스 수')
+    parser.add_argument('--table', type=str, default="LearningAgent_Shared_db.qtab", help='learner 의 Q 테이블 경로')
+    parser.add_argument('--batch-hands', type=int, default=50, help='actor 가 경험을 보내는 판 간격')
+    parser.add_argument('--publish-every', type=int, default=20, help='스냅샷을 발행하는 배치 간격')
+    parser.add_argument('--seed', type=int, default=0, help='루트 시드')
+    args = parser.parse_args()
+
+    stats = run_self_play(args.agents, args.hands, args.actors, args.table, batch_hands=args.batch_hands,
+                          publish_every=args.publish_every, seed=args.seed)
+    print(f"=== 셀프 플레이 {stats['hands']}판 | 경험 {stats['experiences']}개 | 배치 {stats['batches']}개 | "
+          f"스냅샷 {stats['snapshots']}회 | {stats['elapsed']:.1f}초 ===")
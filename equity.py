@@ -0,0 +1,373 @@
+import math
+import time
+import random
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, namedtuple
+from itertools import combinations
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from hand_evaluator import SUIT_PERMUTATIONS, code_from_str, evaluate
+
+# --- 몬테카를로 승률(에퀴티) 추정 ---
+# get_ai_state 상태(내 히든/공개 패, 상대 공개 패)에서 알려진 카드를 덱에서 빼고,
+# 상대의 히든 카드와 남은 스트리트(4구~7구)를 무작위로 채워 쇼다운 결과를 집계합니다.
+# 남은 경우의 수가 적은 후반 스트리트(6구, 7구)는 표본 대신 전수 열거하고 결과를 LRU 캐시에 담아 둡니다.
+
+EquityResult = namedtuple("EquityResult", "win tie equity ci_low ci_high samples elapsed")
+
+FINAL_CARD_COUNT = 7 # 7구까지 갔을 때 한 사람이 가지는 카드 수
+EXACT_THRESHOLD = 20000 # 전수 열거에 필요한 족보 평가 횟수가 이 이하이면 표본 대신 전수 열거
+
+_pool = None
+_pool_workers = 0
+
+
+def parse_state(state):
+    """get_ai_state 딕셔너리 -> (내 카드 코드, 살아있는 상대별 공개 카드 코드, 죽은 카드 코드)."""
+    my_cards = [code_from_str(c) for c in state["my_hidden_cards"] + state["my_public_cards"]]
+    opponents = []
+    dead_cards = []
+    for opp in state["opponents"].values():
+        codes = [code_from_str(c) for c in opp["public_cards"]]
+        if opp["is_folded"]:
+            dead_cards.extend(codes)
+        else:
+            opponents.append(codes)
+    return my_cards, opponents, dead_cards
+
+
+def unseen_cards(my_cards, opponents, dead_cards=()):
+    """덱에서 보이는 카드를 모두 제거한 나머지 카드 코드 목록."""
+    known = set(my_cards) | set(dead_cards)
+    for codes in opponents:
+        known.update(codes)
+    return [c for c in range(52) if c not in known]
+
+
+def completion_count(my_cards, opponents, dead_cards=()):
+    """보이지 않는 카드로 나와 살아있는 상대의 7장을 채우는 모든 경우의 수."""
+    remaining = len(unseen_cards(my_cards, opponents, dead_cards))
+    total = 1
+    for need in [FINAL_CARD_COUNT - len(my_cards)] + [FINAL_CARD_COUNT - len(codes) for codes in opponents]:
+        total *= math.comb(remaining, need)
+        remaining -= need
+    return total
+
+
+def enumeration_cost(my_cards, opponents, dead_cards=()):
+    """
+    전수 열거에 필요한 족보 평가 횟수.
+    헤즈업에서 내가 받을 카드가 1장 이하면 양쪽 완성 패를 따로 평가한 뒤 정렬/이분탐색으로 맞대어 보므로
+    경우의 수의 곱이 아니라 합만큼만 평가합니다.
+    """
+    my_need = FINAL_CARD_COUNT - len(my_cards)
+    if len(opponents) == 1 and my_need <= 1:
+        remaining = len(unseen_cards(my_cards, opponents, dead_cards))
+        return math.comb(remaining, FINAL_CARD_COUNT - len(opponents[0])) + remaining
+    return completion_count(my_cards, opponents, dead_cards)
+
+
+def canonical_key(my_cards, opponents, dead_cards=()):
+    """
+    (내 카드, 상대별 공개 카드, 죽은 카드) 의 정규형.
+    24가지 무늬 치환 중 사전순으로 가장 작은 형태를 골라, 무늬만 다른 동형 상황이 같은 키를 갖게 합니다.
+    상대 순서는 에퀴티에 영향이 없으므로 정렬합니다.
+    """
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        def relabel(codes):
+            return tuple(sorted((c & ~3) | perm[c & 3] for c in codes))
+        key = (relabel(my_cards), tuple(sorted(relabel(codes) for codes in opponents)), relabel(dead_cards))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+class EquityCache:
+    """정규형 키 -> EquityResult 를 담는 LRU 캐시."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+
+default_cache = EquityCache()
+
+
+def _simulate(my_cards, opponents, unseen, samples, seed):
+    """
+    표본 samples 개를 뽑아 (표본 수, 승, 무, 에퀴티 합, 에퀴티 제곱합) 을 반환합니다.
+    무승부는 공동 승자 수로 나눈 몫을 에퀴티에 더합니다.
+    """
+    rng = random.Random(seed)
+    my_need = FINAL_CARD_COUNT - len(my_cards)
+    opp_needs = [FINAL_CARD_COUNT - len(codes) for codes in opponents]
+    draw_count = my_need + sum(opp_needs)
+
+    wins = ties = 0
+    eq_sum = eq_sq = 0.0
+    for _ in range(samples):
+        drawn = rng.sample(unseen, draw_count)
+        my_score = evaluate(my_cards + drawn[:my_need])
+        pos = my_need
+        best_opp = -1
+        tied = 0
+        for codes, need in zip(opponents, opp_needs):
+            score = evaluate(codes + drawn[pos:pos + need])
+            pos += need
+            if score > best_opp:
+                best_opp = score
+                tied = 1 if score == my_score else 0
+            elif score == best_opp and score == my_score:
+                tied += 1
+
+        if my_score > best_opp:
+            wins += 1
+            eq_sum += 1.0
+            eq_sq += 1.0
+        elif my_score == best_opp:
+            ties += 1
+            share = 1.0 / (tied + 1)
+            eq_sum += share
+            eq_sq += share * share
+    return samples, wins, ties, eq_sum, eq_sq
+
+
+def _enumerate_heads_up(my_cards, opp_cards, unseen):
+    """
+    헤즈업, 내 남은 카드 1장 이하 전용 열거.
+    상대 완성 패 점수를 한 번씩만 계산해 정렬해 두고, 내 완성 패마다 이분탐색으로 승/무 개수를 센 뒤
+    내가 가져간 카드를 포함하는 상대 조합만 빼 줍니다.
+    """
+    my_need = FINAL_CARD_COUNT - len(my_cards)
+    opp_need = FINAL_CARD_COUNT - len(opp_cards)
+    opp_scores = []
+    by_card = {c: [] for c in unseen}
+    for combo in combinations(unseen, opp_need):
+        score = evaluate(opp_cards + list(combo))
+        opp_scores.append(score)
+        for c in combo:
+            by_card[c].append(score)
+    opp_scores.sort()
+
+    samples = wins = ties = 0
+    for mine in (combinations(unseen, 1) if my_need else [()]):
+        my_score = evaluate(my_cards + list(mine))
+        less = bisect_left(opp_scores, my_score)
+        equal = bisect_right(opp_scores, my_score) - less
+        total = len(opp_scores)
+        for c in mine:
+            for score in by_card[c]:
+                if score < my_score:
+                    less -= 1
+                elif score == my_score:
+                    equal -= 1
+            total -= len(by_card[c])
+        samples += total
+        wins += less
+        ties += equal
+    return samples, wins, ties, wins + 0.5 * ties, wins + 0.25 * ties
+
+
+def _enumerate(my_cards, opponents, unseen):
+    """
+    남은 카드의 모든 배분을 열거해 _simulate 와 같은 형식의 집계를 반환합니다.
+    내 카드를 먼저 고르고, 상대 순서대로 남은 카드에서 조합을 고릅니다.
+    """
+    if len(opponents) == 1 and FINAL_CARD_COUNT - len(my_cards) <= 1:
+        return _enumerate_heads_up(my_cards, opponents[0], unseen)
+
+    my_need = FINAL_CARD_COUNT - len(my_cards)
+    opp_needs = [FINAL_CARD_COUNT - len(codes) for codes in opponents]
+    totals = [0, 0, 0, 0.0, 0.0]
+
+    def walk(index, pool, my_score, best_opp, tied):
+        if index == len(opponents):
+            totals[0] += 1
+            if my_score > best_opp:
+                totals[1] += 1
+                totals[3] += 1.0
+                totals[4] += 1.0
+            elif my_score == best_opp:
+                share = 1.0 / (tied + 1)
+                totals[2] += 1
+                totals[3] += share
+                totals[4] += share * share
+            return
+        base = opponents[index]
+        for combo in combinations(pool, opp_needs[index]):
+            score = evaluate(base + list(combo))
+            if score > best_opp:
+                next_best, next_tied = score, (1 if score == my_score else 0)
+            elif score == best_opp and score == my_score:
+                next_best, next_tied = best_opp, tied + 1
+            else:
+                next_best, next_tied = best_opp, tied
+            rest = [c for c in pool if c not in combo] if index + 1 < len(opponents) else pool
+            walk(index + 1, rest, my_score, next_best, next_tied)
+
+    for mine in combinations(unseen, my_need):
+        pool = [c for c in unseen if c not in mine]
+        walk(0, pool, evaluate(my_cards + list(mine)), -1, 0)
+    return tuple(totals)
+
+
+def exact_equity(my_cards, opponents, dead_cards=(), cache=default_cache):
+    """
+    전수 열거로 정확한 에퀴티를 계산합니다. 신뢰구간 폭은 0 입니다.
+    cache 가 주어지면 무늬 동형 정규형 키로 결과를 재사용합니다.
+    """
+    start = time.perf_counter()
+    key = canonical_key(my_cards, opponents, dead_cards) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached._replace(elapsed=time.perf_counter() - start)
+
+    my_cards = list(my_cards)
+    opponents = [list(codes) for codes in opponents]
+    if opponents:
+        samples, wins, ties, eq_sum, _ = _enumerate(my_cards, opponents, unseen_cards(my_cards, opponents, dead_cards))
+    else:
+        samples, wins, ties, eq_sum = 1, 1, 0, 1.0
+    equity = eq_sum / samples
+    result = EquityResult(wins / samples, ties / samples, equity, equity, equity, samples,
+                          time.perf_counter() - start)
+    if key is not None:
+        cache.put(key, result)
+    return result
+
+
+def _get_pool(workers):
+    """호출마다 프로세스를 새로 띄우지 않도록 풀을 모듈 단위로 재사용합니다."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+class _Tally:
+    def __init__(self):
+        self.samples = self.wins = self.ties = 0
+        self.eq_sum = self.eq_sq = 0.0
+
+    def add(self, part):
+        samples, wins, ties, eq_sum, eq_sq = part
+        self.samples += samples
+        self.wins += wins
+        self.ties += ties
+        self.eq_sum += eq_sum
+        self.eq_sq += eq_sq
+
+    def half_width(self, z):
+        if self.samples < 2:
+            return math.inf
+        mean = self.eq_sum / self.samples
+        var = max(self.eq_sq / self.samples - mean * mean, 0.0)
+        return z * math.sqrt(var / self.samples)
+
+    def result(self, z, elapsed):
+        if self.samples == 0:
+            return EquityResult(0.0, 0.0, 0.0, 0.0, 1.0, 0, elapsed)
+        equity = self.eq_sum / self.samples
+        half = self.half_width(z)
+        return EquityResult(self.wins / self.samples, self.ties / self.samples, equity,
+                            max(equity - half, 0.0), min(equity + half, 1.0), self.samples, elapsed)
+
+
+def equity_from_cards(my_cards, opponents, dead_cards=(), samples=10000, target_ci=0.01,
+                      time_budget=None, workers=1, batch_size=500, confidence=0.95, seed=None,
+                      exact_threshold=EXACT_THRESHOLD, cache=default_cache):
+    """
+    카드 코드 기준 에퀴티 추정. 남은 경우의 수가 exact_threshold 이하이면 exact_equity 로 전수 열거하고,
+    아니면 몬테카를로 표본을 뽑습니다.
+    - samples: 최대 표본 수
+    - target_ci: 신뢰구간 반폭이 이 값 이하가 되면 조기 종료 (None 이면 끝까지)
+    - time_budget: 호출당 최대 소요 시간(초). 넘기면 그때까지의 결과를 반환
+    - workers: 2 이상이면 프로세스 풀에 배치를 나눠 병렬 실행
+    """
+    if exact_threshold and enumeration_cost(my_cards, opponents, dead_cards) <= exact_threshold:
+        return exact_equity(my_cards, opponents, dead_cards, cache=cache)
+
+    start = time.perf_counter()
+    deadline = start + time_budget if time_budget is not None else math.inf
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    unseen = unseen_cards(my_cards, opponents, dead_cards)
+    my_cards = list(my_cards)
+    opponents = [list(codes) for codes in opponents]
+    root = random.Random(seed)
+    tally = _Tally()
+
+    def done():
+        if tally.samples >= samples or time.perf_counter() >= deadline:
+            return True
+        return target_ci is not None and tally.half_width(z) <= target_ci
+
+    if not opponents:
+        tally.add((1, 1, 0, 1.0, 1.0))
+        return tally.result(z, time.perf_counter() - start)
+
+    if workers <= 1:
+        while not done():
+            n = min(batch_size, samples - tally.samples)
+            tally.add(_simulate(my_cards, opponents, unseen, n, root.getrandbits(64)))
+        return tally.result(z, time.perf_counter() - start)
+
+    pool = _get_pool(workers)
+    pending = set()
+    submitted = 0
+    while True:
+        while len(pending) < workers and submitted < samples:
+            n = min(batch_size, samples - submitted)
+            pending.add(pool.submit(_simulate, my_cards, opponents, unseen, n, root.getrandbits(64)))
+            submitted += n
+        if not pending:
+            break
+        timeout = None if deadline == math.inf else max(deadline - time.perf_counter(), 0.0)
+        finished, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in finished:
+            tally.add(future.result())
+        if done():
+            break
+    for future in pending:
+        future.cancel()
+    return tally.result(z, time.perf_counter() - start)
+
+
+def estimate_equity(state, **kwargs):
+    """get_ai_state 상태에서 바로 에퀴티를 추정합니다. 인자는 equity_from_cards 와 같습니다."""
+    my_cards, opponents, dead_cards = parse_state(state)
+    return equity_from_cards(my_cards, opponents, dead_cards, **kwargs)
@@ -0,0 +1,176 @@
+import json
+import struct
+from collections import deque, namedtuple
+
+from hand_evaluator import code_to_str
+
+# --- 게임 이벤트와 이벤트 싱크 ---
+# PokerGame 은 판 진행 중 작은 이벤트 튜플만 싱크로 보내고, 실제 기록(메모리/JSONL/바이너리)은 싱크가 맡습니다.
+# 파일 싱크는 이벤트를 버퍼에 모았다가 판이 끝날 때(end_hand) 한 번에 씁니다.
+
+ACTIONS = ("FOLD", "CALL", "QUARTER", "HALF", "BBING")
+ACTION_INDEX = {a: i for i, a in enumerate(ACTIONS)}
+STREETS = ("4구", "5구", "6구", "7구(히든)")
+
+HandStartEvent = namedtuple("HandStartEvent", "num_players ante")
+DealEvent = namedtuple("DealEvent", "seat card public")
+DiscardEvent = namedtuple("DiscardEvent", "seat discarded revealed")
+StreetEvent = namedtuple("StreetEvent", "street")
+ActionEvent = namedtuple("ActionEvent", "seat action amount pot all_in")
+ShowdownEvent = namedtuple("ShowdownEvent", "pot_index amount winners share")
+ResultEvent = namedtuple("ResultEvent", "seat chips")
+
+# 이벤트 타입 <-> (이름, 바이너리 종류 번호)
+EVENT_TYPES = (HandStartEvent, DealEvent, DiscardEvent, StreetEvent, ActionEvent, ShowdownEvent, ResultEvent)
+EVENT_NAMES = {HandStartEvent: "hand_start", DealEvent: "deal", DiscardEvent: "discard", StreetEvent: "street",
+               ActionEvent: "action", ShowdownEvent: "showdown", ResultEvent: "result"}
+_EVENT_KIND = {t: i for i, t in enumerate(EVENT_TYPES)}
+_CARD_FIELDS = {"card", "discarded", "revealed"}
+
+# 바이너리 레코드: 종류(u8) 좌석(u8) x(i16) y(i32) z(i32) = 12바이트 고정폭
+RECORD = struct.Struct("<BBhii")
+
+
+def encode_event(event):
+    """이벤트 하나를 12바이트 고정폭 레코드로 변환합니다."""
+    kind = _EVENT_KIND[type(event)]
+    if isinstance(event, HandStartEvent):
+        return RECORD.pack(kind, 0, event.num_players, event.ante, 0)
+    if isinstance(event, DealEvent):
+        return RECORD.pack(kind, event.seat, event.card, int(event.public), 0)
+    if isinstance(event, DiscardEvent):
+        return RECORD.pack(kind, event.seat, event.discarded, event.revealed, 0)
+    if isinstance(event, StreetEvent):
+        return RECORD.pack(kind, 0, event.street, 0, 0)
+    if isinstance(event, ActionEvent):
+        return RECORD.pack(kind, event.seat, ACTION_INDEX[event.action] | (int(event.all_in) << 8),
+                           event.amount, event.pot)
+    if isinstance(event, ShowdownEvent):
+        winners = 0
+        for seat in event.winners:
+            winners |= 1 << seat
+        return RECORD.pack(kind, event.pot_index, winners, event.amount, event.share)
+    return RECORD.pack(kind, event.seat, 0, event.chips, 0)
+
+
+def decode_event(record):
+    """encode_event 의 역변환."""
+    kind, seat, x, y, z = RECORD.unpack(record)
+    event_type = EVENT_TYPES[kind]
+    if event_type is HandStartEvent:
+        return HandStartEvent(x, y)
+    if event_type is DealEvent:
+        return DealEvent(seat, x, bool(y))
+    if event_type is DiscardEvent:
+        return DiscardEvent(seat, x, y)
+    if event_type is StreetEvent:
+        return StreetEvent(x)
+    if event_type is ActionEvent:
+        return ActionEvent(seat, ACTIONS[x & 0xFF], y, z, bool(x >> 8))
+    if event_type is ShowdownEvent:
+        return ShowdownEvent(seat, y, tuple(s for s in range(16) if x >> s & 1), z)
+    return ResultEvent(seat, y)
+
+
+def event_to_dict(event):
+    """JSON 기록용 딕셔너리. 카드는 'SA' 같은 문자열로 씁니다."""
+    data = {"type": EVENT_NAMES[type(event)]}
+    for field, value in zip(event._fields, event):
+        data[field] = code_to_str(value) if field in _CARD_FIELDS else value
+    return data
+
+
+class EventSink:
+    """싱크 인터페이스. active 가 False 면 게임이 이벤트 객체 생성 자체를 건너뜁니다."""
+    active = True
+
+    def emit(self, event):
+        raise NotImplementedError
+
+    def end_hand(self):
+        """판이 끝날 때 호출됩니다. 버퍼가 있는 싱크는 여기서 한 번에 씁니다."""
+
+    def close(self):
+        self.end_hand()
+
+
+class NullSink(EventSink):
+    active = False
+
+    def emit(self, event):
+        pass
+
+
+class RingBufferSink(EventSink):
+    """최근 maxlen 개의 이벤트만 메모리에 보관합니다."""
+
+    def __init__(self, maxlen=10000):
+        self.events = deque(maxlen=maxlen)
+
+    def emit(self, event):
+        self.events.append(event)
+
+
+class TeeSink(EventSink):
+    """이벤트를 여러 싱크에 그대로 나눠 보냅니다 (예: 파일 기록 + range_model.RangeTracker)."""
+
+    def __init__(self, *sinks):
+        self.sinks = [s for s in sinks if s.active]
+        self.active = bool(self.sinks)
+
+    def emit(self, event):
+        for sink in self.sinks:
+            sink.emit(event)
+
+    def end_hand(self):
+        for sink in self.sinks:
+            sink.end_hand()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class JsonlSink(EventSink):
+    """이벤트를 한 줄에 하나씩 JSON 으로 기록합니다. 판이 끝날 때마다 파일을 한 번만 열어 덧붙입니다."""
+
+    def __init__(self, path):
+        self.path = path
+        self.buffer = []
+
+    def emit(self, event):
+        self.buffer.append(event)
+
+    def end_hand(self):
+        if not self.buffer:
+            return
+        lines = [json.dumps(event_to_dict(e), ensure_ascii=False) for e in self.buffer]
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        self.buffer.clear()
+
+
+class BinarySink(EventSink):
+    """이벤트를 12바이트 고정폭 레코드로 기록합니다. 판이 끝날 때마다 한 번에 덧붙입니다."""
+
+    def __init__(self, path):
+        self.path = path
+        self.buffer = bytearray()
+
+    def emit(self, event):
+        self.buffer += encode_event(event)
+
+    def end_hand(self):
+        if not self.buffer:
+            return
+        with open(self.path, 'ab') as f:
+            f.write(self.buffer)
+        self.buffer.clear()
+
+
+def read_binary_events(path):
+    """BinarySink 파일의 이벤트를 순서대로 돌려줍니다."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    for offset in range(0, len(data) - RECORD.size + 1, RECORD.size):
+        yield decode_event(data[offset:offset + RECORD.size])
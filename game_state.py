@@ -0,0 +1,318 @@
+import random
+
+from events import ACTION_INDEX
+from hand_evaluator import CODE_OF_STR, evaluate
+from settlement import settle
+
+# --- 탐색/롤아웃용 순수 게임 상태 ---
+# PokerGame 한 판의 규칙(앤티, 4장 딜, 버리기/공개, 4구~7구 딜과 베팅 라운드, 사이드 팟 결산)을 부수 효과 없이
+# 평평한 리스트와 정수만으로 다시 구현합니다. 로그/이벤트/에이전트 호출이 없으므로 복사해서 미래를 시뮬레이션할 수 있습니다.
+#
+#   clone()   : 좌석 수 길이의 리스트 몇 개만 복사 (카드는 튜플, 덱 순서는 바뀌지 않으므로 복사본끼리 공유)
+#   legal_actions() / apply(action) / undo() : apply 는 되돌리기 기록을 쌓고 undo 가 한 단계씩 되돌립니다.
+#   playout(rng) : 되돌리기 기록 없이 무작위 액션으로 판 끝까지 진행 (롤아웃)
+#
+# 액션: 베팅은 events.ACTIONS 인덱스(FOLD=0 .. BBING=4), 버리기는 (버릴 번호, 공개할 번호) 튜플.
+# 덱이 없으면(deck=None) 카드 없이 베팅만 진행하고, 결산 점수는 payoffs(scores) 로 밖에서 줍니다 (cfr.py).
+
+FOLD, CALL, QUARTER, HALF, BBING = (ACTION_INDEX[a] for a in ("FOLD", "CALL", "QUARTER", "HALF", "BBING"))
+DISCARD, BETTING, FINISHED = range(3)
+STREET_PUBLIC = (True, True, True, False) # 4구, 5구, 6구 공개 / 7구 히든
+NUM_STREETS = len(STREET_PUBLIC)
+DISCARD_OPTIONS = tuple((d, r) for d in range(4) for r in range(4) if d != r)
+
+
+class GameState:
+    __slots__ = ("chips", "invested", "current_bet", "folded", "all_in", "hidden", "public", "pot",
+                 "current_highest_bet", "ante", "deck", "top", "phase", "street", "acting", "idx", "to_act", "raises",
+                 "seat", "history")
+
+    def __init__(self, chips, ante=1, deck=None):
+        """
+        새 판: 앤티를 걷고 deck 이 있으면 4장씩 돌린 뒤 0번 좌석의 버리기 결정에서 멈춥니다.
+        :param chips: 좌석별 앤티 전 칩
+        :param deck: 카드 코드 목록. poker_env.Deck.order 처럼 뒤에서부터 뽑습니다. None 이면 카드 없이 베팅만.
+        """
+        n = len(chips)
+        self.chips = [c - ante for c in chips]
+        self.invested = [ante] * n
+        self.current_bet = [0] * n
+        self.folded = [False] * n
+        self.all_in = [False] * n
+        self.hidden = [()] * n
+        self.public = [()] * n
+        self.pot = ante * n
+        self.current_highest_bet = 0
+        self.ante = ante
+        self.deck = deck
+        self.top = len(deck) if deck is not None else 0
+        self.street = -1
+        self.acting = ()
+        self.idx = self.to_act = self.raises = 0
+        self.history = []
+        if deck is None:
+            self._next_street()
+            return
+        for _ in range(4):
+            for seat in range(n):
+                self.hidden[seat] += (self._draw(),)
+        self.phase = DISCARD
+        self.seat = 0
+
+    @classmethod
+    def from_game(cls, game, decision):
+        """
+        PokerGame 이 decision(Decision) 을 요청하고 있는 시점의 상태를 복사합니다.
+        이번 스트리트에서 몇 번 레이즈됐는지는 PokerGame 이 세지 않으므로 raises 는 0 으로 둡니다.
+        """
+        state = cls.__new__(cls)
+        players = game.players
+        state.chips = [p.chips for p in players]
+        state.invested = [p.invested for p in players]
+        state.current_bet = [p.current_bet for p in players]
+        state.folded = [p.is_folded for p in players]
+        state.all_in = [p.is_all_in for p in players]
+        state.hidden = [tuple(c.code for c in p.hidden_cards) for p in players]
+        state.public = [tuple(c.code for c in p.public_cards) for p in players]
+        state.pot = game.pot
+        state.current_highest_bet = game.current_highest_bet
+        state.ante = game.ante
+        state.deck = list(game.deck.order)
+        state.top = game.deck.top
+        state.street = game.street
+        state.raises = 0
+        state.history = []
+        state.seat = decision.player.seat
+        if decision.kind == "discard":
+            state.phase = DISCARD
+            state.acting, state.idx, state.to_act = (), 0, 0
+        else:
+            acting, state.to_act, state.idx = game.cursor
+            state.phase = BETTING
+            state.acting = tuple(p.seat for p in acting)
+        return state
+
+    @classmethod
+    def from_ai_state(cls, state):
+        """
+        get_ai_state 딕셔너리(베팅 결정 시점)에서 그 좌석이 아는 것만으로 상태를 만듭니다.
+        상대 히든 카드와 덱은 알 수 없으므로 비워 둡니다 (deck=None). 카드를 채우는 것은 호출하는 쪽의 몫입니다 (mcts.py).
+        폴드/올인한 좌석은 라운드 진행 중 어차피 건너뛰므로, 행동 순서는 지금 행동 가능한 좌석만으로 다시 만듭니다.
+        """
+        opponents = sorted(state["opponents"].values(), key=lambda opp: opp["seat"])
+        me = state["my_seat"]
+        n = len(opponents) + 1
+        result = cls.__new__(cls)
+        result.chips, result.invested, result.current_bet = [0] * n, [0] * n, [0] * n
+        result.folded, result.all_in = [False] * n, [False] * n
+        result.hidden, result.public = [()] * n, [()] * n
+        for opp in opponents:
+            seat = opp["seat"]
+            result.chips[seat], result.invested[seat] = opp["chips"], opp["invested"]
+            result.current_bet[seat] = opp["current_bet"]
+            result.folded[seat], result.all_in[seat] = opp["is_folded"], opp["is_all_in"]
+            result.public[seat] = tuple(CODE_OF_STR[c] for c in opp["public_cards"])
+        result.chips[me], result.invested[me] = state["my_chips"], state["my_invested"]
+        result.current_bet[me] = state["my_current_bet"]
+        result.hidden[me] = tuple(CODE_OF_STR[c] for c in state["my_hidden_cards"])
+        result.public[me] = tuple(CODE_OF_STR[c] for c in state["my_public_cards"])
+        result.pot = state["pot"]
+        result.current_highest_bet = state["my_current_bet"] + state["call_amount"]
+        result.ante = state["ante"]
+        result.deck, result.top = None, 0
+        result.phase, result.street = BETTING, state["street"]
+        result.acting = tuple(s for s in range(n) if not result.folded[s] and not result.all_in[s])
+        result.idx, result.to_act, result.raises = result.acting.index(me), state["to_act"], 0
+        result.seat = me
+        result.history = []
+        return result
+
+    def clone(self):
+        other = GameState.__new__(GameState)
+        other.chips, other.invested, other.current_bet = self.chips[:], self.invested[:], self.current_bet[:]
+        other.folded, other.all_in = self.folded[:], self.all_in[:]
+        other.hidden, other.public = self.hidden[:], self.public[:]
+        other.pot, other.current_highest_bet, other.ante = self.pot, self.current_highest_bet, self.ante
+        other.deck, other.top, other.phase, other.street = self.deck, self.top, self.phase, self.street
+        other.acting, other.idx, other.to_act, other.raises = self.acting, self.idx, self.to_act, self.raises
+        other.seat = self.seat
+        other.history = []
+        return other
+
+    # --- 조회 ---
+    @property
+    def is_terminal(self):
+        return self.phase == FINISHED
+
+    def survivors(self):
+        return sum(1 for f in self.folded if not f)
+
+    def legal_actions(self, max_raises=None):
+        """
+        현재 좌석이 할 수 있는 액션. 베팅은 get_valid_actions 와 같은 조건과 순서입니다.
+        max_raises 가 주어지면 이번 스트리트 레이즈가 그 횟수에 닿은 뒤로는 FOLD/CALL 만 돌려줍니다 (탐색 추상화).
+        """
+        if self.phase == BETTING:
+            if max_raises is not None and self.raises >= max_raises:
+                return [FOLD, CALL]
+            seat = self.seat
+            call = self.current_highest_bet - self.current_bet[seat]
+            chips = self.chips[seat]
+            actions = [FOLD, CALL]
+            if chips >= call + self.pot * 0.5: actions.append(HALF)
+            if chips >= call + self.pot * 0.25: actions.append(QUARTER)
+            if chips >= call + self.ante: actions.append(BBING)
+            return actions
+        if self.phase == DISCARD:
+            return list(DISCARD_OPTIONS)
+        return []
+
+    def call_amount(self):
+        return self.current_highest_bet - self.current_bet[self.seat]
+
+    # --- 진행 ---
+    def apply(self, action):
+        """액션을 적용하고 undo() 용 기록을 남깁니다."""
+        self.history.append((self.chips[:], self.invested[:], self.current_bet[:], self.folded[:], self.all_in[:],
+                             self.hidden[:], self.public[:], self.pot, self.current_highest_bet, self.top, self.phase,
+                             self.street, self.acting, self.idx, self.to_act, self.raises, self.seat))
+        self.step(action)
+
+    def undo(self):
+        (self.chips, self.invested, self.current_bet, self.folded, self.all_in, self.hidden, self.public, self.pot,
+         self.current_highest_bet, self.top, self.phase, self.street, self.acting, self.idx, self.to_act, self.raises,
+         self.seat) = self.history.pop()
+
+    def step(self, action):
+        """되돌리기 기록 없이 액션을 적용합니다 (롤아웃/복사본 전용)."""
+        if self.phase == DISCARD:
+            self._discard(*action)
+        else:
+            self._bet(action)
+
+    def playout(self, rng=random, policy=None):
+        """
+        판 끝까지 진행하고 좌석별 손익을 반환합니다. policy(state, actions) 가 없으면 균등 무작위.
+        덱이 없는 상태에서는 쓸 수 없습니다 (결산 점수가 필요).
+        """
+        while self.phase != FINISHED:
+            actions = self.legal_actions()
+            self.step(policy(self, actions) if policy is not None else actions[int(rng.random() * len(actions))])
+        return self.payoffs()
+
+    def _draw(self):
+        if self.top == 0:
+            return None
+        self.top -= 1
+        return self.deck[self.top]
+
+    def _discard(self, discard_idx, reveal_idx):
+        seat = self.seat
+        hidden = self.hidden[seat]
+        self.hidden[seat] = tuple(c for i, c in enumerate(hidden) if i != discard_idx and i != reveal_idx)
+        self.public[seat] = self.public[seat] + (hidden[reveal_idx],)
+        if seat + 1 < len(self.chips):
+            self.seat = seat + 1
+        else:
+            self._next_street()
+
+    def _bet(self, action):
+        seat = self.seat
+        if action == FOLD:
+            self.folded[seat] = True
+            raised = False
+        else:
+            call = self.current_highest_bet - self.current_bet[seat]
+            if action == HALF:
+                total = call + int((self.pot + call) * 0.5)
+            elif action == QUARTER:
+                total = call + int((self.pot + call) * 0.25)
+            elif action == BBING:
+                total = call + self.ante
+            else:
+                total = call
+            if self.chips[seat] <= total:
+                total = self.chips[seat]
+                self.all_in[seat] = True
+            self.chips[seat] -= total
+            self.invested[seat] += total
+            self.current_bet[seat] += total
+            self.pot += total
+            raised = self.current_bet[seat] > self.current_highest_bet
+            if raised:
+                self.current_highest_bet = self.current_bet[seat]
+        if raised:
+            self.raises += 1
+            self.to_act = sum(1 for s in self.acting if not self.folded[s] and not self.all_in[s]) - 1
+        else:
+            self.to_act -= 1
+        self.idx = (self.idx + 1) % len(self.acting)
+        if not self._find_actor():
+            self._next_street()
+
+    def _next_street(self):
+        """다음 스트리트 카드를 돌리고 베팅 라운드를 엽니다. 베팅할 사람이 없으면 그다음 스트리트로, 끝이면 FINISHED."""
+        n = len(self.chips)
+        while True:
+            self.street += 1
+            if self.street >= NUM_STREETS or self.survivors() == 1:
+                self.phase = FINISHED
+                self.seat = None
+                return
+            if self.deck is not None:
+                is_public = STREET_PUBLIC[self.street]
+                for seat in range(n):
+                    if not self.folded[seat]:
+                        card = self._draw()
+                        if card is not None:
+                            if is_public:
+                                self.public[seat] += (card,)
+                            else:
+                                self.hidden[seat] += (card,)
+            acting = tuple(s for s in range(n) if not self.folded[s] and not self.all_in[s])
+            if len(acting) < 2:
+                continue
+            self.current_bet = [0] * n
+            self.current_highest_bet = 0
+            self.raises = 0
+            self.acting = acting
+            self.idx = 0
+            self.to_act = len(acting)
+            self.phase = BETTING
+            if self._find_actor():
+                return
+
+    def _find_actor(self):
+        """이번 라운드에서 다음으로 결정할 좌석을 self.seat 에 둡니다. 라운드가 끝났으면 False."""
+        while self.to_act > 0:
+            if self.survivors() <= 1:
+                return False
+            seat = self.acting[self.idx]
+            if self.folded[seat] or self.all_in[seat]:
+                self.idx = (self.idx + 1) % len(self.acting)
+                continue
+            self.seat = seat
+            return True
+        return False
+
+    # --- 결산 ---
+    def scores(self):
+        """살아있는 좌석의 정수 족보 점수 (폴드한 좌석은 0)."""
+        return [0 if f else evaluate(h + p) for f, h, p in zip(self.folded, self.hidden, self.public)]
+
+    def payoffs(self, scores=None):
+        """
+        판이 끝난 상태의 좌석별 손익 (받은 칩 - 투자금, PokerGame 의 보상과 같음).
+        올인한 생존자가 없고 단독 승자면 settle 없이 바로 계산합니다.
+        """
+        if scores is None:
+            scores = self.scores()
+        survivors = [s for s, f in enumerate(self.folded) if not f]
+        if len(survivors) == 1 or not any(self.all_in[s] for s in survivors):
+            best = max(survivors, key=scores.__getitem__)
+            if len(survivors) == 1 or sum(1 for s in survivors if scores[s] == scores[best]) == 1:
+                result = [-invested for invested in self.invested]
+                result[best] += self.pot
+                return result
+        settlement = settle(self.invested, self.folded, scores)
+        return [payout - invested for payout, invested in zip(settlement.payouts, self.invested)]
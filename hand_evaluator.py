@@ -0,0 +1,193 @@
+from itertools import combinations, permutations
+from operator import itemgetter
+
+# --- 테이블 기반 족보 판별기 ---
+# 카드 한 장을 0~51 정수 코드로 표현합니다: code = 랭크 인덱스(0='2' ~ 12='A') * 4 + 무늬 인덱스
+# 점수는 poker_env.evaluate_5_cards 의 튜플과 같은 순서를 갖는 정수입니다.
+#   score = (족보 랭크 << 20) | (타이브레이커1 << 16) | ... | 타이브레이커5  (각 4비트, 남는 칸은 0)
+# 5장 미만은 0 (기존 (0,)), 아직 평가하지 않은 상태는 -1 (기존 (-1,)) 입니다.
+
+SUITS = 'SHDC'
+RANKS = '23456789TJQKA'
+
+HIGH_CARD, ONE_PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+
+# 족보 랭크별 타이브레이커 개수 (점수 -> 튜플 복원용)
+_TIEBREAK_COUNT = (5, 4, 3, 3, 1, 5, 2, 2, 1)
+
+_SUIT_SHIFT = 32
+_RANK_MASK = (1 << _SUIT_SHIFT) - 1
+# 무늬별 4비트 카운터에 3을 더하면 5장 이상인 무늬의 최상위 비트가 켜집니다.
+_FLUSH_BIAS = 0x3333 << _SUIT_SHIFT
+_FLUSH_TEST = 0x8888 << _SUIT_SHIFT
+
+# 카드 코드 -> (5진법 랭크 카운트 + 무늬 카운터) 가산 키
+_KEY = tuple(5 ** (c >> 2) + (1 << (_SUIT_SHIFT + 4 * (c & 3))) for c in range(52))
+
+# 5장 연속 랭크 비트마스크 (높은 스트레이트부터). 백스트레이트(A-5-4-3-2)는 마운틴과 같은 14로 취급합니다.
+_WHEEL_MASK = (1 << 12) | 0b1111
+_STRAIGHTS = tuple((0b11111 << (top - 6), top) for top in range(14, 5, -1))
+
+
+def card_code(suit, rank):
+    """무늬('S','H','D','C')와 랭크('2'~'A') 문자로 카드 코드를 만듭니다."""
+    return RANKS.index(rank) * 4 + SUITS.index(suit)
+
+
+def code_to_str(code):
+    return SUITS[code & 3] + RANKS[code >> 2]
+
+
+CODE_OF_STR = {code_to_str(c): c for c in range(52)}
+
+# 무늬 인덱스 치환 24가지 (무늬 동형 정규화용)
+SUIT_PERMUTATIONS = tuple(permutations(range(4)))
+
+
+def code_from_str(text):
+    """'SA' 처럼 Card.__repr__ 형식의 문자열을 카드 코드로 바꿉니다."""
+    return CODE_OF_STR[text]
+
+
+def canonicalize(groups, sort_groups=False):
+    """
+    카드 코드 묶음들(예: 내 패, 상대별 공개 패)의 무늬 동형 정규형.
+    24가지 무늬 치환 중 사전순으로 가장 작은 형태를 골라, 무늬만 다른 상황이 같은 값을 갖게 합니다.
+    묶음 안의 카드 순서는 무시하며, sort_groups=True 면 묶음 사이의 순서도 무시합니다.
+    """
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        relabeled = [tuple(sorted((c & ~3) | perm[c & 3] for c in codes)) for codes in groups]
+        if sort_groups:
+            relabeled.sort()
+        relabeled = tuple(relabeled)
+        if best is None or relabeled < best:
+            best = relabeled
+    return best
+
+
+def _pack(category, values):
+    score = category
+    for v in values:
+        score = (score << 4) | v
+    return score << (4 * (5 - len(values)))
+
+
+def score_to_tuple(score):
+    """정수 점수를 기존 evaluate_5_cards 형식의 튜플로 되돌립니다."""
+    if score <= 0:
+        return (score,)
+    category = score >> 20
+    count = _TIEBREAK_COUNT[category]
+    return (category, *((score >> (16 - 4 * i)) & 0xF for i in range(count)))
+
+
+def _best_straight(rank_mask):
+    """랭크 비트마스크에서 가장 강한 스트레이트의 탑 값을 반환합니다. 없으면 0."""
+    if rank_mask & _WHEEL_MASK == _WHEEL_MASK:
+        return 14
+    for mask, top in _STRAIGHTS:
+        if rank_mask & mask == mask:
+            return top
+    return 0
+
+
+def _score_from_groups(present):
+    """
+    (장수, 값) 목록(값 내림차순, 플러시 제외)으로 5~7장 중 최고 5장 조합의 점수를 계산합니다.
+    """
+    values = [v for _, v in present]
+    groups = sorted(present, key=itemgetter(0), reverse=True)
+    top_count, top_value = groups[0]
+
+    if top_count == 4:
+        return _pack(QUADS, (top_value, values[0] if values[0] != top_value else values[1]))
+    if top_count == 3 and groups[1][0] >= 2:
+        return _pack(FULL_HOUSE, (top_value, groups[1][1]))
+
+    if len(values) >= 5:
+        rank_mask = 0
+        for v in values:
+            rank_mask |= 1 << (v - 2)
+        straight_top = _best_straight(rank_mask)
+        if straight_top:
+            return _pack(STRAIGHT, (straight_top,))
+
+    if top_count == 3:
+        return _pack(TRIPS, (top_value, *[v for v in values if v != top_value][:2]))
+    if top_count == 2 and groups[1][0] == 2:
+        high, low = top_value, groups[1][1]
+        kicker = next(v for v in values if v != high and v != low)
+        return _pack(TWO_PAIR, (high, low, kicker))
+    if top_count == 2:
+        return _pack(ONE_PAIR, (top_value, *[v for v in values if v != top_value][:3]))
+    return _pack(HIGH_CARD, values[:5])
+
+
+def _build_rank_table():
+    """5~7장의 모든 랭크 조합(무늬 무시)에 대한 점수 테이블을 만듭니다. 키는 5진법 랭크 카운트."""
+    table = {}
+    present = []
+
+    def fill(rank, remaining, key):
+        if rank < 0:
+            if remaining <= 2:
+                table[key] = _score_from_groups(present)
+            return
+        fill(rank - 1, remaining, key)
+        for n in range(1, min(4, remaining) + 1):
+            present.append((n, rank + 2))
+            fill(rank - 1, remaining - n, key + n * 5 ** rank)
+            present.pop()
+
+    fill(12, 7, 0)
+    return table
+
+
+def _build_flush_table():
+    """한 무늬의 랭크 비트마스크(13비트) -> 플러시/스트레이트 플러시 점수 테이블."""
+    table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count('1') < 5:
+            continue
+        straight_top = _best_straight(mask)
+        if straight_top:
+            table[mask] = _pack(STRAIGHT_FLUSH, (straight_top,))
+        else:
+            values = [r + 2 for r in range(12, -1, -1) if mask >> r & 1]
+            table[mask] = _pack(FLUSH, values[:5])
+    return table
+
+
+_RANK_TABLE = _build_rank_table()
+_FLUSH_TABLE = _build_flush_table()
+# 나올 수 있는 점수는 7462 가지뿐이므로 튜플 변환도 미리 만들어 둡니다 (get_best_hand 처럼 튜플이 필요한 호출용)
+_SCORE_TUPLES = {score: score_to_tuple(score) for score in {0, *_RANK_TABLE.values(), *_FLUSH_TABLE}}
+
+
+def evaluate(codes):
+    """
+    카드 코드 5~7장의 최고 족보 점수를 조합 나열 없이 한 번에 계산합니다.
+    7장 안에서 플러시가 나오면 포카드/풀하우스는 동시에 나올 수 없으므로 플러시 테이블만 보면 됩니다.
+    """
+    n = len(codes)
+    if n < 5:
+        return 0
+    if n > 7:
+        return max(evaluate(combo) for combo in combinations(codes, 7))
+
+    key = sum(map(_KEY.__getitem__, codes))
+    flush = (key + _FLUSH_BIAS) & _FLUSH_TEST
+    if flush:
+        suit = (flush.bit_length() - _SUIT_SHIFT - 4) >> 2
+        mask = 0
+        for c in codes:
+            if c & 3 == suit:
+                mask |= 1 << (c >> 2)
+        return _FLUSH_TABLE[mask]
+    return _RANK_TABLE[key & _RANK_MASK]
+
+
+def evaluate_tuple(codes):
+    """evaluate 의 결과를 evaluate_5_cards 형식의 튜플로 돌려줍니다. 반복 계산에는 정수를 주는 evaluate 가 더 빠릅니다."""
+    return _SCORE_TUPLES[evaluate(codes)]
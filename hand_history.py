@@ -0,0 +1,191 @@
+import os
+import mmap
+import struct
+
+from events import RECORD, EVENT_TYPES, EventSink, HandStartEvent, encode_event, decode_event
+
+# --- 바이너리 핸드 히스토리 (덧붙이기 전용 + 오프셋 색인) ---
+# 데이터 파일: 헤더(16바이트) 뒤에 판마다 이벤트 레코드(events.RECORD, 12바이트 고정폭)를 이어 붙입니다.
+#              모든 판은 HandStartEvent 레코드로 시작하므로 색인 없이도 앞에서부터 판을 나눌 수 있습니다.
+# 색인 파일(<경로>.idx): 헤더(16바이트) 뒤에 판마다 데이터 파일 안의 시작 오프셋(u64) 하나.
+# 판 i 는 offset[i] ~ offset[i+1] (마지막 판은 파일 끝) 구간이므로 mmap 으로 바로 꺼낼 수 있습니다.
+
+MAGIC = b"HHST"
+INDEX_MAGIC = b"HIDX"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH8x") # magic, 포맷 버전, 레코드 크기
+OFFSET = struct.Struct("<Q")
+_HAND_START_KIND = EVENT_TYPES.index(HandStartEvent)
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+def _open_append(path, magic):
+    """파일이 없으면 헤더를 써서 만들고, 있으면 헤더를 확인한 뒤 덧붙이기 모드로 엽니다."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        f = open(path, 'ab')
+        f.write(HEADER.pack(magic, FORMAT_VERSION, RECORD.size))
+        return f
+    _check_header(path, magic)
+    return open(path, 'ab')
+
+
+def _check_header(path, magic):
+    with open(path, 'rb') as f:
+        file_magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+    if file_magic != magic or version != FORMAT_VERSION or record_size != RECORD.size:
+        raise ValueError(f"핸드 히스토리 파일 형식이 맞지 않습니다: {path}")
+
+
+class HandHistorySink(EventSink):
+    """
+    판 단위로 이벤트를 모아 데이터 파일에 덧붙이고 색인에 시작 오프셋을 남기는 싱크.
+    파일은 열어 둔 채로 쓰므로 대량 시뮬레이션에서도 판마다 open/close 비용이 없습니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = _open_append(path, MAGIC)
+        self.index = _open_append(index_path(path), INDEX_MAGIC)
+        self.buffer = bytearray()
+
+    def emit(self, event):
+        self.buffer += encode_event(event)
+
+    def end_hand(self):
+        if not self.buffer:
+            return
+        self.index.write(OFFSET.pack(self.data.tell()))
+        self.data.write(self.buffer)
+        self.buffer.clear()
+
+    def flush(self):
+        self.data.flush()
+        self.index.flush()
+
+    def close(self):
+        self.end_hand()
+        self.data.close()
+        self.index.close()
+
+
+def iter_hands(path, chunk_size=1 << 20):
+    """
+    색인 없이 데이터 파일을 앞에서부터 chunk_size 바이트씩 읽으며 판(이벤트 리스트)을 하나씩 돌려줍니다.
+    메모리에는 현재 판과 읽는 중인 조각만 있습니다. 쓰다가 끊긴 마지막 레코드(온전하지 않은 꼬리)는 건너뜁니다.
+    """
+    if chunk_size < RECORD.size:
+        raise ValueError(f"chunk_size 는 레코드 크기({RECORD.size}) 이상이어야 합니다: {chunk_size}")
+    _check_header(path, MAGIC)
+    with open(path, 'rb') as f:
+        f.seek(HEADER.size)
+        chunk_size -= chunk_size % RECORD.size
+        hand = []
+        while chunk := f.read(chunk_size):
+            for offset in range(0, len(chunk) - RECORD.size + 1, RECORD.size):
+                if chunk[offset] == _HAND_START_KIND and hand:
+                    yield hand
+                    hand = []
+                hand.append(decode_event(chunk[offset:offset + RECORD.size]))
+        if hand:
+            yield hand
+
+
+def rebuild_index(path):
+    """데이터 파일을 훑어 색인 파일을 다시 만듭니다 (색인이 없거나 손상됐을 때). 판 수를 반환합니다."""
+    count = 0
+    with open(path, 'rb') as f, open(index_path(path), 'wb') as idx:
+        idx.write(HEADER.pack(INDEX_MAGIC, FORMAT_VERSION, RECORD.size))
+        f.seek(HEADER.size)
+        position = HEADER.size
+        while chunk := f.read(RECORD.size * 65536):
+            for i in range(0, len(chunk) - RECORD.size + 1, RECORD.size):
+                if chunk[i] == _HAND_START_KIND:
+                    idx.write(OFFSET.pack(position + i))
+                    count += 1
+            position += len(chunk)
+    return count
+
+
+class HandHistory:
+    """
+    메모리 맵 기반 임의 접근 리더. history[i] 는 i 번째 판의 이벤트 리스트, len(history) 는 판 수입니다.
+    파일 전체를 읽지 않고 필요한 판의 바이트만 페이지 단위로 올라옵니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        _check_header(path, MAGIC)
+        if not os.path.exists(index_path(path)):
+            rebuild_index(path)
+        _check_header(index_path(path), INDEX_MAGIC)
+        self._data_file = open(path, 'rb')
+        self._index_file = open(index_path(path), 'rb')
+        self.data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = (len(self.index) - HEADER.size) // OFFSET.size
+        # 쓰다가 끊긴 마지막 레코드가 있으면 그 앞(마지막 온전한 레코드 끝)까지만 씁니다
+        self._end = len(self.data) - (len(self.data) - HEADER.size) % RECORD.size
+
+    def __len__(self):
+        return self._count
+
+    def hand_bounds(self, i):
+        """i 번째 판의 데이터 파일 내 (시작, 끝) 바이트 오프셋."""
+        if not -self._count <= i < self._count:
+            raise IndexError(i)
+        i %= self._count
+        start = OFFSET.unpack_from(self.index, HEADER.size + i * OFFSET.size)[0]
+        if i + 1 < self._count:
+            end = OFFSET.unpack_from(self.index, HEADER.size + (i + 1) * OFFSET.size)[0]
+        else:
+            end = self._end
+        return start, end
+
+    def raw(self, i):
+        """i 번째 판의 레코드 바이트 (복사 없는 memoryview). close() 뒤에도 쓰려면 bytes(...) 로 복사하세요."""
+        start, end = self.hand_bounds(i)
+        return memoryview(self.data)[start:end]
+
+    def __getitem__(self, i):
+        raw = self.raw(i)
+        return [decode_event(raw[o:o + RECORD.size]) for o in range(0, len(raw), RECORD.size)]
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def records(self, copy=False):
+        """
+        헤더 뒤 모든 레코드를 numpy 구조화 배열 뷰로 돌려줍니다 (학습 데이터 일괄 스캔용).
+        기본은 복사 없는 뷰이고, copy=True 면 파일과 무관한 배열을 돌려줍니다.
+        필드: kind, seat, x, y, z (events.RECORD 와 같은 배치)
+        """
+        import numpy as np # 일괄 스캔할 때만 필요
+        dtype = np.dtype([("kind", "u1"), ("seat", "u1"), ("x", "<i2"), ("y", "<i4"), ("z", "<i4")])
+        records = np.frombuffer(self.data, dtype=dtype, count=(self._end - HEADER.size) // RECORD.size,
+                                offset=HEADER.size)
+        return records.copy() if copy else records
+
+    def close(self):
+        """
+        파일을 닫습니다. raw()/records() 뷰가 아직 남아 있으면 메모리 맵은 그 뷰들이 모두 사라질 때 해제되고,
+        그동안 뷰는 계속 읽을 수 있습니다.
+        """
+        for m in (self.data, self.index):
+            try:
+                m.close()
+            except BufferError:
+                pass # 내보낸 뷰가 있음: 참조만 놓고 해제는 마지막 뷰에 맡깁니다
+        self.data = self.index = None
+        self._count = 0
+        self._data_file.close()
+        self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
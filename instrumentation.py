@@ -0,0 +1,161 @@
+import json
+import cProfile
+import pstats
+
+# --- 선택적 계측 (타이머 / 카운터 / 결정 지연 히스토그램 / 주기적 프로파일) ---
+# PokerGame.instruments 가 None(기본)이면 계측 지점마다 None 검사 한 번만 하고 지나갑니다.
+# Instrumentation 을 넘기면 단계별 누적 시간, 에이전트별 결정 지연 분포, N 판마다의 cProfile 결과를 모읍니다.
+#
+# 단계 이름: deal, get_ai_state, choose_action, choose_discard, apply_action, log(싱크 기록), resolve_showdown
+# 모든 상태는 기본 자료형이라 프로세스 간에 pickle 로 넘겨 merge() 할 수 있습니다.
+
+NUM_BUCKETS = 64 # 지연 히스토그램: 버킷 b 는 [2^(b-1), 2^b) 나노초
+
+
+class Instrumentation:
+    def __init__(self, profile_every=0, profile_top=25, hand_offset=0):
+        """
+        :param profile_every: 0 보다 크면 그 판 수마다 한 판을 cProfile 로 프로파일링합니다.
+        :param profile_top: 보고서에 넣을 프로파일 상위 함수 수 (누적 시간 기준).
+        :param hand_offset: 첫 판의 전체 판 번호. 여러 워커가 판을 나눠 돌 때 표본 추출이 전체 판 수 기준으로 이어지게 합니다.
+        """
+        self.timers = {} # 단계 -> [횟수, 누적 ns]
+        self.counters = {}
+        self.latency = {} # 에이전트 이름 -> 결정 지연 버킷별 횟수
+        self.hands = 0
+        self.profile_every = profile_every
+        self.profile_top = profile_top
+        self.hand_offset = hand_offset
+        self.profile = {} # "파일:줄(함수)" -> [호출 수, 자체 시간, 누적 시간]
+        self.profiled_hands = 0
+        self._profiler = None
+
+    # --- 기록 ---
+    def add(self, phase, elapsed_ns):
+        timer = self.timers.get(phase)
+        if timer is None:
+            timer = self.timers[phase] = [0, 0]
+        timer[0] += 1
+        timer[1] += elapsed_ns
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def decision(self, agent_name, elapsed_ns, phase="choose_action"):
+        """에이전트 결정 한 번. 단계 합계와 에이전트별 단계, 액션 결정이면 지연 히스토그램에 넣습니다."""
+        self.add(phase, elapsed_ns)
+        self.add(f"{phase}[{agent_name}]", elapsed_ns)
+        if phase == "choose_action":
+            buckets = self.latency.get(agent_name)
+            if buckets is None:
+                buckets = self.latency[agent_name] = [0] * NUM_BUCKETS
+            buckets[min(elapsed_ns.bit_length(), NUM_BUCKETS - 1)] += 1
+
+    def begin_hand(self):
+        if self.profile_every and (self.hand_offset + self.hands) % self.profile_every == 0:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def end_hand(self):
+        self.hands += 1
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._collect_profile(self._profiler)
+            self._profiler = None
+
+    def _collect_profile(self, profiler):
+        self.profiled_hands += 1
+        for (filename, line, func), (_, ncalls, tottime, cumtime, _) in pstats.Stats(profiler).stats.items():
+            entry = self.profile.setdefault(f"{filename}:{line}({func})", [0, 0.0, 0.0])
+            entry[0] += ncalls
+            entry[1] += tottime
+            entry[2] += cumtime
+
+    def merge(self, other):
+        """다른 프로세스에서 모은 계측을 더합니다."""
+        for phase, (count, total) in other.timers.items():
+            timer = self.timers.setdefault(phase, [0, 0])
+            timer[0] += count
+            timer[1] += total
+        for name, n in other.counters.items():
+            self.count(name, n)
+        for name, buckets in other.latency.items():
+            mine = self.latency.setdefault(name, [0] * NUM_BUCKETS)
+            for b, n in enumerate(buckets):
+                mine[b] += n
+        for key, (ncalls, tottime, cumtime) in other.profile.items():
+            entry = self.profile.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += ncalls
+            entry[1] += tottime
+            entry[2] += cumtime
+        self.hands += other.hands
+        self.profiled_hands += other.profiled_hands
+        return self
+
+    # --- 보고서 ---
+    @staticmethod
+    def _percentile_us(buckets, q):
+        """버킷 히스토그램의 q 분위수 (버킷 상한, 마이크로초)."""
+        total = sum(buckets)
+        if not total:
+            return 0.0
+        threshold = q * total
+        seen = 0
+        for b, n in enumerate(buckets):
+            seen += n
+            if seen >= threshold:
+                return (1 << b) / 1000
+        return (1 << (NUM_BUCKETS - 1)) / 1000
+
+    def report(self):
+        total_ns = sum(t for phase, (_, t) in self.timers.items() if "[" not in phase)
+        phases = {}
+        for phase, (count, elapsed) in sorted(self.timers.items(), key=lambda item: -item[1][1]):
+            phases[phase] = {
+                "count": count,
+                "total_ms": elapsed / 1e6,
+                "mean_us": elapsed / count / 1e3 if count else 0.0,
+                "share": elapsed / total_ns if total_ns and "[" not in phase else None,
+            }
+        decisions = {}
+        for name, buckets in self.latency.items():
+            decisions[name] = {
+                "count": sum(buckets),
+                "p50_us": self._percentile_us(buckets, 0.5),
+                "p90_us": self._percentile_us(buckets, 0.9),
+                "p99_us": self._percentile_us(buckets, 0.99),
+                "histogram": {f"<{(1 << b) / 1000:g}us": n for b, n in enumerate(buckets) if n},
+            }
+        top = sorted(self.profile.items(), key=lambda item: -item[1][2])[:self.profile_top]
+        return {
+            "hands": self.hands,
+            "phases": phases,
+            "counters": dict(self.counters),
+            "decision_latency": decisions,
+            "profile": {
+                "hands": self.profiled_hands,
+                "top_cumulative": [{"function": key, "ncalls": n, "tottime": tt, "cumtime": ct}
+                                   for key, (n, tt, ct) in top],
+            },
+        }
+
+    def format_report(self):
+        report = self.report()
+        lines = [f"=== 계측 결과 ({report['hands']}판) ==="]
+        for phase, p in report["phases"].items():
+            share = f" ({p['share'] * 100:.1f}%)" if p["share"] is not None else ""
+            lines.append(f"  {phase}: {p['count']}회 | 합계 {p['total_ms']:.1f}ms{share} | 평균 {p['mean_us']:.1f}us")
+        for name, d in report["decision_latency"].items():
+            lines.append(f"  [{name}] 결정 {d['count']}회 | p50 <{d['p50_us']:g}us | p90 <{d['p90_us']:g}us"
+                         f" | p99 <{d['p99_us']:g}us")
+        for name, n in report["counters"].items():
+            lines.append(f"  {name}: {n}")
+        if report["profile"]["hands"]:
+            lines.append(f"  --- 프로파일 ({report['profile']['hands']}판, 누적 시간 상위) ---")
+            for entry in report["profile"]["top_cumulative"][:10]:
+                lines.append(f"  {entry['cumtime'] * 1e3:8.2f}ms {entry['ncalls']:7d}회  {entry['function']}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=4)
@@ -0,0 +1,247 @@
+import math
+import time
+import random
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from agent import PokerAgent
+from events import ACTIONS, ACTION_INDEX
+from game_state import GameState, CALL, BETTING, FINISHED, NUM_STREETS
+from starting_hands import StartingHandMixin, to_card_code
+
+# --- 정보 집합 몬테카를로 트리 탐색(ISMCTS) 에이전트 ---
+# 결정마다 get_ai_state 로 아는 것만 담은 GameState(GameState.from_ai_state) 를 만들고, 반복마다
+#   1. 결정화: 보이지 않는 카드(덱 - 내 카드 - 모든 공개 카드 - 내가 버린 카드)에서 살아있는 상대의 히든 카드와
+#      남은 스트리트 카드를 무작위로 뽑아 채운 상태를 하나 만듭니다.
+#   2. 선택/확장: 트리는 카드가 아니라 액션 순서로만 가지를 칩니다 (single-observer ISMCTS). 노드마다 그 자리에서
+#      결정하는 좌석의 손익을 기준으로 UCB1 을 적용하고, 처음 가 보는 액션 하나를 펼칩니다.
+#   3. 롤아웃: 남은 결정은 모두 CALL 로 쇼다운까지 진행 (무작위 롤아웃은 폴드가 너무 잦아 손익이 거의 정보가 없음).
+#   4. 역전파: 경로의 각 노드에 그 노드로 들어온 좌석의 손익을 더합니다.
+# 시간 예산(time_budget 초)이 다하거나 max_iterations 에 닿으면 루트에서 가장 많이 방문한 액션을 고릅니다.
+#
+# 트리 재사용: 같은 판의 다음 결정에서는 지난 루트에서 내 액션을 따라간 뒤, 그 사이 상대들이 한 액션을
+# 공개 베팅 상태(칩/투자금/폴드/올인)가 지금과 같아지는 순서를 찾아 내려가 그 노드를 새 루트로 씁니다.
+# 루트 병렬: workers 가 2 이상이면 다른 프로세스들(workers - 1 개)이 같은 루트에서 같은 시간 동안 독립된 트리를 키우고,
+# 루트 자식별 방문 수를 이 프로세스의 트리와 합쳐서 고릅니다.
+
+_pool = None
+_pool_workers = 0
+
+
+class _Node:
+    __slots__ = ("children", "seat", "visits", "total")
+
+    def __init__(self, seat=None):
+        self.children = {} # 액션 인덱스 -> _Node
+        self.seat = seat # 이 노드로 들어오는 액션을 고른 좌석 (루트는 None)
+        self.visits = 0
+        self.total = 0.0 # seat 좌석 손익 합
+
+
+def unseen_codes(root, dead=()):
+    """root(GameState.from_ai_state) 에서 결정하는 좌석이 볼 수 없는 카드 코드 목록."""
+    known = set(dead)
+    known.update(root.hidden[root.seat])
+    for cards in root.public:
+        known.update(cards)
+    return [c for c in range(52) if c not in known]
+
+
+def determinize(root, unseen, rng):
+    """
+    root 의 복사본에 살아있는 상대의 히든 카드와 남은 스트리트에서 돌릴 카드를 무작위로 채웁니다.
+    상대 히든 카드는 버리기 후 2장, 7구를 받았으면 3장입니다. 폴드한 좌석의 패는 결과에 영향이 없으므로 비워 둡니다.
+    """
+    state = root.clone()
+    live = [s for s in range(len(state.folded)) if not state.folded[s]]
+    hidden_count = 3 if state.street >= NUM_STREETS - 1 else 2
+    opponents = [s for s in live if s != state.seat]
+    need = min(len(opponents) * hidden_count + (NUM_STREETS - 1 - state.street) * len(live), len(unseen))
+    cards = rng.sample(unseen, need)
+    for i, seat in enumerate(opponents):
+        state.hidden[seat] = tuple(cards[i * hidden_count:(i + 1) * hidden_count])
+    state.deck = cards[len(opponents) * hidden_count:]
+    state.top = len(state.deck)
+    return state
+
+
+def _rollout(state):
+    while state.phase != FINISHED:
+        state.step(CALL)
+    return state.payoffs()
+
+
+def search(root, tree, unseen, rng, time_budget=None, max_iterations=None, exploration=0.7):
+    """
+    root 에서 tree(_Node) 를 키웁니다. time_budget(초)과 max_iterations 중 먼저 닿는 쪽에서 멈추고 반복 수를 반환합니다.
+    UCB 탐험 항은 루트 팟 크기로 손익 단위를 맞춥니다.
+    """
+    deadline = time.perf_counter() + time_budget if time_budget is not None else math.inf
+    limit = max_iterations if max_iterations is not None else math.inf
+    scale = exploration * max(root.pot, root.ante, 1)
+    iterations = 0
+    while iterations < limit and (iterations == 0 or time.perf_counter() < deadline):
+        state = determinize(root, unseen, rng)
+        node = tree
+        path = [node]
+        # 선택: 모든 액션을 펼친 노드에서는 UCB1, 아니면 아직 안 가 본 액션 하나를 펼치고 롤아웃
+        while state.phase == BETTING:
+            actions = state.legal_actions()
+            untried = [a for a in actions if a not in node.children]
+            if untried:
+                action = untried[int(rng.random() * len(untried))]
+                child = node.children[action] = _Node(state.seat)
+                state.step(action)
+                path.append(child)
+                break
+            log_n = math.log(node.visits)
+            best, best_value = None, -math.inf
+            for action in actions:
+                child = node.children[action]
+                value = child.total / child.visits + scale * math.sqrt(log_n / child.visits)
+                if value > best_value:
+                    best, best_value = action, value
+            node = node.children[best]
+            state.step(best)
+            path.append(node)
+        payoffs = _rollout(state)
+        for visited in path:
+            visited.visits += 1
+            if visited.seat is not None:
+                visited.total += payoffs[visited.seat]
+        iterations += 1
+    return iterations
+
+
+def root_visits(tree):
+    """루트 자식별 방문 수. 루트 병렬 결과를 합칠 때 씁니다."""
+    return {action: child.visits for action, child in tree.children.items()}
+
+
+def _search_task(task):
+    root, unseen, seed, time_budget, max_iterations, exploration = task
+    tree = _Node()
+    search(root, tree, unseen, random.Random(seed), time_budget, max_iterations, exploration)
+    return root_visits(tree)
+
+
+def _get_pool(workers):
+    """결정마다 프로세스를 새로 띄우지 않도록 풀을 모듈 단위로 재사용합니다 (equity._get_pool 과 같은 방식)."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def _same_betting_state(a, b):
+    return (a.street == b.street and a.seat == b.seat and a.invested == b.invested and a.folded == b.folded
+            and a.all_in == b.all_in)
+
+
+def follow(previous, node, target, max_depth=32, deadline=math.inf):
+    """
+    previous(지난 루트 상태, 내 액션 적용 후)에서 액션을 따라가며 공개 베팅 상태가 target 과 같아지는 노드를 찾습니다.
+    투자금과 폴드는 되돌릴 수 없으므로 target 을 넘어선 가지는 바로 버립니다. 트리에 없는 가지로 가면 빈 노드를 돌려줍니다.
+    찾지 못하거나 max_depth 또는 deadline(perf_counter 기준)에 닿으면 None.
+    """
+    if previous.phase == FINISHED or max_depth == 0 or time.perf_counter() >= deadline:
+        return None
+    if previous.phase == BETTING and _same_betting_state(previous, target):
+        return node
+    for seat, invested in enumerate(previous.invested):
+        if invested > target.invested[seat] or (previous.folded[seat] and not target.folded[seat]):
+            return None
+    for action in previous.legal_actions():
+        state = previous.clone()
+        state.step(action)
+        child = node.children.get(action)
+        found = follow(state, child if child is not None else _Node(previous.seat), target, max_depth - 1, deadline)
+        if found is not None:
+            return found
+    return None
+
+
+class MCTSAgent(StartingHandMixin, PokerAgent):
+    """
+    시간 예산 안에서 ISMCTS 로 베팅을 고르는 에이전트.
+    버리기/공개는 시작 패 표(starting_hands.py)로 고르고, 버린 카드는 기억해 두었다가 결정화에서 뺍니다.
+    """
+    time_budget = 0.05 # 결정당 탐색 시간(초)
+    max_iterations = None # 주어지면 반복 수로도 멈춤 (재현 가능한 실험용)
+    exploration = 0.7
+    workers = 1 # 2 이상이면 루트 병렬
+
+    def __init__(self, name, verbose=True, seed=None, time_budget=None, max_iterations=None, workers=None):
+        super().__init__(name, verbose, seed)
+        if time_budget is not None:
+            self.time_budget = time_budget
+        if max_iterations is not None:
+            self.max_iterations = max_iterations
+        if workers is not None:
+            self.workers = workers
+        self.iterations = 0 # 마지막 결정의 반복 수 (루트 병렬이면 이 프로세스 몫만)
+        self._reset()
+
+    def _reset(self):
+        self._dead = [] # 이번 판에 내가 버린 카드
+        self._tree = None
+        self._after = None # 지난 결정에서 내 액션까지 적용한 상태 (트리 재사용용)
+
+    def choose_discard_and_reveal(self, hidden_cards):
+        self._reset()
+        discard_idx, reveal_idx = super().choose_discard_and_reveal(hidden_cards)
+        self._dead.append(to_card_code(hidden_cards[discard_idx]))
+        return discard_idx, reveal_idx
+
+    def end_hand(self, reward=None):
+        self._reset()
+
+    def choose_action(self, state, valid_actions):
+        if not valid_actions:
+            return None
+        # 시간 예산은 결정 시작부터 셉니다: 트리 재사용(follow)에 쓴 시간도 탐색 시간에서 뺍니다.
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else math.inf
+        root = GameState.from_ai_state(state)
+        tree = None
+        if self._tree is not None:
+            tree = follow(self._after, self._tree, root, deadline=deadline)
+        if tree is None:
+            tree = _Node()
+        unseen = unseen_codes(root, self._dead)
+        budget = max(0.0, deadline - time.perf_counter()) if self.time_budget is not None else None
+
+        pending = ()
+        if self.workers > 1:
+            pool = _get_pool(self.workers - 1)
+            pending = [pool.submit(_search_task, (root, unseen, self.rng.getrandbits(64), budget,
+                                                  self.max_iterations, self.exploration))
+                       for _ in range(self.workers - 1)]
+        self.iterations = search(root, tree, unseen, self.rng, budget, self.max_iterations,
+                                 self.exploration)
+        visits = root_visits(tree)
+        if pending:
+            wait(pending)
+            for future in pending:
+                for action, count in future.result().items():
+                    visits[action] = visits.get(action, 0) + count
+
+        legal = [ACTION_INDEX[a] for a in valid_actions if a in ACTION_INDEX]
+        best = max(legal, key=lambda a: visits.get(a, 0))
+        chosen_action = ACTIONS[best]
+        self._tree = tree.children.get(best)
+        if self._tree is not None:
+            self._after = root.clone()
+            self._after.step(best)
+        if self.verbose:
+            print(f"[{self.name}] MCTS {self.iterations}회 탐색 끝에 '{chosen_action}' 액션을 선택했습니다!")
+        return chosen_action
@@ -0,0 +1,78 @@
+import numpy as np
+
+# --- 배열 기반 관측(observation) 인코더 ---
+# get_ai_state 는 결정마다 문자열이 든 중첩 딕셔너리를 새로 만듭니다. 이 인코더는 좌석별 특징 벡터를 미리 할당해 두고,
+# 카드가 돌거나 칩이 움직일 때마다 바뀐 칸만 고칩니다. 에이전트는 자기 좌석 행의 읽기 전용 뷰를 받으므로
+# 복사나 문자열 파싱 없이 여러 관측을 모아 모델에 한 번에 넣을 수 있습니다.
+#
+# 한 좌석(나)의 벡터 구성 (상대 위치는 내 다음 좌석부터 1, 2, ... / 0 은 나):
+#   [HIDDEN  : HIDDEN+52)            내 히든 카드 원-핫 (카드 코드 0~51)
+#   [PUBLIC  : PUBLIC+MAX_SEATS*52)  상대 위치별 공개 카드 원-핫
+#   POT, CALL                         팟, 내 콜 금액
+#   [SEATS   : SEATS+MAX_SEATS*5)    상대 위치별 (칩, 투자금, 이번 라운드 베팅, 폴드, 올인)
+
+MAX_SEATS = 5
+NUM_CARDS = 52
+HIDDEN = 0
+PUBLIC = HIDDEN + NUM_CARDS
+POT = PUBLIC + MAX_SEATS * NUM_CARDS
+CALL = POT + 1
+SEATS = CALL + 1
+SEAT_FIELDS = ("chips", "invested", "current_bet", "is_folded", "is_all_in")
+OBS_SIZE = SEATS + MAX_SEATS * len(SEAT_FIELDS)
+
+
+def seat_offset(relative_seat, field):
+    """상대 위치의 좌석 필드가 벡터에서 차지하는 칸 번호."""
+    return SEATS + relative_seat * len(SEAT_FIELDS) + SEAT_FIELDS.index(field)
+
+
+class ObservationEncoder:
+    def __init__(self, num_players, dtype=np.float32):
+        if not 2 <= num_players <= MAX_SEATS:
+            raise ValueError(f"플레이어 수는 2~{MAX_SEATS} 명이어야 합니다: {num_players}")
+        self.num_players = num_players
+        self.buffer = np.zeros((num_players, OBS_SIZE), dtype=dtype)
+        seats = np.arange(num_players)
+        self._viewers = seats
+        self._relative = (seats[None, :] - seats[:, None]) % num_players # [보는 좌석, 대상 좌석] -> 상대 위치
+        self._seat_columns = SEATS + self._relative * len(SEAT_FIELDS) # 대상 좌석 필드 블록의 시작 칸
+        self.views = []
+        for seat in range(num_players):
+            view = self.buffer[seat]
+            view.flags.writeable = False # 에이전트는 읽기만 (인코더는 buffer 로 계속 갱신)
+            self.views.append(view)
+
+    def reset(self):
+        """새 판을 위해 버퍼를 0 으로 비웁니다 (재할당 없음)."""
+        self.buffer.fill(0)
+
+    def on_deal(self, seat, code, is_public):
+        if is_public:
+            self.buffer[self._viewers, PUBLIC + self._relative[:, seat] * NUM_CARDS + code] = 1
+        else:
+            self.buffer[seat, HIDDEN + code] = 1
+
+    def on_discard(self, seat, discarded, revealed):
+        """히든 4장 중 1장 버리고 1장 공개."""
+        self.buffer[seat, HIDDEN + discarded] = 0
+        self.buffer[seat, HIDDEN + revealed] = 0
+        self.on_deal(seat, revealed, True)
+
+    def on_seat(self, player):
+        """플레이어의 칩/투자금/베팅/상태가 바뀌었을 때 모든 좌석의 해당 칸을 고칩니다."""
+        columns = self._seat_columns[:, player.seat]
+        rows = self._viewers
+        self.buffer[rows, columns] = player.chips
+        self.buffer[rows, columns + 1] = player.invested
+        self.buffer[rows, columns + 2] = player.current_bet
+        self.buffer[rows, columns + 3] = player.is_folded
+        self.buffer[rows, columns + 4] = player.is_all_in
+
+    def on_pot(self, pot):
+        self.buffer[:, POT] = pot
+
+    def observe(self, seat, call_amount):
+        """seat 의 관측 벡터(읽기 전용 뷰). 콜 금액은 보는 사람마다 달라서 여기서 채웁니다."""
+        self.buffer[seat, CALL] = call_amount
+        return self.views[seat]
@@ -1,18 +1,120 @@
 import sys
 import random
-import pprint
+import asyncio
+import hashlib
+import inspect
+import logging
 import argparse
-import itertools
-from collections import Counter
+import threading
+from time import perf_counter_ns
+from operator import attrgetter
+from collections import Counter, deque, namedtuple
 
 # 에이전트 파일 임포트 (파일 구조에 맞게 유지)
 from agent import PokerAgent
 from LearningAgent import LearningAgent 
+from mcts import MCTSAgent
+from starting_hands import MAX_PLAYERS, default_table, to_card_code
+from hand_evaluator import SUITS, RANKS, card_code, evaluate, evaluate_tuple, score_to_tuple
+from settlement import settle
+from events import (ACTIONS, ACTION_INDEX, NullSink, JsonlSink, HandStartEvent, DealEvent, DiscardEvent, StreetEvent,
+                    ActionEvent, ShowdownEvent, ResultEvent)
+
+# 진행 상황 출력은 레벨로 거르는 로거를 통합니다. (메인 블록에서만 INFO 레벨로 켭니다)
+logger = logging.getLogger("poker_env")
+
+# 판 진행 중 에이전트에게 요청하는 결정: 종류, 대상 플레이어, 선택지(히든 카드 / 가능한 액션)
+Decision = namedtuple("Decision", "kind player options")
+DISCARD_DECISION, ACTION_DECISION = "discard", "action"
+
+# 한 판을 에이전트 없이 그대로 다시 돌리기 위한 최소 기록.
+# seed: 덱을 섞은 시드 | names: 좌석 순 이름 | chips: 앤티 전 칩 | ante | discards: 좌석별 (버린 번호, 공개 번호) 바이트 쌍
+# | actions: 결정 순서대로의 ACTIONS 인덱스 바이트열
+HandRecord = namedtuple("HandRecord", "seed names chips ante discards actions")
+
+
+def derive_seed(root_seed, *keys):
+    """루트 시드와 (세션, 판 번호, 이름 등) 키로 서로 독립적인 64비트 하위 시드를 만듭니다."""
+    digest = hashlib.blake2b(repr((root_seed,) + keys).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+# --- 콘솔 입력 (한 스레드만 stdin 을 읽음) ---
+class InputCancelled(Exception):
+    """ConsoleInput.cancel() 로 기다리던 입력이 취소됨."""
+
+
+class ConsoleInput:
+    """
+    stdin 을 오래 사는 스레드 하나에서만 줄 단위로 읽어, input() 을 부른 쪽에 넘겨줍니다.
+    비동기 루프에서 제한 시간이 지나면 cancel() 로 기다리던 호출을 InputCancelled 로 끝내므로,
+    시간이 지난 뒤의 입력을 버려진 스레드가 가로채 다음 결정의 입력을 먹어 버리는 일이 없습니다.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdin
+        self.cond = threading.Condition()
+        self.lines = deque()
+        self.generation = 0 # cancel() 마다 1 증가. 기다리던 호출은 세대가 바뀌면 취소된 것으로 봅니다.
+        self.waiting = False
+        self.discard = False # 취소 이후로는 기다리는 호출이 없을 때 들어온 줄(지난 질문의 답)을 버림
+        self.eof = False
+        self.thread = None
+
+    def _read_loop(self):
+        for line in self.stream:
+            with self.cond:
+                if self.waiting or not self.discard:
+                    self.lines.append(line.rstrip("\r\n"))
+                    self.cond.notify_all()
+        with self.cond:
+            self.eof = True
+            self.cond.notify_all()
+
+    def input(self, prompt=""):
+        with self.cond:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._read_loop, name="console-input", daemon=True)
+                self.thread.start()
+            generation = self.generation
+            self.waiting = True
+        print(prompt, end="", flush=True)
+        with self.cond:
+            try:
+                while not self.lines and not self.eof and generation == self.generation:
+                    self.cond.wait()
+                if generation != self.generation:
+                    raise InputCancelled
+                if self.lines:
+                    return self.lines.popleft()
+                raise EOFError
+            finally:
+                if generation == self.generation:
+                    self.waiting = False
+
+    def cancel(self):
+        """기다리던 input() 호출을 끝내고, 이미 들어와 있던 줄도 버립니다."""
+        with self.cond:
+            self.generation += 1
+            self.waiting = False
+            self.discard = True
+            self.lines.clear()
+            self.cond.notify_all()
+
+
+console = ConsoleInput()
+
 
 # --- HumanAgent 클래스 (터미널에서 직접 플레이) ---
 class HumanAgent:
-    def __init__(self, name):
+    blocking = True # 입력을 기다리므로 비동기 게임 루프에서는 별도 스레드에서 호출합니다
+
+    def __init__(self, name, console=console):
         self.name = name
+        self.console = console
+
+    def cancel_decision(self):
+        """비동기 루프가 제한 시간을 넘긴 결정을 포기할 때 부릅니다."""
+        self.console.cancel()
 
     def choose_action(self, state, valid_actions):
         print(f"\n[{self.name}님의 턴]")
@@ -21,39 +123,77 @@ class HumanAgent:
         print(f"가능한 액션: {valid_actions}")
         
         while True:
-            action = input("액션을 입력하세요: ").strip().upper()
+            action = self.console.input("액션을 입력하세요: ").strip().upper()
             if action in valid_actions:
                 return action
             print("잘못된 입력입니다. 가능한 액션 중에서 정확히 입력해 주세요.")
 
     def choose_discard_and_reveal(self, hidden_cards):
-        """사람 플레이어는 임시로 0번을 버리고 1번을 공개합니다."""
-        return 0, 1
+        return self.choose_discard_for_field(hidden_cards, MAX_PLAYERS)
+
+    def choose_discard_for_field(self, hidden_cards, num_players):
+        """버릴 카드와 공개할 카드 번호를 입력받습니다. 엔터만 누르면 시작 패 표의 추천을 따릅니다."""
+        table = default_table()
+        suggestion = table.choose([to_card_code(c) for c in hidden_cards], num_players) if table is not None else (0, 1)
+        print(f"\n[{self.name}님의 3구 선택] 내 패: " + " ".join(f"{i}:{c}" for i, c in enumerate(hidden_cards)))
+        print(f"추천: {suggestion[0]}번 버리기, {suggestion[1]}번 공개")
+
+        while True:
+            text = self.console.input("버릴 번호와 공개할 번호를 입력하세요 (엔터: 추천): ").split()
+            if not text:
+                return suggestion
+            if len(text) == 2 and all(t in "0123" and len(t) == 1 for t in text) and text[0] != text[1]:
+                return int(text[0]), int(text[1])
+            print("잘못된 입력입니다. 0~3 중 서로 다른 번호 두 개를 입력해 주세요.")
 
 # --- 카드 및 덱 ---
+# 카드는 52장짜리 공용 테이블(CARDS)의 객체를 코드(0~51)로 꺼내 쓰고, 판마다 새로 만들지 않습니다.
+# 덱은 카드 코드 배열만 제자리에서 섞고 남은 장수(top)만 줄여 나가므로 판을 다시 시작해도 재할당이 없습니다.
+RANK_VALUES = {r: i + 2 for i, r in enumerate(RANKS)} # 족보 비교를 위한 숫자 값 (2 ~ 14)
+
 class Card:
+    __slots__ = ("suit", "rank", "value", "code", "text")
+
     def __init__(self, suit, rank):
         self.suit = suit # 'S', 'H', 'D', 'C'
         self.rank = rank # '2'~'9', 'T', 'J', 'Q', 'K', 'A'
-        
-        # 족보 비교를 위한 숫자 값 (2 ~ 14)
-        rank_values = {'T': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
-        self.value = rank_values.get(rank) or int(rank)
+        self.value = RANK_VALUES[rank]
+        self.code = card_code(suit, rank) # 테이블 기반 족보 판별용 정수 코드 (0~51)
+        self.text = suit + rank # 에이전트 상태/화면용 문자열
 
     def __repr__(self):
-        return f"{self.suit}{self.rank}"
+        return self.text
+
+CARDS = tuple(Card(SUITS[code & 3], RANKS[code >> 2]) for code in range(52)) # 코드 -> 공용 카드 객체
+_DECK_ORDER = tuple(card_code(s, r) for s in SUITS for r in RANKS) # 기존 덱과 같은 초기 순서 (같은 시드면 같은 패)
 
 class Deck:
-    def __init__(self):
-        suits = ['S', 'H', 'D', 'C']
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-        self.cards = [Card(s, r) for s in suits for r in ranks]
-        random.shuffle(self.cards)
+    __slots__ = ("order", "top")
+
+    def __init__(self, rng=None):
+        self.order = list(_DECK_ORDER)
+        self.reset(rng)
+
+    def reset(self, rng=None):
+        """
+        덱을 다시 52장으로 채우고 섞습니다 (코드 배열을 제자리에서 초기 순서로 되돌린 뒤 섞음).
+        rng(random.Random) 가 주어지면 그것으로 섞으므로, 같은 시드면 이전 판과 상관없이 같은 덱이 나옵니다.
+        """
+        self.order[:] = _DECK_ORDER
+        (rng or random).shuffle(self.order)
+        self.top = len(self.order)
+
     def draw(self):
-        return self.cards.pop() if self.cards else None
+        if self.top == 0:
+            return None
+        self.top -= 1
+        return CARDS[self.order[self.top]]
 
 # --- 플레이어 구조 ---
 class Player:
+    __slots__ = ("name", "chips", "hidden_cards", "public_cards", "is_folded", "is_all_in",
+                 "invested", "current_bet", "hand_score", "seat")
+
     def __init__(self, name):
         self.name = name
         self.chips = 1000
@@ -64,6 +204,7 @@ class Player:
         self.invested = 0 # 이번 팟에 넣은 총 칩 (사이드 팟 계산용)
         self.current_bet = 0 # 이번 베팅 라운드에 넣은 칩
         self.hand_score: tuple[int] = (-1,) # 최종 족보 점수
+        self.seat = 0 # 테이블 좌석 번호 (이벤트 기록용)
 
     def receive_card(self, card, is_public=False):
         if is_public:
@@ -84,20 +225,29 @@ class Player:
     def get_all_cards(self):
         return self.hidden_cards + self.public_cards
 
+    def reset_hand(self):
+        """칩은 그대로 두고 판 단위 상태만 제자리에서 초기화합니다 (같은 객체로 다음 판을 칠 때)."""
+        self.hidden_cards.clear()
+        self.public_cards.clear()
+        self.is_folded = False
+        self.is_all_in = False
+        self.invested = 0
+        self.current_bet = 0
+        self.hand_score = (-1,)
+
 # --- 족보 판별 모듈 (7장 중 5장 최고 조합 찾기) ---
-def get_best_hand(cards):
-    """주어진 카드 중 5장을 뽑아 가장 높은 족보의 점수 튜플을 반환합니다."""
-    if len(cards) < 5:
-        return (0,)
+_CARD_CODE = attrgetter("code")
 
-    best_score = (-1,)
-    for combo in itertools.combinations(cards, 5):
-        score = evaluate_5_cards(combo)
-        if score > best_score:
-            best_score = score
-    return best_score
+def get_best_hand(cards):
+    """
+    주어진 카드 중 5장을 뽑아 가장 높은 족보의 점수 튜플을 반환합니다.
+    21개 조합을 나열하지 않고 hand_evaluator 의 룩업 테이블로 한 번에 계산합니다.
+    몬테카를로처럼 아주 많이 부르는 곳에서는 카드 코드로 hand_evaluator.evaluate 를 직접 불러 정수 점수를 비교하세요.
+    """
+    return evaluate_tuple(list(map(_CARD_CODE, cards)))
 
 def evaluate_5_cards(cards):
+    """5장 족보 판별의 기준(reference) 구현입니다. hand_evaluator 의 테이블 결과는 이 함수와 같은 순서를 가집니다."""
     values = sorted([c.value for c in cards], reverse=True)
     suits = [c.suit for c in cards]
     
@@ -127,51 +277,122 @@ def evaluate_5_cards(cards):
 # --- 포커 게임 핵심 로직 ---
 class PokerGame:
     players : list[Player]
+    instruments = None # instrumentation.Instrumentation. 클래스에 지정하면 모든 게임에 적용됩니다.
 
-    def __init__(self, player_names, log_file="state_log.txt"):
-        self.players = [Player(name) for name in player_names][:5]
-        self.deck = Deck()
-        self.ante = 1
+    def __init__(self, player_names, log_file=None, sink=None, chips=None, deck=None, seed=None, ante=1,
+                 instruments=None, players=None):
+        """
+        :param log_file: 주어지면 이벤트를 JSONL 로 덧붙여 기록합니다 (sink 를 따로 주지 않은 경우).
+        :param sink: 이벤트 싱크 (events.py). 기본은 아무것도 기록하지 않는 NullSink.
+        :param chips: {이름: 칩} 형태로 이전 판의 칩을 이어받을 때 사용합니다.
+        :param deck: 여러 판에 걸쳐 재사용할 Deck. 주어지면 새로 섞어서 씁니다.
+        :param seed: 이 판의 덱 시드. 없으면 전역 random 에서 뽑습니다 (hand_record() 에 남아 replay 에 쓰임).
+        :param instruments: 단계별 시간/결정 지연을 모을 Instrumentation (instrumentation.py). 없으면 계측하지 않습니다.
+        :param players: 재사용할 Player 목록 (session.py). 주어지면 player_names/chips 대신 이 객체들을 좌석 순서대로 앉힙니다.
+        """
+        if players is None:
+            players = [Player(name) for name in player_names][:5]
+            if chips is not None:
+                for p in players:
+                    p.chips = chips[p.name]
+        self._seat_players(players)
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        if deck is None:
+            deck = Deck(self.rng)
+        else:
+            deck.reset(self.rng)
+        self.deck = deck
+        self.ante = ante
+        self.history_discards = bytearray() # hand_record() 용 결정 기록
+        self.history_actions = bytearray()
         self.current_highest_bet = 0
         self.pot = 0 # 화면 표시용 총 팟 크기 추적
 
-        self.log_file = log_file
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            f.write(f"=== 포커 게임 로그 시작 ({len(self.players)}인 플레이) ===\n")
-
-    def log_global_state(self, event_message=""):
-        global_state = {
-            "pot": self.pot,
-            "current_highest_bet": self.current_highest_bet,
-            "players": {}
-        }
-        for p in self.players:
-            global_state["players"][p.name] = {
-                "chips": p.chips,
-                "invested": p.invested,
-                "hidden_cards": [str(c) for c in p.hidden_cards],
-                "public_cards": [str(c) for c in p.public_cards],
-                "is_folded": p.is_folded
-            }
-        
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n--- [상태 업데이트] {event_message} ---\n")
-            pprint.pprint(global_state, stream=f)
+        if sink is None:
+            sink = JsonlSink(log_file) if log_file is not None else NullSink()
+        self.sink = sink
+        self.encoder = None # 배열 관측을 쓰는 에이전트가 있을 때만 play_hand 가 만듭니다 (observation.py)
+        self.settlement = None # 쇼다운 정산 기록 (settlement.Settlement)
+        self.street = -1 # 진행 중인 스트리트 (0: 4구 ~ 3: 7구, -1: 시작/버리기 단계)
+        self.cursor = None # 베팅 결정 시점의 (행동 가능자 목록, 남은 행동 수, 현재 순번) - game_state.GameState.from_game 용
+        if instruments is not None:
+            self.instruments = instruments
+
+    def _seat_players(self, players):
+        self.players = players
+        for seat, p in enumerate(players):
+            p.seat = seat
+            p.reset_hand()
+
+    def new_hand(self, seed=None, players=None, ante=None):
+        """
+        같은 게임 객체로 다음 판을 준비합니다. Player/Deck/싱크는 그대로 쓰고 판 단위 필드만 제자리에서 초기화합니다.
+        :param players: 이번 판에 앉힐 Player 목록 (첫 번째가 먼저 행동). 없으면 지난 판 그대로.
+        :param ante: 이번 판 앤티. 없으면 지난 판 그대로.
+        """
+        self._seat_players(players if players is not None else self.players)
+        if ante is not None:
+            self.ante = ante
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.deck.reset(self.rng)
+        self.history_discards.clear()
+        self.history_actions.clear()
+        self.current_highest_bet = 0
+        self.pot = 0
+        self.encoder = None
+        self.settlement = None
+        self.street = -1
+        self.cursor = None
+
+    def emit(self, event):
+        """이벤트를 싱크로 보냅니다."""
+        if self.instruments is None:
+            self.sink.emit(event)
+        else:
+            self._timed("log", self.sink.emit, event)
+
+    def _timed(self, phase, fn, *args):
+        """계측이 켜져 있으면 fn 의 실행 시간을 phase 에 더합니다."""
+        if self.instruments is None:
+            return fn(*args)
+        start = perf_counter_ns()
+        result = fn(*args)
+        self.instruments.add(phase, perf_counter_ns() - start)
+        return result
+
+    def sync_seat(self, player):
+        """플레이어의 칩/베팅 상태 변화를 관측 버퍼에 반영합니다."""
+        if self.encoder is not None:
+            self.encoder.on_seat(player)
+            self.encoder.on_pot(self.pot)
 
     def start_game(self):
-        print(f"=== {len(self.players)}인 게임을 시작합니다 ===")
+        logger.info("=== %d인 게임을 시작합니다 ===", len(self.players))
+        if self.sink.active:
+            self.emit(HandStartEvent(len(self.players), self.ante))
+        self.start_chips = {p.name: p.chips for p in self.players} # 판 종료 후 손익(보상) 계산용
         # 1. 앤티 징수 및 투자금(invested) 기록
         for player in self.players:
             player.chips -= self.ante
             player.invested += self.ante
             self.pot += self.ante
+        for player in self.players:
+            self.sync_seat(player)
         
         # 2. 4장씩 딜링
+        self._timed("deal", self._deal_opening)
+
+    def _deal_opening(self):
         for _ in range(4):
             for player in self.players:
-                player.receive_card(self.deck.draw())
-                
-        self.log_global_state("초기 4장 딜링 완료")
+                card = self.deck.draw()
+                player.receive_card(card)
+                if self.encoder is not None:
+                    self.encoder.on_deal(player.seat, card.code, False)
+                if self.sink.active:
+                    self.emit(DealEvent(player.seat, card.code, False))
 
     def get_valid_actions(self, player):
         if player.is_folded or player.is_all_in: return []
@@ -186,17 +407,28 @@ class PokerGame:
         state = {
             "pot": self.pot,
             "my_chips": player.chips,
-            "my_hidden_cards": [str(c) for c in player.hidden_cards],
-            "my_public_cards": [str(c) for c in player.public_cards],
+            "my_hidden_cards": [c.text for c in player.hidden_cards],
+            "my_public_cards": [c.text for c in player.public_cards],
             "call_amount": self.current_highest_bet - player.current_bet,
+            "my_seat": player.seat, # 상대들은 좌석 순서(나 제외)로 들어 있음
+            # 베팅 진행 상황 (공개 정보, game_state.GameState.from_ai_state 로 탐색용 상태를 만들 때 사용)
+            "my_current_bet": player.current_bet,
+            "my_invested": player.invested,
+            "ante": self.ante,
+            "street": self.street,
+            "to_act": self.cursor[1] if self.cursor is not None else 0,
             "opponents": {}
         }
         for p in self.players:
             if p != player:
                 state["opponents"][p.name] = {
-                    "public_cards": [str(c) for c in p.public_cards],
+                    "public_cards": [c.text for c in p.public_cards],
                     "is_folded": p.is_folded,
-                    "chips": p.chips
+                    "chips": p.chips,
+                    "seat": p.seat,
+                    "current_bet": p.current_bet,
+                    "invested": p.invested,
+                    "is_all_in": p.is_all_in
                 }
         return state
     
@@ -207,7 +439,10 @@ class PokerGame:
         """
         if action == "FOLD":
             player.is_folded = True
-            print(f"  -> {player.name}님이 FOLD 했습니다.")
+            self.sync_seat(player)
+            logger.info("  -> %s님이 FOLD 했습니다.", player.name)
+            if self.sink.active:
+                self.emit(ActionEvent(player.seat, action, 0, self.pot, False))
             return False
 
         # 콜을 하기 위해 내야 하는 기본 금액
@@ -228,15 +463,18 @@ class PokerGame:
         if player.chips <= total_bet:
             total_bet = player.chips
             player.is_all_in = True
-            print(f"  -> {player.name}님이 올인(ALL-IN)! ({total_bet} 칩)")
+            logger.info("  -> %s님이 올인(ALL-IN)! (%d 칩)", player.name, total_bet)
         else:
-            print(f"  -> {player.name}님이 {action}! ({total_bet} 칩 베팅)")
+            logger.info("  -> %s님이 %s! (%d 칩 베팅)", player.name, action, total_bet)
 
         # 칩 이동: 내 칩 감소 -> 투자금 및 현재 베팅금 증가 -> 중앙 팟 증가
         player.chips -= total_bet
         player.invested += total_bet
         player.current_bet += total_bet
         self.pot += total_bet
+        self.sync_seat(player)
+        if self.sink.active:
+            self.emit(ActionEvent(player.seat, action, total_bet, self.pot, player.is_all_in))
 
         # 누군가 최고액을 갱신했다면(레이즈가 발생했다면) True 반환
         if player.current_bet > self.current_highest_bet:
@@ -249,18 +487,23 @@ class PokerGame:
         """
         모든 플레이어가 콜을 맞추거나 폴드할 때까지 턴을 반복하는 루프입니다.
         """
-        print(f"\n=== 베팅 라운드 시작 (현재 팟: {self.pot}) ===")
+        self._run_steps(self._betting_round_steps(), active_agents)
+
+    def _betting_round_steps(self):
+        """베팅 라운드 진행. 결정이 필요할 때마다 Decision 을 yield 하고 액션을 돌려받습니다."""
+        logger.info("\n=== 베팅 라운드 시작 (현재 팟: %d) ===", self.pot)
         
         # 라운드 시작 시 이번 라운드 누적 베팅액 초기화
         for p in self.players:
             p.current_bet = 0
+            self.sync_seat(p)
         self.current_highest_bet = 0
 
         # 폴드하거나 올인하지 않은, 행동 가능한 플레이어들만 추림
         acting_players = [p for p in self.players if not p.is_folded and not p.is_all_in]
         
         if len(acting_players) <= 1:
-            print("  -> 행동 가능한 플레이어가 1명 이하이므로 베팅을 생략합니다.")
+            logger.info("  -> 행동 가능한 플레이어가 1명 이하이므로 베팅을 생략합니다.")
             return
 
         # 행동해야 할 사람 수 (누군가 레이즈하면 다시 인원수만큼 늘어남)
@@ -287,15 +530,13 @@ class PokerGame:
                 current_idx = (current_idx + 1) % len(acting_players)
                 continue
 
-            # 에이전트에게 상태를 주고 액션을 받아옴
-            state = self.get_ai_state(player)
-            agent = active_agents[player.name]
-            action = agent.choose_action(state, valid_actions)
-            
-            self.log_global_state(f"{player.name}의 선택: {action}")
+            # 에이전트에게 상태를 주고 액션을 받아옴 (실제 호출은 드라이버가 _decision_call 로)
+            self.cursor = (acting_players, players_to_act, current_idx)
+            action = yield Decision(ACTION_DECISION, player, valid_actions)
+            self.history_actions.append(ACTION_INDEX.get(action, ACTION_INDEX["CALL"])) # 모르는 액션은 콜로 처리됨
             
             # 액션 적용 및 레이즈 여부 확인
-            is_raise = self.apply_action(player, action)
+            is_raise = self._timed("apply_action", self.apply_action, player, action)
             
             if is_raise:
                 # 판돈이 올랐으므로, 방금 베팅한 본인을 제외한 나머지 모두가 다시 턴을 가져야 함
@@ -307,46 +548,35 @@ class PokerGame:
             # 다음 사람으로 순서 넘김
             current_idx = (current_idx + 1) % len(acting_players)
             
-        print(f"=== 베팅 라운드 종료 (현재 팟: {self.pot}) ===")
+        logger.info("=== 베팅 라운드 종료 (현재 팟: %d) ===", self.pot)
 
     def resolve_showdown(self):
-        """사이드 팟을 고려하여 승자들에게 칩을 분배합니다."""
-        print("\n=== 쇼다운 및 팟 분배 ===")
+        """
+        사이드 팟을 고려하여 승자들에게 칩을 분배합니다.
+        계산은 settlement.settle 이 하고(투자금은 그대로 둠), 여기서는 칩 지급과 기록만 합니다.
+        정산 기록은 self.settlement 에 남습니다.
+        """
+        logger.info("\n=== 쇼다운 및 팟 분배 ===")
+        scores = [0] * len(self.players)
         for p in self.players:
             if not p.is_folded:
-                p.hand_score = get_best_hand(p.get_all_cards())
-        
-        active_investors = [p for p in self.players if p.invested > 0]
-        pot_number = 1
-        
-        while any(p.invested > 0 for p in active_investors):
-            current_min_invest = min(p.invested for p in active_investors if p.invested > 0)
-            current_pot = 0
-            eligible_players = []
-            
-            for p in active_investors:
-                if p.invested > 0:
-                    deduction = min(p.invested, current_min_invest)
-                    p.invested -= deduction
-                    current_pot += deduction
-                    
-                    if not p.is_folded and deduction == current_min_invest:
-                        eligible_players.append(p)
-            
-            if current_pot == 0: break
-            if not eligible_players: continue
-                
-            best_score = max(p.hand_score for p in eligible_players)
-            winners = [p for p in eligible_players if p.hand_score == best_score]
-            
-            split_amount = current_pot // len(winners)
-            winner_names = ", ".join([w.name for w in winners])
-            print(f"[팟 {pot_number}] 크기: {current_pot} | 승자: {winner_names} (각 {split_amount} 칩 획득)")
-            
-            for w in winners:
-                w.chips += split_amount
-                
-            pot_number += 1
+                scores[p.seat] = evaluate([c.code for c in p.get_all_cards()])
+                p.hand_score = score_to_tuple(scores[p.seat])
+
+        self.settlement = result = settle([p.invested for p in self.players],
+                                          [p.is_folded for p in self.players], scores)
+        for p in self.players:
+            p.chips += result.payouts[p.seat]
+
+        for pot_number, pot in enumerate(result.pots, 1):
+            if logger.isEnabledFor(logging.INFO):
+                winner_names = ", ".join(self.players[s].name for s in pot.winners)
+                odd = f" (+1 칩: {', '.join(self.players[s].name for s in pot.odd_chips)})" if pot.odd_chips else ""
+                logger.info("[팟 %d] 크기: %d | 승자: %s (각 %d 칩 획득)%s", pot_number, pot.amount, winner_names,
+                            pot.share, odd)
+            if self.sink.active:
+                self.emit(ShowdownEvent(pot_number, pot.amount, pot.winners, pot.share))
+        return result
 
     def deal_cards_to_active(self, is_public=True):
         """폴드하지 않고 살아있는 플레이어들에게만 카드를 1장씩 분배합니다."""
@@ -355,19 +585,167 @@ class PokerGame:
                 card = self.deck.draw()
                 if card:
                     p.receive_card(card, is_public=is_public)
+                    if self.encoder is not None:
+                        self.encoder.on_deal(p.seat, card.code, is_public)
+                    if self.sink.active:
+                        self.emit(DealEvent(p.seat, card.code, is_public))
+
+    # --- 결정 요청과 드라이버 ---
+    # 판 진행(_hand_steps)은 에이전트를 직접 부르지 않고 Decision 을 yield 하는 제너레이터입니다.
+    # play_hand 는 이를 동기적으로, play_hand_async 는 코루틴/원격 에이전트와 시간 제한을 두고 진행합니다.
+
+    def _decision_call(self, agent, decision):
+        """Decision 에 답할 에이전트 메서드와 인자를 고릅니다."""
+        player = decision.player
+        if decision.kind == DISCARD_DECISION:
+            # choose_discard_for_field 가 있는 에이전트(starting_hands.StartingHandMixin)는 이번 판 인원 수도 받음
+            choose_for_field = getattr(agent, "choose_discard_for_field", None)
+            if choose_for_field is not None:
+                return choose_for_field, (player.hidden_cards, len(self.players))
+            return agent.choose_discard_and_reveal, (player.hidden_cards,)
+        # choose_action_from_observation 이 있는 에이전트는 딕셔너리 대신 배열 관측의 읽기 전용 뷰를 받음
+        choose_from_observation = getattr(agent, "choose_action_from_observation", None)
+        if choose_from_observation is not None:
+            observation = self.encoder.observe(player.seat, self.current_highest_bet - player.current_bet)
+            return choose_from_observation, (observation, decision.options)
+        return agent.choose_action, (self._timed("get_ai_state", self.get_ai_state, player), decision.options)
+
+    def _run_steps(self, steps, active_agents):
+        answer = None
+        while True:
+            try:
+                decision = steps.send(answer)
+            except StopIteration:
+                return
+            method, args = self._decision_call(active_agents[decision.player.name], decision)
+            if self.instruments is None:
+                answer = method(*args)
+            else:
+                start = perf_counter_ns()
+                answer = method(*args)
+                self.instruments.decision(decision.player.name, perf_counter_ns() - start, "choose_" + decision.kind)
+
+    def _prepare_hand(self, active_agents):
+        if any(hasattr(agent, "choose_action_from_observation") for agent in active_agents.values()):
+            from observation import ObservationEncoder # numpy 는 배열 관측을 쓸 때만 필요
+            self.encoder = ObservationEncoder(len(self.players))
+
+    def _end_hand_calls(self, active_agents):
+        """판 단위로 정리할 일이 있는 에이전트(예: LearningAgent 의 학습/DB 트랜잭션)에 이번 판 손익과 함께 판 종료를 알림"""
+        for p in self.players:
+            end_hand = getattr(active_agents[p.name], "end_hand", None)
+            if end_hand is not None:
+                yield end_hand, p.chips - self.start_chips[p.name]
 
     def play_hand(self, active_agents):
         """한 판의 전체 7포커 게임 흐름을 제어합니다."""
+        if self.instruments is not None:
+            self.instruments.begin_hand()
+        self._prepare_hand(active_agents)
+        self._run_steps(self._hand_steps(), active_agents)
+        for end_hand, reward in self._end_hand_calls(active_agents):
+            end_hand(reward)
+        if self.instruments is not None:
+            self.instruments.end_hand()
+
+    async def play_hand_async(self, active_agents, time_bank=None, default_action="CALL"):
+        """
+        play_hand 의 비동기 버전. 에이전트 메서드가 코루틴이면 await 하고, blocking 속성이 참인 에이전트
+        (HumanAgent 등)는 스레드에서 호출하므로 한 이벤트 루프에서 여러 테이블을 동시에 돌릴 수 있습니다.
+        :param time_bank: 결정 하나에 허용하는 초. 넘기면 default_action (버리기/공개는 0번/1번) 으로 진행합니다.
+        계측이 켜져 있으면 결정 지연(대기 포함)과 단계 시간은 모으지만, 테이블이 번갈아 도는 중에는 프로파일하지 않습니다.
+        """
+        self._prepare_hand(active_agents)
+        steps = self._hand_steps()
+        answer = None
+        while True:
+            try:
+                decision = steps.send(answer)
+            except StopIteration:
+                break
+            agent = active_agents[decision.player.name]
+            start = perf_counter_ns()
+            answer = await self._decide_async(agent, decision, time_bank, default_action)
+            if self.instruments is not None:
+                self.instruments.decision(decision.player.name, perf_counter_ns() - start, "choose_" + decision.kind)
+        for end_hand, reward in self._end_hand_calls(active_agents):
+            try:
+                result = end_hand(reward)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e: # 칩 정산은 이미 끝났으므로 알림 실패는 기록만 합니다
+                logger.warning("  -> 판 종료 알림 중 오류(%r)가 났습니다.", e)
+        if self.instruments is not None:
+            self.instruments.end_hand()
+
+    async def _decide_async(self, agent, decision, time_bank, default_action):
+        if decision.kind == DISCARD_DECISION:
+            default = (0, 1)
+        else:
+            default = default_action if default_action in decision.options else "FOLD"
+        method, args = self._decision_call(agent, decision)
+        try:
+            if getattr(agent, "blocking", False):
+                answer = await asyncio.wait_for(asyncio.to_thread(method, *args), time_bank)
+            else:
+                answer = method(*args)
+                if inspect.isawaitable(answer):
+                    answer = await asyncio.wait_for(answer, time_bank)
+        except asyncio.TimeoutError:
+            cancel = getattr(agent, "cancel_decision", None)
+            if cancel is not None:
+                cancel() # 스레드에서 기다리던 입력을 끝내 다음 결정의 입력을 가로채지 않게 함
+            logger.warning("  -> %s님이 제한 시간(%s초)을 넘겨 %s 로 진행합니다.", decision.player.name, time_bank, default)
+            return default
+        except Exception as e: # 봇의 잘못된 답이나 끊긴 연결 때문에 판(과 같은 루프의 다른 테이블)이 멈추지 않게 함
+            logger.warning("  -> %s님의 결정 중 오류(%r)가 나 %s 로 진행합니다.", decision.player.name, e, default)
+            return default
+        # 프로세스 밖 에이전트의 답은 믿지 않고 검사합니다
+        if decision.kind == DISCARD_DECISION:
+            valid = (isinstance(answer, (tuple, list)) and len(answer) == 2
+                     and all(isinstance(i, int) and 0 <= i < 4 for i in answer) and answer[0] != answer[1])
+            return tuple(answer) if valid else default
+        return answer if answer in decision.options else default
+
+    def hand_record(self):
+        """끝난 판을 다시 돌릴 수 있는 HandRecord."""
+        return HandRecord(self.seed, tuple(p.name for p in self.players),
+                          tuple(self.start_chips[p.name] for p in self.players),
+                          self.ante, bytes(self.history_discards), bytes(self.history_actions))
+
+    @classmethod
+    def replay(cls, record, sink=None):
+        """
+        HandRecord 의 시드와 결정 목록으로 에이전트 없이 판을 그대로 재현하고 끝난 게임을 반환합니다.
+        족보 판별이 바뀐 뒤 예전 판을 다시 채점하거나 회귀를 찾을 때 씁니다.
+        """
+        game = cls(record.names, sink=sink, chips=dict(zip(record.names, record.chips)), seed=record.seed,
+                   ante=record.ante)
+        discards = iter(zip(record.discards[0::2], record.discards[1::2]))
+        actions = iter(record.actions)
+        steps = game._hand_steps()
+        answer = None
+        while True:
+            try:
+                decision = steps.send(answer)
+            except StopIteration:
+                return game
+            answer = next(discards) if decision.kind == DISCARD_DECISION else ACTIONS[next(actions)]
+
+    def _hand_steps(self):
+        """한 판 진행 제너레이터 (에이전트 결정은 Decision 으로 요청)."""
         # 1. 앤티 징수 및 4장 딜링
         self.start_game()
         
         # 2. 1장 버리고 1장 공개 (3구 완성)
         for p in self.players:
-            agent = active_agents[p.name]
-            discard_idx, reveal_idx = agent.choose_discard_and_reveal(p.hidden_cards)
+            discard_idx, reveal_idx = yield Decision(DISCARD_DECISION, p, p.hidden_cards)
+            self.history_discards += bytes((discard_idx, reveal_idx))
+            if self.encoder is not None:
+                self.encoder.on_discard(p.seat, p.hidden_cards[discard_idx].code, p.hidden_cards[reveal_idx].code)
+            if self.sink.active:
+                self.emit(DiscardEvent(p.seat, p.hidden_cards[discard_idx].code, p.hidden_cards[reveal_idx].code))
             p.discard_and_reveal(discard_idx, reveal_idx)
-            
-        self.log_global_state("1장 버리고 1장 공개 완료 (3구 세팅)")
 
         # 3. 각 스트리트(Street)별 분배 및 베팅 페이즈 정의
         # 형태: (페이즈 이름, 공개 여부)
@@ -378,38 +756,58 @@ class PokerGame:
             ("7구(히든)", False)
         ]
 
-        for street_name, is_public in streets:
+        for street_index, (street_name, is_public) in enumerate(streets):
+            self.street = street_index
             # 이번 턴에 살아있는 사람(폴드하지 않은 사람) 수 확인
             survivors = [p for p in self.players if not p.is_folded]
             
             # 나 빼고 다 죽었으면 묻고 더블로 갈 필요 없이 바로 조기 승리!
             if len(survivors) == 1:
-                print(f"\n[{street_name} 페이즈] {survivors[0].name}님을 제외한 모두가 기권했습니다. 조기 승리!")
+                logger.info("\n[%s 페이즈] %s님을 제외한 모두가 기권했습니다. 조기 승리!", street_name, survivors[0].name)
                 break # 카드 딜링을 멈추고 바로 쇼다운(결산)으로 이동
                 
             # 카드 딜링
-            print(f"\n--- {street_name} 분배 ---")
-            self.deal_cards_to_active(is_public=is_public)
-            self.log_global_state(f"{street_name} 딜링 완료")
+            logger.info("\n--- %s 분배 ---", street_name)
+            if self.sink.active:
+                self.emit(StreetEvent(street_index))
+            self._timed("deal", self.deal_cards_to_active, is_public)
 
             # 베팅할 수 있는 사람(폴드X, 올인X)이 2명 이상인지 확인
             bettors = [p for p in survivors if not p.is_all_in]
             
             if len(bettors) >= 2:
-                self.play_betting_round(active_agents)
+                yield from self._betting_round_steps()
             else:
-                print(f"  -> 베팅 가능한 플레이어가 부족하여 {street_name} 베팅을 생략하고 턴을 넘깁니다. (올인 발생)")
+                logger.info("  -> 베팅 가능한 플레이어가 부족하여 %s 베팅을 생략하고 턴을 넘깁니다. (올인 발생)", street_name)
 
         # 4. 최종 쇼다운 및 결산
-        self.resolve_showdown()
+        self._timed("resolve_showdown", self.resolve_showdown)
         
-        # 결과 출력
-        print("\n=== 최종 결과 ===")
-        for p in self.players:
-            status = "FOLD" if p.is_folded else "ALL-IN" if p.is_all_in else "SURVIVED"
-            print(f"{p.name}: {p.chips} 칩 (이번 판 투자금: {p.invested}) | 상태: {status}")
-
-
+        # 결과 기록 및 출력 (파일 싱크는 여기서 이번 판 이벤트를 한 번에 씁니다)
+        if self.sink.active:
+            for p in self.players:
+                self.emit(ResultEvent(p.seat, p.chips))
+        self._timed("log", self.sink.end_hand)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("\n=== 최종 결과 ===")
+            for p in self.players:
+                status = "FOLD" if p.is_folded else "ALL-IN" if p.is_all_in else "SURVIVED"
+                logger.info("%s: %d 칩 (이번 판 투자금: %d) | 상태: %s", p.name, p.chips, p.invested, status)
+
+
+
+def create_agent(agent_type, name, verbose=True, seed=None):
+    """타입 문자열('learning', 'random', 'cfr', 'mcts', 'human')로 에이전트를 만듭니다. 알 수 없는 타입이면 None."""
+    agent_type = agent_type.lower()
+    if agent_type == 'learning': return LearningAgent(name, verbose=verbose, seed=seed)
+    elif agent_type == 'random': return PokerAgent(name, verbose=verbose, seed=seed)
+    elif agent_type == 'cfr':
+        from cfr import CFRAgent # numpy 가 필요하므로 쓸 때만 불러옴
+        return CFRAgent(name, verbose=verbose, seed=seed)
+    elif agent_type == 'mcts': return MCTSAgent(name, verbose=verbose, seed=seed)
+    elif agent_type == 'human': return HumanAgent(name)
+    return None
 
 # --- 실행 메인 블록 ---
 if __name__ == "__main__":
@@ -421,14 +819,8 @@ if __name__ == "__main__":
     parser.add_argument('-p5', type=str, default='Empty', help='Player 5 Type')
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     
-    def create_agent(agent_type, name):
-        agent_type = agent_type.lower()
-        if agent_type == 'learning': return LearningAgent(name)
-        elif agent_type == 'random': return PokerAgent(name)
-        elif agent_type == 'human': return HumanAgent(name)
-        return None
-
     agent_names = ["Player_1", "Player_2", "Player_3", "Player_4", "Player_5"]
     agent_types = [args.p1, args.p2, args.p3, args.p4, args.p5]
     
@@ -444,7 +836,7 @@ if __name__ == "__main__":
         sys.exit()
     
 
-    game = PokerGame(list(active_agents.keys()), log_file="state_log.txt")
+    game = PokerGame(list(active_agents.keys()), log_file="state_log.jsonl")
     game.play_hand(active_agents)
 
-    print("\ngame complete successfully. You can check the whole processing in state_log.txt.")
+    print("\ngame complete successfully. You can check the whole processing in state_log.jsonl.")
@@ -0,0 +1,107 @@
+import os
+import struct
+
+import numpy as np
+
+from events import ACTIONS, ACTION_INDEX
+from storage import MemoryStore
+
+# --- 배열 기반 Q 테이블 (메모리 맵 파일) ---
+# 상태 추상화의 조밀한 index 를 행 번호로 쓰는 (num_states, 5 액션) 점수 행렬과 방문 횟수 행렬입니다.
+# 파일을 np.memmap 으로 열기 때문에 읽기 전용으로 여는 여러 시뮬레이션 프로세스가 복사 없이 같은 페이지를 공유하고,
+# 파일 크기와 상관없이 여는 즉시 사용할 수 있습니다.
+#
+# 파일 구조: 헤더(32바이트) | scores float64[num_states][5] | visits uint32[num_states][5]
+
+MAGIC = b"QTAB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHQI12x") # magic, 포맷 버전, 추상화 버전, 상태 수, 액션 수
+NUM_ACTIONS = len(ACTIONS)
+
+
+class QTable:
+    def __init__(self, path, num_states=None, abstraction_version=None, readonly=False):
+        """
+        파일이 없으면 num_states 크기로 새로 만들고(희소 파일), 있으면 헤더를 읽어 그대로 엽니다.
+        abstraction_version 이 주어지면 기존 파일의 추상화 버전과 비교해 다르면 ValueError 를 냅니다.
+        readonly=True 면 쓰기 불가 메모리 맵으로 엽니다.
+        """
+        self.path = path
+        self.readonly = readonly
+        if not os.path.exists(path):
+            if readonly or num_states is None:
+                raise FileNotFoundError(path)
+            self._create(path, num_states, abstraction_version or 0)
+
+        with open(path, 'rb') as f:
+            magic, fmt, self.abstraction_version, self.num_states, num_actions = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or fmt != FORMAT_VERSION or num_actions != NUM_ACTIONS:
+            raise ValueError(f"Q 테이블 파일 형식이 맞지 않습니다: {path}")
+        if num_states is not None and num_states != self.num_states:
+            raise ValueError(f"상태 수가 다릅니다: 파일 {self.num_states}, 요청 {num_states}")
+        if abstraction_version is not None and abstraction_version != self.abstraction_version:
+            raise ValueError(f"Q 테이블의 추상화 버전이 맞지 않습니다: 파일 {self.abstraction_version}, "
+                             f"요청 {abstraction_version} ({path})")
+
+        mode = 'r' if readonly else 'r+'
+        shape = (self.num_states, NUM_ACTIONS)
+        self.scores = np.memmap(path, dtype=np.float64, mode=mode, offset=HEADER.size, shape=shape)
+        self.visits = np.memmap(path, dtype=np.uint32, mode=mode, offset=HEADER.size + self.scores.nbytes, shape=shape)
+
+    @staticmethod
+    def _create(path, num_states, abstraction_version):
+        size = HEADER.size + num_states * NUM_ACTIONS * (8 + 4)
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, abstraction_version, num_states, NUM_ACTIONS))
+            f.truncate(size) # 0 으로 채워진 희소 파일
+
+    def add(self, index, action, reward):
+        """update_memory 와 같은 의미: 점수에 보상을 더하고 방문 횟수를 1 늘립니다."""
+        a = ACTION_INDEX[action]
+        self.scores[index, a] += reward
+        self.visits[index, a] += 1
+
+    def add_batch(self, indices, action_indices, rewards):
+        """여러 (상태, 액션, 보상) 을 한 번에 반영합니다. 같은 칸이 여러 번 나와도 모두 더해집니다."""
+        np.add.at(self.scores, (indices, action_indices), rewards)
+        np.add.at(self.visits, (indices, action_indices), 1)
+
+    def flush(self):
+        if not self.readonly:
+            self.scores.flush()
+            self.visits.flush()
+
+
+class QTableStore(MemoryStore):
+    """
+    LearningAgent 저장소 인터페이스로 QTable 을 감쌉니다. readonly 로 열면 put/record 는 아무것도 하지 않습니다.
+    키는 StateAbstraction.key() 의 버전(1바이트) + index(4바이트) 형식이어야 합니다 (include_cards 미지원).
+    """
+
+    def __init__(self, path, num_states=None, abstraction_version=None, readonly=False):
+        self.table = QTable(path, num_states, abstraction_version, readonly)
+
+    def _index(self, key):
+        if len(key) != 5:
+            raise ValueError("조밀 Q 테이블은 카드가 붙지 않은 5바이트 추상화 키만 지원합니다.")
+        if key[0] != self.table.abstraction_version:
+            raise ValueError(f"키의 추상화 버전({key[0]})이 Q 테이블({self.table.abstraction_version})과 다릅니다.")
+        return int.from_bytes(key[1:], 'big')
+
+    def get(self, key):
+        row = self.table.scores[self._index(key)]
+        return {a: float(v) for a, v in zip(ACTIONS, row)}
+
+    def put(self, key, scores):
+        if self.table.readonly:
+            return # 읽기 전용 스냅샷은 평가용이므로 기록하지 않습니다 (경험을 모으려면 distributed_learning.ActorStore)
+        row = self.table.scores[self._index(key)]
+        for action, score in scores.items():
+            row[ACTION_INDEX[action]] = score
+
+    def record(self, key, action, reward):
+        if not self.table.readonly:
+            self.table.add(self._index(key), action, reward)
+
+    def commit(self):
+        self.table.flush()
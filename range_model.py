@@ -0,0 +1,421 @@
+import os
+import json
+import math
+import time
+import argparse
+import tempfile
+from itertools import combinations
+from statistics import NormalDist
+
+import numpy as np
+
+from batch_evaluator import evaluate_batch
+from equity import EquityResult, FINAL_CARD_COUNT, equity_from_cards
+from events import (ACTIONS, ACTION_INDEX, STREETS, EventSink, HandStartEvent, DealEvent, DiscardEvent,
+                    StreetEvent, ActionEvent)
+from hand_history import HandHistory, HandHistorySink
+
+# --- 상대 레인지 모델 ---
+# 관찰자(한 좌석) 시점에서 살아있는 상대마다, 3구 때 남긴 히든 카드 두 장의 가능한 조합에 가중치를 둡니다.
+#   - 카드가 보일 때마다(상대 업카드, 내 카드, 내가 버린 카드) 그 카드를 포함한 조합의 가중치를 0 으로 만들고
+#   - 상대가 액션할 때마다 P(액션 | 스트리트, 베팅 직면 여부, 조합의 홀딩 버킷) 을 곱합니다.
+# 가중치는 판 내내 이어서 곱하므로 스트리트가 바뀌어도 처음부터 다시 계산하지 않습니다.
+# 조합별 홀딩 버킷은 그 상대의 공개 패가 바뀔 때만 벡터화해서 다시 계산하고, 액션 확률표는 핸드 히스토리에서 학습합니다.
+# 7구에 받는 세 번째 히든 카드는 조합에 넣지 않고, 에퀴티를 계산할 때 남은 카드에서 무작위로 채웁니다.
+
+MODEL_VERSION = 1
+HOLE_CARDS = 2
+NUM_STREETS = len(STREETS)
+
+# 강도 버킷: 0 하이카드 | 1 드로우(4장 플러시/스트레이트) | 2 낮은 원페어 | 3 T 이상 원페어 | 4 투페어 | 5 트리플
+#           | 6 스트레이트/플러시 | 7 풀하우스 이상
+NUM_STRENGTHS = 8
+# 홀딩 버킷 = 강도 x 2 + (히든 카드가 공개 패만의 강도보다 올려 주었는지)
+NUM_BUCKETS = NUM_STRENGTHS * 2
+
+_STRAIGHT_WINDOWS = np.array([(1 << 12) | 0b1111] + [0b11111 << low for low in range(9)], dtype=np.int64)
+_POPCOUNT = np.array([bin(m).count("1") for m in range(1 << 13)], dtype=np.int64)
+_RANK_IDS = np.arange(13)
+
+
+# --- 홀딩 버킷 ---
+def strength_batch(cards):
+    """(M, k) 카드 코드 배열 -> 길이 M 의 강도 버킷 (0 ~ NUM_STRENGTHS-1)."""
+    cards = np.asarray(cards, dtype=np.int64)
+    ranks, suits = cards >> 2, cards & 3
+    counts = (ranks[:, :, None] == _RANK_IDS).sum(axis=1) # (M, 13)
+    rank_bits = np.int64(1) << ranks
+    suit_masks = np.stack([np.bitwise_or.reduce(np.where(suits == s, rank_bits, 0), axis=1) for s in range(4)], axis=1)
+    rank_mask = np.bitwise_or.reduce(suit_masks, axis=1)
+    suit_counts = _POPCOUNT[suit_masks].max(axis=1)
+
+    windows = _STRAIGHT_WINDOWS
+    straight = ((rank_mask[:, None] & windows) == windows).any(axis=1)
+    straight_flush = ((suit_masks[:, :, None] & windows) == windows).any(axis=(1, 2))
+    pairs = (counts >= 2).sum(axis=1)
+    trips = (counts >= 3).any(axis=1)
+    monster = (counts == 4).any(axis=1) | (trips & (pairs >= 2)) | straight_flush
+    draw = (suit_counts >= 4) | (_POPCOUNT[rank_mask[:, None] & windows] >= 4).any(axis=1)
+    high_pair = (counts[:, 8:] >= 2).any(axis=1)
+    return np.select([monster, straight | (suit_counts >= 5), trips, pairs >= 2, (pairs == 1) & high_pair, pairs == 1, draw],
+                     [7, 6, 5, 4, 3, 2, 1], default=0)
+
+
+def holding_buckets(holes, public):
+    """(M, 2) 히든 조합 배열과 그 상대의 공개 카드 -> 길이 M 의 홀딩 버킷."""
+    holes = np.asarray(holes, dtype=np.int64)
+    if not len(public):
+        strength = strength_batch(holes)
+        return strength * 2 + (strength > 0)
+    public = np.asarray(public, dtype=np.int64)
+    public_strength = strength_batch(public[None, :])[0]
+    strength = strength_batch(np.concatenate([holes, np.broadcast_to(public, (len(holes), len(public)))], axis=1))
+    return strength * 2 + (strength > public_strength)
+
+
+# --- 액션 확률표 ---
+class ActionModel:
+    """
+    P(액션 | 스트리트, 베팅 직면 여부, 홀딩 버킷) 표. counts 에 관측 횟수를 모으고 prior 만큼 가산 평활해 정규화합니다.
+    학습하지 않은 표는 모든 버킷에서 분포가 같으므로 액션이 레인지를 바꾸지 않습니다(공개 카드만 반영).
+    """
+
+    def __init__(self, counts=None, prior=1.0):
+        shape = (NUM_STREETS, 2, NUM_BUCKETS, len(ACTIONS))
+        self.counts = np.zeros(shape) if counts is None else np.asarray(counts, dtype=np.float64).reshape(shape)
+        self.prior = prior
+        self._table = None
+
+    @property
+    def table(self):
+        if self._table is None:
+            smoothed = self.counts + self.prior
+            self._table = smoothed / smoothed.sum(axis=-1, keepdims=True)
+        return self._table
+
+    def likelihood(self, street, facing, buckets, action):
+        """버킷 배열 각각에서 action 이 나올 확률."""
+        return self.table[street, int(facing), buckets, ACTION_INDEX[action]]
+
+    def fit(self, hands, batch_size=1 << 16):
+        """
+        판(이벤트 리스트)들의 모든 액션을 셉니다. 핸드 히스토리에는 모든 히든 카드가 남아 있으므로 쇼다운까지 가지 않은
+        판의 액션도 씁니다. HandHistory, hand_history.iter_hands, events.read_binary_events 묶음을 그대로 받습니다.
+        센 액션 수를 반환합니다.
+        """
+        pending = {} # 공개 카드 수 -> (street, facing, action) 목록, 히든 목록, 공개 목록
+        total = 0
+        for hand in hands:
+            for street, facing, action, hole, public in _hand_actions(hand):
+                rows = pending.setdefault(len(public), ([], [], []))
+                rows[0].append((street, facing, action))
+                rows[1].append(hole)
+                rows[2].append(public)
+                total += 1
+                if total % batch_size == 0:
+                    self._add_rows(pending)
+                    pending = {}
+        self._add_rows(pending)
+        return total
+
+    def _add_rows(self, pending):
+        for keys, holes, publics in pending.values():
+            keys = np.array(keys, dtype=np.int64)
+            holes = np.array(holes, dtype=np.int64)
+            publics = np.array(publics, dtype=np.int64)
+            strength = strength_batch(np.concatenate([holes, publics], axis=1))
+            public_strength = strength_batch(publics) if publics.shape[1] else 0
+            buckets = strength * 2 + (strength > public_strength)
+            np.add.at(self.counts, (keys[:, 0], keys[:, 1], buckets, keys[:, 2]), 1)
+        self._table = None
+
+    @classmethod
+    def from_history(cls, path, prior=1.0):
+        """hand_history.py 의 바이너리 핸드 히스토리 파일에서 학습합니다."""
+        model = cls(prior=prior)
+        with HandHistory(path) as history:
+            model.fit(history)
+        return model
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"version": MODEL_VERSION, "prior": self.prior, "counts": self.counts.ravel().tolist()}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"레인지 모델 버전이 맞지 않습니다: {path}")
+        return cls(data["counts"], data["prior"])
+
+
+def _hand_actions(hand):
+    """한 판의 이벤트에서 (스트리트, 베팅 직면 여부, 액션 번호, 히든 두 장, 공개 카드) 를 액션마다 꺼냅니다."""
+    hidden, hole, public = {}, {}, {}
+    street = None
+    bets, highest = {}, 0
+    for event in hand:
+        kind = type(event)
+        if kind is DealEvent:
+            if event.public:
+                public[event.seat].append(event.card)
+            elif street is None:
+                hidden.setdefault(event.seat, []).append(event.card)
+        elif kind is DiscardEvent:
+            hole[event.seat] = tuple(c for c in hidden[event.seat] if c != event.discarded and c != event.revealed)
+            public[event.seat] = [event.revealed]
+        elif kind is StreetEvent:
+            street = event.street
+            bets, highest = {}, 0
+        elif kind is ActionEvent:
+            bet = bets.get(event.seat, 0)
+            yield street, int(highest > bet), ACTION_INDEX[event.action], hole[event.seat], tuple(public[event.seat])
+            bets[event.seat] = bet + event.amount
+            highest = max(highest, bets[event.seat])
+
+
+# --- 상대 한 명의 레인지 ---
+class Range:
+    """한 상대의 히든 두 장 조합(combos)과 가중치. 공개 패가 바뀔 때만 조합별 버킷을 다시 계산합니다."""
+
+    def __init__(self, excluded):
+        cards = [c for c in range(52) if c not in excluded]
+        self.combos = np.array(list(combinations(cards, HOLE_CARDS)), dtype=np.int64)
+        self.live = np.ones(len(self.combos), dtype=bool)
+        self.weights = np.ones(len(self.combos)) / len(self.combos)
+        self.public = []
+        self.folded = False
+        self._buckets = None
+
+    def remove(self, card):
+        """보인 카드를 포함한 조합을 지웁니다."""
+        dead = (self.combos == card).any(axis=1)
+        self.live &= ~dead
+        self.weights[dead] = 0.0
+        self._normalize()
+
+    def add_public(self, card):
+        self.public.append(card)
+        self._buckets = None
+        self.remove(card)
+
+    def buckets(self):
+        if self._buckets is None:
+            self._buckets = holding_buckets(self.combos, self.public)
+        return self._buckets
+
+    def observe_action(self, model, street, facing, action):
+        self.weights *= model.likelihood(street, facing, self.buckets(), action)
+        self._normalize()
+
+    def _normalize(self):
+        total = self.weights.sum()
+        if total > 0:
+            self.weights /= total
+        else: # 모델과 모순되는 관측만 남았으면 살아있는 조합 균등으로 되돌림
+            self.weights = self.live / max(self.live.sum(), 1)
+
+    def top(self, n=5):
+        """가중치가 큰 조합 n 개의 ((카드, 카드), 확률) 목록."""
+        order = np.argsort(-self.weights)[:n]
+        return [(tuple(int(c) for c in self.combos[i]), float(self.weights[i])) for i in order]
+
+
+# --- 레인지 반영 에퀴티 ---
+def range_equity(my_cards, opponents, dead_cards=(), samples=2000, seed=None, confidence=0.95):
+    """
+    상대 히든 조합을 레인지 가중치대로 뽑고, 나머지 카드는 남은 카드에서 균등하게 채워 쇼다운을 집계합니다.
+    :param opponents: (공개 카드, 조합 배열, 가중치) 목록 (살아있는 상대만)
+    상대끼리 같은 카드를 뽑은 표본은 버리므로 실제 표본 수는 samples 보다 조금 적을 수 있습니다.
+    모든 표본이 버려지면 남은 카드로 가능한 조합 균등으로 다시 뽑고, 그래도 없으면 ValueError 를 냅니다 (NaN 을 돌려주지 않음).
+    """
+    start = time.perf_counter()
+    if not opponents:
+        return EquityResult(1.0, 0.0, 1.0, 1.0, 1.0, 1, time.perf_counter() - start)
+    rng = np.random.default_rng(seed)
+    known = set(my_cards) | set(dead_cards)
+    for public, _, _ in opponents:
+        known.update(public)
+    unseen = np.array([c for c in range(52) if c not in known], dtype=np.int64)
+    column = np.full(52, -1, dtype=np.int64)
+    column[unseen] = np.arange(len(unseen))
+
+    def draw(weight_list):
+        holes = []
+        for (_, combos, _), weights in zip(opponents, weight_list):
+            cdf = np.cumsum(weights)
+            picks = np.minimum(np.searchsorted(cdf, rng.random(samples) * cdf[-1], side='right'), len(combos) - 1)
+            holes.append(combos[picks])
+        hole_cards = np.concatenate(holes, axis=1)
+        distinct = (np.diff(np.sort(hole_cards, axis=1), axis=1) != 0).all(axis=1)
+        return hole_cards[distinct]
+
+    weight_list = [np.asarray(weights, dtype=np.float64) for _, _, weights in opponents]
+    hole_cards = draw(weight_list) if all(w.sum() > 0 for w in weight_list) else None
+    if hole_cards is None or not len(hole_cards):
+        # 레인지끼리 같은 카드에 몰려 모든 표본이 버려졌으면, 남은 카드로 만들 수 있는 조합 균등으로 다시 뽑음
+        hole_cards = draw([np.isin(combos, unseen).all(axis=1).astype(np.float64) for _, combos, _ in opponents])
+    n = len(hole_cards)
+    if n == 0:
+        raise ValueError("상대 레인지에서 서로 겹치지 않는 히든 카드 조합을 뽑을 수 없습니다.")
+
+    # 뽑힌 히든 카드를 제외한 남은 카드의 무작위 순서에서 필요한 장수만큼 앞에서 가져옴
+    keys = rng.random((n, len(unseen)))
+    keys[np.arange(n)[:, None], column[hole_cards]] = 2.0
+    my_need = FINAL_CARD_COUNT - len(my_cards)
+    opp_needs = [FINAL_CARD_COUNT - HOLE_CARDS - len(public) for public, _, _ in opponents]
+    fill = unseen[np.argsort(keys, axis=1)[:, :my_need + sum(opp_needs)]]
+
+    my_scores = evaluate_batch(np.concatenate([np.broadcast_to(np.asarray(my_cards, dtype=np.int64), (n, len(my_cards))),
+                                               fill[:, :my_need]], axis=1))
+    best = np.full(n, -1, dtype=np.int64)
+    tied = np.zeros(n, dtype=np.int64)
+    pos = my_need
+    for i, ((public, _, _), need) in enumerate(zip(opponents, opp_needs)):
+        cards = np.concatenate([np.broadcast_to(np.asarray(public, dtype=np.int64), (n, len(public))),
+                                hole_cards[:, 2 * i:2 * i + 2], fill[:, pos:pos + need]], axis=1)
+        scores = evaluate_batch(cards)
+        pos += need
+        best = np.maximum(best, scores)
+        tied += scores == my_scores
+
+    win = my_scores > best
+    tie = my_scores == best
+    share = np.where(win, 1.0, np.where(tie, 1.0 / (tied + 1), 0.0))
+    equity = float(share.mean())
+    half = NormalDist().inv_cdf(0.5 + confidence / 2) * float(share.std()) / math.sqrt(n) if n > 1 else 1.0
+    return EquityResult(float(win.mean()), float(tie.mean()), equity, max(equity - half, 0.0), min(equity + half, 1.0),
+                        n, time.perf_counter() - start)
+
+
+# --- 관찰자 시점 추적기 ---
+class RangeTracker(EventSink):
+    """
+    한 좌석(관찰자) 시점에서 상대별 Range 를 판 진행 이벤트로 갱신하는 싱크.
+    PokerGame 의 sink 로 붙이고(다른 싱크와 함께면 events.TeeSink), 에이전트는 결정할 때 equity() 를 부릅니다.
+    다른 좌석의 히든 카드 딜과 버린 카드는 보지 않으므로 관찰자가 실제로 아는 정보만 씁니다.
+    """
+
+    def __init__(self, seat, model=None, samples=2000):
+        self.seat = seat
+        self.model = model if model is not None else ActionModel()
+        self.samples = samples
+        self.reset()
+
+    def reset(self):
+        self.my_cards = []
+        self.dead = set() # 내가 버린 카드 + 폴드한 상대의 공개 카드
+        self.ranges = {}
+        self.street = None
+        self.bets, self.highest = {}, 0
+        self.version = 0 # 레인지가 바뀔 때마다 증가 (에퀴티 캐시 키)
+        self._cached = (None, None)
+
+    def _seen(self):
+        seen = set(self.my_cards) | self.dead
+        for r in self.ranges.values():
+            seen.update(r.public)
+        return seen
+
+    def _reveal(self, card, owner=None):
+        """card 가 보였음을 owner 외의 모든 레인지에 반영합니다."""
+        for seat, r in self.ranges.items():
+            if seat != owner:
+                r.remove(card)
+
+    def emit(self, event):
+        kind = type(event)
+        if kind is HandStartEvent:
+            self.reset()
+        elif kind is DealEvent:
+            if event.seat == self.seat:
+                self.my_cards.append(event.card)
+                self._reveal(event.card)
+            elif event.public and event.seat in self.ranges:
+                self.ranges[event.seat].add_public(event.card)
+                self._reveal(event.card, event.seat)
+        elif kind is DiscardEvent:
+            if event.seat == self.seat:
+                self.my_cards.remove(event.discarded)
+                self.dead.add(event.discarded)
+            else:
+                r = self.ranges[event.seat] = Range(self._seen())
+                r.add_public(event.revealed)
+                self._reveal(event.revealed, event.seat)
+        elif kind is StreetEvent:
+            self.street = event.street
+            self.bets, self.highest = {}, 0
+        elif kind is ActionEvent:
+            bet = self.bets.get(event.seat, 0)
+            r = self.ranges.get(event.seat)
+            if r is not None:
+                if event.action == "FOLD":
+                    r.folded = True
+                    self.dead.update(r.public)
+                else:
+                    r.observe_action(self.model, self.street, self.highest > bet, event.action)
+            self.bets[event.seat] = bet + event.amount
+            self.highest = max(self.highest, self.bets[event.seat])
+        else:
+            return
+        self.version += 1
+
+    def live_opponents(self):
+        return {seat: r for seat, r in self.ranges.items() if not r.folded}
+
+    def equity(self, samples=None, seed=None):
+        """현재 레인지로 계산한 내 에퀴티 (EquityResult). 레인지가 바뀌지 않았으면 이전 결과를 그대로 돌려줍니다."""
+        key = (self.version, samples, seed)
+        if self._cached[0] == key:
+            return self._cached[1]
+        opponents = [(r.public, r.combos, r.weights) for _, r in sorted(self.live_opponents().items())]
+        result = range_equity(self.my_cards, opponents, self.dead, samples or self.samples, seed)
+        self._cached = (key, result)
+        return result
+
+
+# --- 실행 메인 블록: 히스토리로 학습하고 한 판에서 균등 가정 에퀴티와 비교 ---
+if __name__ == "__main__":
+    from poker_env import PokerGame, create_agent, derive_seed
+
+    parser = argparse.ArgumentParser(description="7 Poker opponent range model")
+    parser.add_argument('--history', type=str, default=None, help='학습할 핸드 히스토리 (없으면 셀프 플레이로 생성)')
+    parser.add_argument('--hands', type=int, default=2000, help='히스토리가 없을 때 생성할 판 수')
+    parser.add_argument('-a', '--agents', nargs='+', default=['learning', 'learning', 'random'], help='에이전트 타입 목록')
+    parser.add_argument('--save', type=str, default=None, help='학습한 액션 확률표를 저장할 JSON 경로')
+    parser.add_argument('--seed', type=int, default=0, help='루트 시드')
+    args = parser.parse_args()
+
+    names = [f"Player_{i + 1}" for i in range(len(args.agents))]
+    agents = {name: create_agent(a_type, name, verbose=False, seed=derive_seed(args.seed, "agent", name))
+              for name, a_type in zip(names, args.agents)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.history
+        if path is None:
+            path = os.path.join(tmp, "history.bin")
+            sink = HandHistorySink(path)
+            for i in range(args.hands):
+                PokerGame(names, sink=sink, seed=derive_seed(args.seed, "hand", i)).play_hand(agents)
+            sink.close()
+        start = time.perf_counter()
+        model = ActionModel.from_history(path)
+        print(f"=== 액션 {int(model.counts.sum())}개 학습 ({time.perf_counter() - start:.2f}초) ===")
+    if args.save:
+        model.save(args.save)
+
+    tracker = RangeTracker(0, model)
+    game = PokerGame(names, sink=tracker, seed=derive_seed(args.seed, "demo"))
+    original = agents[names[0]].choose_action
+
+    def choose_with_ranges(state, valid_actions):
+        ranged = tracker.equity(seed=0)
+        uniform = equity_from_cards(tracker.my_cards, [r.public for r in tracker.live_opponents().values()],
+                                    tracker.dead, samples=2000, seed=0)
+        print(f"[{STREETS[tracker.street]}] 균등 가정 {uniform.equity:.3f} | 레인지 반영 {ranged.equity:.3f} "
+              f"({ranged.elapsed * 1e3:.1f}ms)")
+        return original(state, valid_actions)
+
+    agents[names[0]].choose_action = choose_with_ranges
+    game.play_hand(agents)
@@ -0,0 +1,197 @@
+import sys
+import json
+import asyncio
+import argparse
+import itertools
+
+from poker_env import PokerGame, create_agent
+
+# --- 프로세스 밖 에이전트 프로토콜 (stdio / TCP) ---
+# 한 줄에 JSON 하나(JSON Lines). 게임 쪽(RemoteAgent)이 요청을 보내고 봇 쪽이 같은 id 로 답합니다.
+#
+#   {"id": 0, "type": "hello", "name": "Player_1"}  -> {"id": 0}   (연결 직후 봇이 준비될 때까지 대기, 제한 시간 없음)
+#   {"id": 1, "type": "discard", "name": "Player_1", "hidden_cards": ["SA", "HK", "D2", "C9"]}
+#       -> {"id": 1, "discard": 0, "reveal": 1}
+#   {"id": 2, "type": "action", "name": "Player_1", "state": {...get_ai_state...}, "valid_actions": ["FOLD", "CALL"]}
+#       -> {"id": 2, "action": "CALL"}
+#   {"id": 3, "type": "end_hand", "name": "Player_1", "reward": -12}      (답 없음)
+#
+# 제한 시간을 넘긴 요청의 늦은 답은 id 가 맞지 않으므로 버려집니다.
+
+
+# --- 봇 쪽 ---
+def handle_message(message, agents, factory):
+    """요청 하나를 로컬 에이전트로 처리하고 답(없으면 None)을 반환합니다. 에이전트는 이름별로 처음 볼 때 만듭니다."""
+    name = message["name"]
+    agent = agents.get(name)
+    if agent is None:
+        agent = agents[name] = factory(name)
+    kind = message["type"]
+    if kind == "hello":
+        return {"id": message["id"]}
+    if kind == "discard":
+        discard_idx, reveal_idx = agent.choose_discard_and_reveal(message["hidden_cards"])
+        return {"id": message["id"], "discard": discard_idx, "reveal": reveal_idx}
+    if kind == "action":
+        return {"id": message["id"], "action": agent.choose_action(message["state"], message["valid_actions"])}
+    if kind == "end_hand":
+        end_hand = getattr(agent, "end_hand", None)
+        if end_hand is not None:
+            end_hand(message["reward"])
+    return None
+
+
+def parse_request(line):
+    """요청 한 줄을 딕셔너리로 읽습니다. JSON 이 아니거나 name/type 이 없는 줄이면 None (봇은 그 줄을 건너뜀)."""
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(message, dict) or "name" not in message or "type" not in message:
+        return None
+    return message
+
+
+def run_stdio_bot(factory):
+    """표준 입력으로 요청을 받아 표준 출력으로 답합니다 (게임 쪽이 RemoteAgent.spawn 으로 실행)."""
+    agents = {}
+    for line in sys.stdin:
+        message = parse_request(line)
+        if message is None:
+            continue
+        reply = handle_message(message, agents, factory)
+        if reply is not None:
+            sys.stdout.write(json.dumps(reply) + "\n")
+            sys.stdout.flush()
+
+
+async def serve_bot(factory, host="127.0.0.1", port=9000):
+    """TCP 로 봇을 띄웁니다. 연결마다 따로 에이전트를 둡니다 (게임 쪽은 RemoteAgent.connect)."""
+    async def handle(reader, writer):
+        agents = {}
+        while line := await reader.readline():
+            message = parse_request(line)
+            if message is None:
+                continue
+            reply = handle_message(message, agents, factory)
+            if reply is not None:
+                writer.write((json.dumps(reply) + "\n").encode())
+                await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+# --- 게임 쪽 ---
+class RemoteAgent:
+    """스트림 너머의 봇을 PokerGame.play_hand_async 에서 쓸 수 있는 코루틴 에이전트로 감쌉니다."""
+
+    def __init__(self, name, reader, writer, process=None):
+        self.name = name
+        self.reader = reader
+        self.writer = writer
+        self.process = process
+        self._ids = itertools.count()
+        self._lock = asyncio.Lock() # 한 연결에서는 요청/응답을 하나씩
+
+    @classmethod
+    async def connect(cls, name, host="127.0.0.1", port=9000):
+        reader, writer = await asyncio.open_connection(host, port)
+        agent = cls(name, reader, writer)
+        await agent._request({"type": "hello"})
+        return agent
+
+    @classmethod
+    async def spawn(cls, name, *command):
+        """봇 프로그램을 자식 프로세스로 실행하고 stdin/stdout 으로 대화합니다."""
+        process = await asyncio.create_subprocess_exec(*command, stdin=asyncio.subprocess.PIPE,
+                                                       stdout=asyncio.subprocess.PIPE)
+        agent = cls(name, process.stdout, process.stdin, process)
+        await agent._request({"type": "hello"})
+        return agent
+
+    async def _send(self, message):
+        message["name"] = self.name
+        message["id"] = next(self._ids)
+        self.writer.write((json.dumps(message, ensure_ascii=False) + "\n").encode())
+        await self.writer.drain()
+        return message["id"]
+
+    async def _request(self, message):
+        async with self._lock:
+            request_id = await self._send(message)
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    raise ConnectionError(f"{self.name}: 봇 연결이 끊어졌습니다.")
+                reply = json.loads(line)
+                if reply.get("id") == request_id:
+                    return reply
+
+    async def choose_action(self, state, valid_actions):
+        reply = await self._request({"type": "action", "state": state, "valid_actions": valid_actions})
+        return reply.get("action")
+
+    async def choose_discard_and_reveal(self, hidden_cards):
+        reply = await self._request({"type": "discard", "hidden_cards": [c.text for c in hidden_cards]})
+        return reply.get("discard"), reply.get("reveal")
+
+    async def end_hand(self, reward):
+        async with self._lock:
+            await self._send({"type": "end_hand", "reward": reward})
+
+    async def close(self):
+        self.writer.close()
+        if self.process is not None:
+            await self.process.wait()
+
+
+async def play_tables(tables, time_bank=None, default_action="CALL"):
+    """
+    여러 테이블을 한 이벤트 루프에서 동시에 한 판씩 진행합니다.
+    :param tables: (PokerGame, {이름: 에이전트}) 목록
+    """
+    await asyncio.gather(*(game.play_hand_async(agents, time_bank, default_action) for game, agents in tables))
+    return [game for game, _ in tables]
+
+
+async def _host_demo(num_tables, agent_types, time_bank):
+    """테이블마다 좌석 수만큼 stdio 봇 프로세스를 띄워 한 판씩 동시에 진행합니다."""
+    names = [f"Player_{i + 1}" for i in range(len(agent_types))]
+    tables, remotes = [], []
+    for _ in range(num_tables):
+        agents = {}
+        for name, a_type in zip(names, agent_types):
+            agents[name] = await RemoteAgent.spawn(name, sys.executable, __file__, "--stdio", "--agent", a_type)
+            remotes.append(agents[name])
+        tables.append((PokerGame(names), agents))
+    games = await play_tables(tables, time_bank)
+    for remote in remotes:
+        await remote.close()
+    return games
+
+
+# --- 실행 메인 블록 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="7 Poker out-of-process agent protocol")
+    parser.add_argument('--agent', type=str, default='random', help='봇 모드에서 실행할 에이전트 타입 (random, learning)')
+    parser.add_argument('--stdio', action='store_true', help='표준 입출력으로 봇 실행')
+    parser.add_argument('--port', type=int, default=None, help='TCP 포트로 봇 실행')
+    parser.add_argument('--tables', type=int, default=None, help='stdio 봇을 띄워 동시에 진행할 테이블 수 (게임 쪽 데모)')
+    parser.add_argument('--players', nargs='+', default=['random', 'random'], help='데모 테이블의 에이전트 타입 목록')
+    parser.add_argument('--time-bank', type=float, default=None, help='결정당 제한 시간(초)')
+    args = parser.parse_args()
+
+    factory = lambda name: create_agent(args.agent, name, verbose=False)
+    if args.stdio:
+        run_stdio_bot(factory)
+    elif args.port is not None:
+        asyncio.run(serve_bot(factory, port=args.port))
+    elif args.tables:
+        games = asyncio.run(_host_demo(args.tables, args.players, args.time_bank))
+        for i, game in enumerate(games):
+            print(f"[테이블 {i + 1}] " + " | ".join(f"{p.name}: {p.chips}" for p in game.players))
+    else:
+        parser.print_help()
@@ -0,0 +1,186 @@
+import sys
+import json
+import random
+import argparse
+from bisect import bisect_right
+from collections import namedtuple
+
+from poker_env import PokerGame, Player, Deck, create_agent, derive_seed
+from events import EventSink
+
+# --- 여러 판을 잇는 세션 엔진 ---
+# 좌석(Player)과 덱, PokerGame 객체를 세션 내내 재사용하고 판마다 판 단위 필드만 제자리에서 초기화합니다 (PokerGame.new_hand).
+#   - 딜 회전: 버튼이 판마다 한 좌석씩 돌고, 버튼 좌석부터(탈락한 좌석은 건너뜀) 먼저 버리기/베팅합니다.
+#   - 탈락: 판이 끝났을 때 칩이 다음 판 앤티보다 적은 플레이어는 테이블에서 빠집니다. 2명 미만이 남으면 세션 종료.
+#   - 앤티 상승: ante_schedule 의 (시작 판 번호, 앤티) 단계를 따릅니다 (escalating_schedule 로 만들 수 있음).
+#   - 결과: 판마다 HandResult 하나를 results 싱크(events.EventSink 인터페이스)로 흘려보내고, 세션은 에이전트별 누적 통계
+#     (판 수, 승 수, 손익 합, 손익 제곱합)만 들고 있으므로 판 수와 상관없이 메모리가 일정합니다.
+
+STARTING_CHIPS = 1000
+ANTE = 1 # 기본 앤티. tournament.py 의 bb/100 계산 기준 단위이기도 합니다.
+
+# hand: 판 번호 | ante | names: 이번 판 좌석 순(첫 번째가 먼저 행동) | chips: 판이 끝난 뒤 칩 | nets: 이번 판 손익
+# | eliminated: 이 판 뒤 탈락한 이름
+HandResult = namedtuple("HandResult", "hand ante names chips nets eliminated")
+
+
+def escalating_schedule(base=ANTE, every=100, factor=2, levels=10):
+    """every 판마다 앤티가 factor 배로 오르는 ante_schedule."""
+    return [(level * every, base * factor ** level) for level in range(levels)]
+
+
+def _empty_stats(names):
+    return {name: {"hands": 0, "wins": 0, "net": 0, "net_sq": 0} for name in names}
+
+
+class Session:
+    def __init__(self, agents, starting_chips=STARTING_CHIPS, ante_schedule=((0, ANTE),), seed=None, sink=None,
+                 results=None, instruments=None):
+        """
+        :param agents: {이름: 에이전트} (좌석 순서대로)
+        :param ante_schedule: (시작 판 번호, 앤티) 목록. 첫 단계는 0번 판부터여야 합니다.
+        :param seed: 루트 시드. 판 시드는 여기서 판 번호로 파생하므로 같은 시드면 같은 세션이 나옵니다.
+        :param sink: 판 진행 이벤트 싱크 (PokerGame 에 그대로 전달)
+        :param results: HandResult 를 받을 싱크. 판마다 emit 후 end_hand 를 부릅니다.
+        """
+        self.agents = dict(agents)
+        self.seats = [Player(name) for name in self.agents]
+        for p in self.seats:
+            p.chips = starting_chips
+        self.schedule = sorted(ante_schedule)
+        if not self.schedule or self.schedule[0][0] != 0:
+            raise ValueError(f"ante_schedule 의 첫 단계는 0번 판부터여야 합니다: {list(ante_schedule)}")
+        self._starts = [start for start, _ in self.schedule]
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.sink = sink
+        self.results = results
+        self.instruments = instruments
+        self.deck = Deck()
+        self.game = None
+        self.hand_index = 0
+        self.button = 0 # 이번 판에 먼저 행동할 좌석 번호 (탈락한 좌석이면 그다음 좌석부터)
+        self.eliminated = {} # 이름 -> 탈락한 판 번호
+        self.stats = _empty_stats(self.agents)
+
+    def ante_for(self, hand_index):
+        return self.schedule[bisect_right(self._starts, hand_index) - 1][1]
+
+    def seating(self):
+        """이번 판에 앉는 Player 목록 (버튼 좌석부터, 탈락자 제외)."""
+        seats = self.seats[self.button:] + self.seats[:self.button]
+        return [p for p in seats if p.name not in self.eliminated]
+
+    @property
+    def finished(self):
+        return len(self.seats) - len(self.eliminated) < 2
+
+    def play_hand(self):
+        """한 판을 진행하고 HandResult 를 반환합니다. 이미 끝난 세션이면 None."""
+        if self.finished:
+            return None
+        hand_index = self.hand_index
+        players = self.seating()
+        ante = self.ante_for(hand_index)
+        seed = derive_seed(self.seed, "hand", hand_index)
+        if self.game is None:
+            self.game = PokerGame(None, sink=self.sink, deck=self.deck, seed=seed, ante=ante,
+                                  instruments=self.instruments, players=players)
+        else:
+            self.game.new_hand(seed, players, ante)
+        before = [p.chips for p in players]
+        self.game.play_hand({p.name: self.agents[p.name] for p in players})
+
+        next_ante = self.ante_for(hand_index + 1)
+        nets = []
+        eliminated = []
+        for p, chips in zip(players, before):
+            net = p.chips - chips
+            nets.append(net)
+            s = self.stats[p.name]
+            s["hands"] += 1
+            s["net"] += net
+            s["net_sq"] += net * net
+            if net > 0:
+                s["wins"] += 1
+            if p.chips < next_ante:
+                self.eliminated[p.name] = hand_index
+                eliminated.append(p.name)
+
+        result = HandResult(hand_index, ante, tuple(p.name for p in players), tuple(p.chips for p in players),
+                            tuple(nets), tuple(eliminated))
+        if self.results is not None:
+            self.results.emit(result)
+            self.results.end_hand()
+        self.hand_index += 1
+        self.button = (self.button + 1) % len(self.seats)
+        return result
+
+    def run(self, hands=None):
+        """hands 판(없으면 한 명만 남을 때까지) 진행하고 실제로 진행한 판 수를 반환합니다."""
+        played = 0
+        while (hands is None or played < hands) and self.play_hand() is not None:
+            played += 1
+        return played
+
+    def close(self):
+        for sink in (self.sink, self.results):
+            if sink is not None:
+                sink.close()
+
+
+class JsonlResultSink(EventSink):
+    """HandResult 를 한 줄에 하나씩 JSON 으로 기록합니다. flush_every 판마다 파일을 한 번만 열어 덧붙입니다."""
+
+    def __init__(self, path, flush_every=100):
+        self.path = path
+        self.flush_every = flush_every
+        self.buffer = []
+
+    def emit(self, result):
+        self.buffer.append(json.dumps(result._asdict(), ensure_ascii=False))
+
+    def end_hand(self):
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(self.buffer) + "\n")
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+
+
+# --- 실행 메인 블록 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="7 Poker multi-hand session engine")
+    parser.add_argument('-a', '--agents', nargs='+', default=['random', 'random'], help='에이전트 타입 목록 (random, learning, cfr, mcts)')
+    parser.add_argument('-n', '--hands', type=int, default=None, help='최대 판 수 (없으면 한 명이 남을 때까지)')
+    parser.add_argument('--chips', type=int, default=STARTING_CHIPS, help='시작 칩')
+    parser.add_argument('--ante', type=int, default=ANTE, help='첫 앤티')
+    parser.add_argument('--ante-every', type=int, default=0, help='이 판 수마다 앤티를 두 배로 (0 이면 고정)')
+    parser.add_argument('--seed', type=int, default=0, help='루트 시드')
+    parser.add_argument('--results', type=str, default=None, help='판별 결과를 덧붙일 JSONL 파일 경로')
+    args = parser.parse_args()
+
+    if not 2 <= len(args.agents) <= 5 or any(a.lower() not in ('random', 'learning', 'cfr', 'mcts') for a in args.agents):
+        print("[오류] 2~5명의 random / learning / cfr / mcts 에이전트가 필요합니다.")
+        sys.exit(1)
+
+    names = [f"Player_{i + 1}" for i in range(len(args.agents))]
+    agents = {name: create_agent(a_type, name, verbose=False, seed=derive_seed(args.seed, "agent", name))
+              for name, a_type in zip(names, args.agents)}
+    schedule = escalating_schedule(args.ante, args.ante_every, levels=32) if args.ante_every else [(0, args.ante)]
+    results = JsonlResultSink(args.results) if args.results else None
+    session = Session(agents, args.chips, schedule, args.seed, results=results)
+    played = session.run(args.hands)
+    session.close()
+
+    print(f"=== {played}판 진행 | 최종 앤티 {session.ante_for(session.hand_index)} ===")
+    for p in session.seats:
+        out = session.eliminated.get(p.name)
+        status = f"{out}번 판에서 탈락" if out is not None else f"{p.chips} 칩"
+        print(f"{p.name} ({args.agents[names.index(p.name)]}): {session.stats[p.name]['hands']}판 | {status}")
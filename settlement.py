@@ -0,0 +1,75 @@
+from collections import namedtuple
+
+# --- 쇼다운 정산 (사이드 팟) ---
+# 좌석별 투자금을 한 번 정렬해 모든 팟 층을 한 번에 만들고, 생존자를 정수 족보 점수로 한 번 순위를 매겨 나눕니다.
+# 플레이어 상태(invested 등)는 건드리지 않고 불변 정산 기록만 돌려줍니다. 실제 칩 지급은 호출하는 쪽이 합니다.
+#
+# 규칙
+#   - 층 k 의 크기 = (이번 층 투자 수준 - 이전 수준) x 그 수준 이상 투자한 좌석 수
+#   - 그 수준 이상 투자하고 폴드하지 않은 좌석만 해당 층을 가져갈 수 있습니다.
+#   - 자격자가 없는 층(폴드한 사람이 가장 많이 넣은 경우)은 바로 아래의 자격자가 있는 층에 합칩니다.
+#   - 나눠떨어지지 않는 칩은 first_seat 부터 좌석 순서로 공동 승자에게 한 개씩 줍니다.
+
+Pot = namedtuple("Pot", "amount eligible winners share odd_chips")
+# amount: 팟 크기 | eligible: 가져갈 자격이 있는 좌석 | winners: 승자 좌석 | share: 승자당 기본 몫
+# | odd_chips: 1칩씩 더 받은 좌석
+
+Settlement = namedtuple("Settlement", "pots payouts scores invested")
+# pots: Pot 튜플 (아래 층부터) | payouts: 좌석별 받은 칩 합계 | scores: 좌석별 족보 점수(폴드는 -1) | invested: 좌석별 투자금
+
+
+def build_pots(invested, folded):
+    """
+    (층 크기, 자격 좌석) 목록을 아래 층부터 반환합니다. 투자금 정렬 한 번으로 모든 층을 만듭니다.
+    자격자가 없는 층은 아래 층에 합쳐집니다.
+    """
+    n = len(invested)
+    order = sorted(range(n), key=invested.__getitem__)
+    layers = []
+    previous = 0
+    for i, seat in enumerate(order):
+        level = invested[seat]
+        if level == previous:
+            continue
+        amount = (level - previous) * (n - i)
+        eligible = tuple(sorted(s for s in order[i:] if not folded[s]))
+        if eligible or not layers:
+            layers.append([amount, eligible])
+        else:
+            layers[-1][0] += amount
+        previous = level
+    # 맨 아래 층부터 자격자가 없었다면(모두 폴드한 좌석만 투자) 위의 첫 자격 층에 합칩니다
+    while len(layers) > 1 and not layers[0][1]:
+        layers[1][0] += layers[0][0]
+        del layers[0]
+    return [tuple(layer) for layer in layers]
+
+
+def settle(invested, folded, scores, first_seat=0):
+    """
+    :param invested: 좌석별 이번 판 총 투자금
+    :param folded: 좌석별 폴드 여부
+    :param scores: 좌석별 정수 족보 점수 (hand_evaluator.evaluate). 폴드한 좌석 값은 무시합니다.
+    :param first_seat: 나눠떨어지지 않는 칩을 먼저 받는 좌석 (그 다음 좌석 순서로)
+    """
+    n = len(invested)
+    scores = tuple(-1 if folded[s] else scores[s] for s in range(n))
+    ranking = sorted((s for s in range(n) if not folded[s]), key=scores.__getitem__, reverse=True)
+
+    pots = []
+    payouts = [0] * n
+    for amount, eligible in build_pots(invested, folded):
+        if not eligible:
+            continue # 모두 폴드한 경우에만 생깁니다
+        best = next(scores[s] for s in ranking if s in eligible)
+        winners = tuple(s for s in eligible if scores[s] == best)
+        share, odd = divmod(amount, len(winners))
+        for s in winners:
+            payouts[s] += share
+        odd_chips = ()
+        if odd:
+            odd_chips = tuple(sorted(winners, key=lambda s: (s - first_seat) % n)[:odd])
+            for s in odd_chips:
+                payouts[s] += 1
+        pots.append(Pot(amount, eligible, winners, share, odd_chips))
+    return Settlement(tuple(pots), tuple(payouts), scores, tuple(invested))
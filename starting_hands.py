@@ -0,0 +1,231 @@
+import os
+import sys
+import math
+import time
+import struct
+import argparse
+from array import array
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+
+from hand_evaluator import CODE_OF_STR, canonicalize
+
+# --- 3구 시작 패 에퀴티 표 (버리기/공개 결정용) ---
+# 4장 중 1장을 버리고 1장을 공개하는 12가지 선택지의 쇼다운 에퀴티는 남기는 3장에만 달려 있습니다.
+# (어느 장을 공개하든 7장은 같고, 반응하지 않는 무작위 상대에게는 공개가 승패를 바꾸지 않습니다.)
+# 그래서 4장 패(C(52,4)) 대신 남기는 3장 패 C(52,3)=22100 가지를 무늬 동형으로 줄인 1755 개 클래스에 대해,
+# 무작위 상대(각자 무작위 7장)로 채운 2~5인 테이블의 에퀴티를 오프라인에서 몬테카를로로 구해 둡니다.
+# 버린 카드 1장이 덱에서 빠지는 효과는 무시합니다 (에퀴티 차이가 표본 오차보다 작음).
+#
+# 파일 구조 (리틀 엔디언): 헤더(20바이트) | class_of uint16[22100] | equity uint16[클래스 수][인원 수]
+#   class_of 는 정렬된 3장 (a < b < c) 의 조합 번호 C(c,3)+C(b,2)+a -> 클래스 번호, equity 는 에퀴티 x 65535.
+# 조회는 조합 번호 계산과 배열 인덱싱 두 번뿐이라 numpy 없이 O(1) 입니다. 표를 만들 때만 numpy 가 필요합니다.
+
+MAGIC = b"SHND"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHBBxxI4x") # magic, 포맷 버전, 클래스 수, 최소 인원, 최대 인원, 클래스당 표본 수
+KEPT_CARDS = 3
+MIN_PLAYERS, MAX_PLAYERS = 2, 5
+NUM_COMBOS = math.comb(52, KEPT_CARDS)
+EQUITY_SCALE = 65535
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "starting_hands.bin")
+
+_C2 = tuple(math.comb(i, 2) for i in range(52))
+_C3 = tuple(math.comb(i, 3) for i in range(52))
+
+
+def combo_index(codes):
+    """카드 3장 -> 0 ~ 22099 조합 번호 (순서 무관)."""
+    a, b, c = sorted(codes)
+    return _C3[c] + _C2[b] + a
+
+
+def canonical_classes():
+    """(class_of, 대표 패 목록). 모든 3장 조합을 무늬 동형 정규형으로 묶고 처음 나온 순서대로 번호를 붙입니다."""
+    class_of = array('H', bytes(2 * NUM_COMBOS))
+    classes = {}
+    representatives = []
+    for combo in combinations(range(52), KEPT_CARDS):
+        key = canonicalize([combo])[0]
+        index = classes.get(key)
+        if index is None:
+            index = classes[key] = len(representatives)
+            representatives.append(key)
+        class_of[combo_index(combo)] = index
+    return class_of, representatives
+
+
+def _field_equities(task):
+    """
+    대표 패들마다 남은 49장을 섞어 내 나머지 4장과 상대 4명의 7장을 한 번에 뽑고, 같은 표본의 앞쪽 상대만 써서
+    2~5인 에퀴티를 함께 구합니다 (인원 수 사이 비교가 같은 표본을 공유). 무승부는 공동 승자 수로 나눕니다.
+    """
+    import numpy as np
+    from batch_evaluator import evaluate_batch
+
+    first, representatives, samples, seed = task
+    opponents = MAX_PLAYERS - 1
+    draw = (7 - KEPT_CARDS) + 7 * opponents
+    rows = []
+    for offset, cards in enumerate(representatives):
+        rng = np.random.default_rng([seed, first + offset])
+        remaining = np.array([c for c in range(52) if c not in cards], dtype=np.int64)
+        drawn = remaining[np.argsort(rng.random((samples, len(remaining))), axis=1)[:, :draw]]
+        mine = np.concatenate([np.broadcast_to(np.array(cards, dtype=np.int64), (samples, KEPT_CARDS)),
+                               drawn[:, :7 - KEPT_CARDS]], axis=1)
+        my_score = evaluate_batch(mine)[:, None]
+        opp_cards = drawn[:, 7 - KEPT_CARDS:].reshape(samples * opponents, 7)
+        opp_scores = evaluate_batch(opp_cards).reshape(samples, opponents)
+        row = []
+        for players in range(MIN_PLAYERS, MAX_PLAYERS + 1):
+            field = opp_scores[:, :players - 1]
+            best = field.max(axis=1, keepdims=True)
+            tied = (field == my_score).sum(axis=1, keepdims=True)
+            equity = np.where(my_score > best, 1.0, np.where(my_score == best, 1.0 / (tied + 1), 0.0))
+            row.append(int(round(float(equity.mean()) * EQUITY_SCALE)))
+        rows.append(row)
+    return rows
+
+
+def _collect(equity, parts):
+    for rows in parts:
+        for row in rows:
+            equity.extend(row)
+
+
+def build_table(samples=10000, workers=1, seed=0, chunk=64):
+    """
+    표 전체를 계산해 StartingHandTable 로 돌려줍니다. 클래스마다 시드가 정해져 있어 workers 수와 상관없이 같은 결과입니다.
+    """
+    class_of, representatives = canonical_classes()
+    tasks = [(first, representatives[first:first + chunk], samples, seed)
+             for first in range(0, len(representatives), chunk)]
+    equity = array('H')
+    if workers <= 1:
+        _collect(equity, map(_field_equities, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            _collect(equity, pool.map(_field_equities, tasks))
+    return StartingHandTable(class_of, equity, len(representatives), samples)
+
+
+class StartingHandTable:
+    def __init__(self, class_of, equity, num_classes, samples=0):
+        self.class_of = class_of
+        self.equity = equity
+        self.num_classes = num_classes
+        self.samples = samples
+        self.width = MAX_PLAYERS - MIN_PLAYERS + 1
+
+    def save(self, path=DEFAULT_PATH):
+        class_of, equity = self.class_of, self.equity
+        if sys.byteorder != 'little':
+            class_of, equity = array('H', class_of), array('H', equity)
+            class_of.byteswap()
+            equity.byteswap()
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.num_classes, MIN_PLAYERS, MAX_PLAYERS, self.samples))
+            f.write(class_of.tobytes())
+            f.write(equity.tobytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, fmt, num_classes, min_players, max_players, samples = HEADER.unpack_from(data)
+        if magic != MAGIC or fmt != FORMAT_VERSION or (min_players, max_players) != (MIN_PLAYERS, MAX_PLAYERS):
+            raise ValueError(f"시작 패 표 파일 형식이 맞지 않습니다: {path}")
+        class_of = array('H', data[HEADER.size:HEADER.size + 2 * NUM_COMBOS])
+        equity = array('H', data[HEADER.size + 2 * NUM_COMBOS:])
+        if len(equity) != num_classes * (max_players - min_players + 1):
+            raise ValueError(f"시작 패 표 파일이 잘렸습니다: {path}")
+        if sys.byteorder != 'little':
+            class_of.byteswap()
+            equity.byteswap()
+        return cls(class_of, equity, num_classes, samples)
+
+    def kept_equity(self, codes, num_players):
+        """남기는 3장(카드 코드)의 num_players 인 테이블 에퀴티 (인원은 2~5 로 자름)."""
+        players = min(max(num_players, MIN_PLAYERS), MAX_PLAYERS)
+        return self.equity[self.class_of[combo_index(codes)] * self.width + players - MIN_PLAYERS] / EQUITY_SCALE
+
+    def option_equities(self, codes, num_players):
+        """4장(카드 코드)의 12가지 (버릴 번호, 공개할 번호) 선택지별 에퀴티."""
+        kept = [self.kept_equity([c for i, c in enumerate(codes) if i != d], num_players) for d in range(4)]
+        return {(d, r): kept[d] for d in range(4) for r in range(4) if d != r}
+
+    def choose(self, codes, num_players):
+        """에퀴티가 가장 높은 버릴 카드와, 남은 3장 중 보여 줄 카드 (reveal_index)."""
+        discard_idx = max(range(4), key=lambda d: self.kept_equity([c for i, c in enumerate(codes) if i != d],
+                                                                   num_players))
+        return discard_idx, reveal_index(codes, discard_idx)
+
+
+def reveal_index(codes, discard_idx):
+    """
+    공개 카드는 에퀴티와 무관하므로 정보를 덜 주는 쪽을 고릅니다:
+    남는 3장에 페어가 있으면 페어가 아닌 카드(트리플이면 아무거나), 아니면 가장 낮은 카드를 보여 줍니다.
+    """
+    kept = [i for i in range(4) if i != discard_idx]
+    ranks = [codes[i] >> 2 for i in kept]
+    singles = [i for i, rank in zip(kept, ranks) if ranks.count(rank) == 1]
+    candidates = singles if 0 < len(singles) < len(kept) else kept
+    return min(candidates, key=lambda i: codes[i] >> 2)
+
+
+_default_table = None
+
+
+def default_table():
+    """DEFAULT_PATH 의 표 (한 번만 읽음). 파일이 없으면 None."""
+    global _default_table
+    if _default_table is None and os.path.exists(DEFAULT_PATH):
+        _default_table = StartingHandTable.load(DEFAULT_PATH)
+    return _default_table
+
+
+def to_card_code(card):
+    """Card 객체 또는 원격 에이전트가 받는 'SA' 같은 문자열 -> 카드 코드."""
+    return CODE_OF_STR[card] if isinstance(card, str) else card.code
+
+
+class StartingHandMixin:
+    """
+    PokerAgent 계열 에이전트 클래스 앞에 섞으면 3구 버리기/공개를 시작 패 표 조회로 고릅니다.
+    PokerGame 은 choose_discard_for_field 가 있는 에이전트에게 이번 판 인원 수를 같이 넘겨 줍니다.
+    표 파일이 없으면 다음 클래스(PokerAgent 기본값)로 넘깁니다.
+    """
+    field_size = MAX_PLAYERS # 인원 수를 모를 때(원격 호출 등) 가정하는 테이블 크기
+
+    def choose_discard_for_field(self, hidden_cards, num_players):
+        self.field_size = num_players
+        return self.choose_discard_and_reveal(hidden_cards)
+
+    def choose_discard_and_reveal(self, hidden_cards):
+        table = default_table()
+        if table is None:
+            return super().choose_discard_and_reveal(hidden_cards)
+        return table.choose([to_card_code(c) for c in hidden_cards], self.field_size)
+
+
+# --- 실행 메인 블록 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="7 Poker starting-hand (discard/reveal) table generator")
+    parser.add_argument('-s', '--samples', type=int, default=10000, help='클래스당 표본 수')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1, help='워커 프로세스 수')
+    parser.add_argument('--seed', type=int, default=0, help='루트 시드')
+    parser.add_argument('--out', type=str, default=DEFAULT_PATH, help='저장할 표 파일 경로')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = build_table(args.samples, args.workers, args.seed)
+    table.save(args.out)
+    elapsed = time.perf_counter() - start
+    print(f"=== {table.num_classes}개 클래스 x {table.width}개 인원 | 클래스당 {args.samples}표본 | {elapsed:.1f}초 | "
+          f"{os.path.getsize(args.out):,}바이트 ===")
+    for text in (("SA", "HA", "DA"), ("SA", "SK", "SQ"), ("S2", "H7", "DJ")):
+        codes = [CODE_OF_STR[t] for t in text]
+        row = " ".join(f"{n}인 {table.kept_equity(codes, n):.3f}" for n in range(MIN_PLAYERS, MAX_PLAYERS + 1))
+        print(f"{' '.join(text)}: {row}")
@@ -0,0 +1,180 @@
+import json
+from bisect import bisect_left
+from functools import lru_cache
+
+from hand_evaluator import (CODE_OF_STR, canonicalize, evaluate, HIGH_CARD, ONE_PAIR, TWO_PAIR,
+                            TRIPS, STRAIGHT, FLUSH, QUADS)
+
+# --- 상태 추상화 (LearningAgent 조회 키) ---
+# get_ai_state 딕셔너리를 몇 개의 작은 버킷으로 요약해 고정폭 정수/바이트 키로 만듭니다.
+# 상대 이름, 정확한 칩/팟 크기처럼 판마다 달라지는 값은 버킷으로 뭉개서 경험이 다른 판에도 재사용되게 합니다.
+#
+#   스트리트(내 카드 수 3~7) | 내 족보 버킷 | 드로우 | 팟 오즈 버킷 | 스택/팟 비율 버킷
+#   | 살아있는 상대 수 | 가장 강해 보이는 상대의 공개 패 버킷 | 그 상대의 좌석 상대 위치
+#
+# 각 필드를 혼합 기수(mixed radix)로 이어 붙이므로 index() 는 0 ~ num_states-1 의 조밀한 정수입니다.
+
+ABSTRACTION_VERSION = 1
+
+NO_DRAW, STRAIGHT_DRAW, FLUSH_DRAW, BOTH_DRAWS = range(4)
+
+# 상대 공개 패 버킷: 0 낮은 하이카드, 1 A/K 하이, 2 원페어, 3 투페어, 4 4장 플러시/스트레이트 위협, 5 트리플 이상
+BOARD_BUCKETS = 6
+
+_WINDOWS = tuple(((1 << 12) | 0b1111) if low == -1 else (0b11111 << low) for low in range(-1, 9))
+
+
+def made_hand(codes):
+    """
+    현재 카드(3~7장)로 이미 완성된 족보의 (족보 랭크, 대표 값).
+    5장 미만이면 페어/투페어/트리플/포카드만 판별합니다.
+    """
+    if len(codes) >= 5:
+        score = evaluate(codes)
+        return score >> 20, (score >> 16) & 0xF
+    counts = {}
+    for c in codes:
+        counts[c >> 2] = counts.get(c >> 2, 0) + 1
+    groups = sorted(((n, r + 2) for r, n in counts.items()), reverse=True)
+    top_count, top_value = groups[0]
+    if top_count == 4:
+        return QUADS, top_value
+    if top_count == 3:
+        return TRIPS, top_value
+    if top_count == 2:
+        return (TWO_PAIR if len(groups) > 1 and groups[1][0] == 2 else ONE_PAIR), top_value
+    return HIGH_CARD, top_value
+
+
+def draw_flags(codes, category):
+    """4장 플러시 드로우 / 4장 스트레이트 드로우 여부 (이미 그 이상이 완성됐으면 드로우로 치지 않음)."""
+    suit_counts = [0, 0, 0, 0]
+    rank_mask = 0
+    for c in codes:
+        suit_counts[c & 3] += 1
+        rank_mask |= 1 << (c >> 2)
+    flush_draw = category < FLUSH and max(suit_counts) >= 4
+    straight_draw = category < STRAIGHT and any(bin(rank_mask & w).count('1') >= 4 for w in _WINDOWS)
+    return (FLUSH_DRAW if flush_draw else NO_DRAW) | (STRAIGHT_DRAW if straight_draw else NO_DRAW)
+
+
+def board_bucket(codes):
+    """상대의 공개 패만 보고 얼마나 위협적인지 0~5 버킷으로 나눕니다."""
+    if not codes:
+        return 0
+    category, value = made_hand(codes)
+    if category >= TRIPS:
+        return 5
+    if len(codes) >= 4 and draw_flags(codes, category) != NO_DRAW:
+        return 4
+    if category == TWO_PAIR:
+        return 3
+    if category == ONE_PAIR:
+        return 2
+    return 1 if value >= 13 else 0
+
+
+@lru_cache(maxsize=1 << 16)
+def _board_bucket_of(card_strs):
+    """공개 패 문자열 튜플 -> board_bucket. 같은 스트리트 안에서는 같은 패가 반복해서 들어옵니다."""
+    return board_bucket([CODE_OF_STR[c] for c in card_strs])
+
+
+@lru_cache(maxsize=1 << 16)
+def _hand_features(card_strs):
+    """내 카드 문자열 튜플 -> (스트리트, 족보 버킷, 드로우)."""
+    my_cards = [CODE_OF_STR[c] for c in card_strs]
+    street = min(max(len(my_cards) - 3, 0), 4)
+    category, value = made_hand(my_cards)
+    tier = 0 if value <= 9 else 1 if value <= 12 else 2
+    draw = draw_flags(my_cards, category) if len(my_cards) < 7 else NO_DRAW
+    return street, category * 3 + tier, draw
+
+
+class StateAbstraction:
+    """
+    설정 가능한 상태 추상화. 버킷 경계를 바꾸면 version 도 바꿔서 서로 다른 추상화의 키가 섞이지 않게 합니다.
+    :param pot_odds_edges: 콜 금액 / (팟 + 콜 금액) 경계. 콜 금액 0 은 항상 별도 버킷입니다.
+    :param spr_edges: 내 칩 / 팟 경계.
+    :param include_cards: True 면 무늬 동형 정규화한 실제 카드까지 키(bytes)에 붙입니다 (조밀 인덱스 없음).
+    """
+
+    def __init__(self, pot_odds_edges=(0.1, 0.2, 0.33), spr_edges=(1, 4, 16), max_opponents=4,
+                 include_cards=False, version=ABSTRACTION_VERSION):
+        self.pot_odds_edges = tuple(pot_odds_edges)
+        self.spr_edges = tuple(spr_edges)
+        self.max_opponents = max_opponents
+        self.include_cards = include_cards
+        self.version = version
+
+        # (필드 이름, 기수) - index() 의 자릿수 순서
+        self.radices = (
+            ("street", 5),
+            ("strength", 9 * 3),
+            ("draw", 4),
+            ("pot_odds", len(self.pot_odds_edges) + 2),
+            ("spr", len(self.spr_edges) + 1),
+            ("opponents", max_opponents),
+            ("threat", BOARD_BUCKETS),
+            ("threat_position", max_opponents),
+        )
+        self.num_states = 1
+        for _, radix in self.radices:
+            self.num_states *= radix
+
+    def features(self, state):
+        """상태 -> 필드별 버킷 값 튜플 (radices 순서)."""
+        street, strength, draw = _hand_features(tuple(state["my_hidden_cards"] + state["my_public_cards"]))
+
+        pot = state["pot"]
+        call = state["call_amount"]
+        pot_odds = 0 if call <= 0 else 1 + bisect_left(self.pot_odds_edges, call / (pot + call))
+        spr = bisect_left(self.spr_edges, state["my_chips"] / pot) if pot > 0 else len(self.spr_edges)
+
+        active, threat, threat_position = 0, 0, 0
+        for opp in self.ordered_opponents(state):
+            if opp["is_folded"]:
+                continue
+            bucket = _board_bucket_of(tuple(opp["public_cards"]))
+            if active == 0 or bucket > threat:
+                threat, threat_position = bucket, min(active, self.max_opponents - 1)
+            active += 1
+        active = min(max(active, 1), self.max_opponents) - 1
+
+        return (street, strength, draw, pot_odds, spr, active, threat, threat_position)
+
+    def ordered_opponents(self, state):
+        """
+        상대들을 내 다음 좌석부터 도는 순서로 반환합니다.
+        opponents 는 좌석 순서(나 제외)로 들어 있으므로 my_seat 만큼 돌리면 됩니다. my_seat 이 없으면 그대로 둡니다.
+        """
+        opponents = list(state["opponents"].values())
+        seat = state.get("my_seat", 0)
+        return opponents[seat:] + opponents[:seat]
+
+    def index(self, state):
+        """0 ~ num_states-1 범위의 조밀한 상태 번호."""
+        index = 0
+        for value, (_, radix) in zip(self.features(state), self.radices):
+            index = index * radix + value
+        return index
+
+    def key(self, state):
+        """
+        저장소용 고정폭 바이트 키: 버전(1바이트) + index(4바이트).
+        include_cards 면 무늬 정규화한 (내 히든, 내 공개, 좌석 순 상대 공개) 카드를 뒤에 붙입니다.
+        """
+        key = bytes((self.version,)) + self.index(state).to_bytes(4, 'big')
+        if not self.include_cards:
+            return key
+        groups = [[CODE_OF_STR[c] for c in state["my_hidden_cards"]],
+                  [CODE_OF_STR[c] for c in state["my_public_cards"]]]
+        groups += [[CODE_OF_STR[c] for c in opp["public_cards"]] for opp in self.ordered_opponents(state)]
+        for codes in canonicalize(groups):
+            key += bytes((len(codes), *codes))
+        return key
+
+
+def legacy_key_to_state(legacy_key):
+    """예전 LearningAgent 키(json.dumps(state, sort_keys=True))를 상태 딕셔너리로 되돌립니다."""
+    return json.loads(legacy_key)
@@ -0,0 +1,204 @@
+import os
+import json
+import sqlite3
+from collections import OrderedDict
+
+from events import ACTIONS
+
+# --- LearningAgent 학습 데이터 저장소 ---
+# 상태 키 -> {액션: 점수} 를 저장합니다. 바뀐 항목만 모아 두었다가 commit() 에서 한 번에 기록합니다.
+# SQLiteStore 는 필요한 항목만 그때그때 읽어 오므로(지연 로딩) DB 가 커져도 시작 비용이 늘지 않습니다.
+
+
+class MemoryStore:
+    """저장소 인터페이스."""
+
+    def get(self, key):
+        """키의 점수 딕셔너리를 반환합니다. 없으면 None."""
+        raise NotImplementedError
+
+    def put(self, key, scores):
+        """점수 딕셔너리를 기록 대상으로 표시합니다. 실제 쓰기는 commit() 에서 일어납니다."""
+        raise NotImplementedError
+
+    def record(self, key, action, reward):
+        """update_memory 의미의 누적: 키의 액션 점수에 보상을 더합니다."""
+        scores = dict(self.get(key) or {})
+        scores[action] = scores.get(action, 0) + reward
+        self.put(key, scores)
+
+    def commit(self):
+        raise NotImplementedError
+
+    def close(self):
+        self.commit()
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+class JsonStore(MemoryStore):
+    """기존 방식의 단일 JSON 파일 저장소. commit 때마다 파일 전체를 다시 씁니다 (호환용)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {}
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def put(self, key, scores):
+        self.data[key] = scores
+        self.dirty = True
+
+    def commit(self):
+        if not self.dirty:
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=4)
+        self.dirty = False
+
+    def items(self):
+        return self.data.items()
+
+    def __len__(self):
+        return len(self.data)
+
+
+class SQLiteStore(MemoryStore):
+    """
+    SQLite(WAL 모드) 저장소. 액션마다 한 컬럼이며 해당 상태에서 본 적 없는 액션은 NULL 입니다.
+    읽기만 한 항목은 cache_size 개까지 LRU 로 캐시하고, 바뀐 항목은 commit 때까지 따로 붙잡아 두었다가 한 트랜잭션으로 씁니다.
+    그래서 긴 실행에서 많은 상태를 거쳐도 메모리에는 최근에 읽은 항목과 아직 기록하지 않은 항목만 남습니다.
+    여러 프로세스가 같은 파일을 쓸 수 있도록 record() 의 누적은 절댓값이 아니라 증분(col = col + ?)으로 기록하고,
+    put() 은 다른 프로세스가 먼저 쓴 값을 덮어쓰지 않게 비어 있는(NULL) 컬럼만 채웁니다.
+    """
+
+    _COLUMNS = ", ".join(a.lower() for a in ACTIONS)
+
+    def __init__(self, path, cache_size=100_000):
+        self.path = path
+        self.cache_size = cache_size
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS memory (state PRIMARY KEY, {self._COLUMNS})")
+        self.conn.commit()
+        self.cache = OrderedDict() # 읽기만 한 항목 (LRU)
+        self.pinned = {} # 바뀐 항목의 현재 점수. commit 전에는 내보내지 않습니다.
+        self.dirty = {} # 키 -> put() 한 점수 (그 뒤의 record 증분은 pending 에만 반영)
+        self.pending = {} # 키 -> {액션: 아직 기록하지 않은 보상 증분}
+
+    def get(self, key):
+        scores = self.pinned.get(key)
+        if scores is not None:
+            return scores
+        scores = self.cache.get(key)
+        if scores is not None:
+            self.cache.move_to_end(key)
+            return scores
+        row = self.conn.execute(f"SELECT {self._COLUMNS} FROM memory WHERE state = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        scores = {a: v for a, v in zip(ACTIONS, row) if v is not None}
+        self.cache[key] = scores
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return scores
+
+    def put(self, key, scores):
+        self.cache.pop(key, None)
+        self.pinned[key] = scores
+        self.dirty[key] = dict(scores)
+
+    def record(self, key, action, reward):
+        scores = self.pinned.get(key)
+        if scores is None:
+            scores = self.get(key) or {}
+            self.cache.pop(key, None) # 바뀐 항목은 commit 까지 pinned 에서만 관리
+            self.pinned[key] = scores
+        scores[action] = scores.get(action, 0) + reward
+        deltas = self.pending.setdefault(key, {})
+        deltas[action] = deltas.get(action, 0) + reward
+
+    def commit(self):
+        if not self.dirty and not self.pending:
+            return
+        with self.conn:
+            if self.dirty:
+                rows = [(key, *(scores.get(a) for a in ACTIONS)) for key, scores in self.dirty.items()]
+                placeholders = ", ".join("?" * (len(ACTIONS) + 1))
+                fill = ", ".join(f"{c} = COALESCE({c}, excluded.{c})" for c in (a.lower() for a in ACTIONS))
+                self.conn.executemany(f"INSERT INTO memory (state, {self._COLUMNS}) VALUES ({placeholders}) "
+                                      f"ON CONFLICT(state) DO UPDATE SET {fill}", rows)
+            for action in ACTIONS:
+                rows = [(key, deltas[action]) for key, deltas in self.pending.items() if action in deltas]
+                if rows:
+                    c = action.lower()
+                    self.conn.executemany(f"INSERT INTO memory (state, {c}) VALUES (?, ?) "
+                                          f"ON CONFLICT(state) DO UPDATE SET {c} = COALESCE({c}, 0) + excluded.{c}", rows)
+        # 다른 프로세스의 증분이 섞였을 수 있으므로 기록한 항목은 다음에 DB 에서 다시 읽습니다.
+        self.pinned.clear()
+        self.dirty.clear()
+        self.pending.clear()
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+    def items(self):
+        """저장된 모든 항목을 차례로 읽습니다 (캐시에만 있는 변경분은 commit 후 보입니다)."""
+        for key, *values in self.conn.execute(f"SELECT state, {self._COLUMNS} FROM memory"):
+            yield key, {a: v for a, v in zip(ACTIONS, values) if v is not None}
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+
+def migrate_json(json_path, target, key_fn=None):
+    """
+    기존 LearningAgent_Shared_db.json 의 항목을 target 저장소로 옮기고 commit 합니다. 옮긴 항목 수를 반환합니다.
+    key_fn 이 주어지면 예전 키를 새 키로 바꾸고, 같은 새 키로 모이는 항목들의 점수는 액션별로 더합니다.
+    """
+    source = JsonStore(json_path)
+    for key, scores in source.items():
+        if key_fn is not None:
+            key = key_fn(key)
+            merged = dict(target.get(key) or {})
+            for action, score in scores.items():
+                merged[action] = merged.get(action, 0) + score
+            scores = merged
+        target.put(key, scores)
+    target.commit()
+    return len(source)
+
+
+def migrate_json_to_sqlite(json_path, sqlite_path, key_fn=None):
+    target = SQLiteStore(sqlite_path)
+    count = migrate_json(json_path, target, key_fn)
+    target.close()
+    return count
+
+
+def open_store(path, legacy_json_path=None, key_fn=None, num_states=None, abstraction_version=None, readonly=False):
+    """
+    확장자로 저장소를 고릅니다: .json -> JsonStore, .qtab -> 조밀 Q 테이블(qtable.py), 그 외 -> SQLiteStore.
+    새 파일을 만드는 경우 legacy_json_path 가 있으면 먼저 마이그레이션합니다 (key_fn 으로 키 변환).
+    .qtab 은 새로 만들 때 num_states(StateAbstraction.num_states) 가 필요하고, readonly 로 열 수 있습니다.
+    abstraction_version 이 주어지면 기존 .qtab 의 추상화 버전과 다를 때 ValueError 를 냅니다.
+    """
+    if path.endswith(".json"):
+        return JsonStore(path)
+    migrate = legacy_json_path and not os.path.exists(path) and os.path.exists(legacy_json_path)
+    if path.endswith(".qtab"):
+        from qtable import QTableStore # numpy 는 조밀 모드에서만 필요
+        store = QTableStore(path, num_states, abstraction_version, readonly)
+    else:
+        store = SQLiteStore(path)
+    if migrate and not readonly:
+        migrate_json(legacy_json_path, store, key_fn)
+    return store
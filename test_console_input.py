@@ -0,0 +1,27 @@
+import os
+import asyncio
+
+from poker_env import ConsoleInput, HumanAgent
+
+
+def test_timed_out_prompt_does_not_eat_next_line():
+    r, w = os.pipe()
+    console = ConsoleInput(os.fdopen(r))
+    human = HumanAgent("Player_1", console=console)
+
+    async def main():
+        try:
+            await asyncio.wait_for(asyncio.to_thread(console.input, "q1> "), 0.1)
+        except asyncio.TimeoutError:
+            human.cancel_decision()
+        os.write(w, b"late\n") # 시간이 지난 질문에 대한 답: 버려져야 함
+        await asyncio.sleep(0.1)
+
+        async def feed():
+            await asyncio.sleep(0.1)
+            os.write(w, b"fresh\n")
+        _, line = await asyncio.gather(feed(), asyncio.to_thread(console.input, "q2> "))
+        return line
+
+    assert asyncio.run(main()) == "fresh"
+    os.close(w)
@@ -0,0 +1,59 @@
+import random
+
+from events import ACTION_INDEX
+from game_state import GameState, FINISHED
+from poker_env import PokerGame, DISCARD_DECISION
+
+FIELDS = ("chips", "invested", "current_bet", "folded", "all_in", "hidden", "public", "pot", "current_highest_bet",
+          "street", "seat", "phase", "top")
+
+
+def _replay(seed, num_players, short_stacks=False):
+    """PokerGame 한 판을 무작위 결정으로 진행하면서 같은 결정을 GameState 에 적용해 결정마다 상태를 비교합니다."""
+    rng = random.Random(seed)
+    names = [f"Player_{i + 1}" for i in range(num_players)]
+    stacks = {name: rng.randint(3, 40) for name in names} if short_stacks else None # 올인과 사이드 팟이 자주 나오게
+    game = PokerGame(names, chips=stacks, seed=seed)
+    chips = {p.name: p.chips for p in game.players}
+    steps = game._hand_steps()
+    state = None
+    answer = None
+    decisions = 0
+    while True:
+        try:
+            decision = steps.send(answer)
+        except StopIteration:
+            break
+        snapshot = GameState.from_game(game, decision)
+        if state is None:
+            state = snapshot
+        for field in FIELDS:
+            assert getattr(state, field) == getattr(snapshot, field), (seed, decisions, field)
+        if decision.kind == DISCARD_DECISION:
+            answer = tuple(rng.sample(range(4), 2))
+            state.step(answer)
+        else:
+            answer = rng.choice(decision.options)
+            state.step(ACTION_INDEX[answer])
+        decisions += 1
+
+    assert state.phase == FINISHED
+    assert state.payoffs() == [p.chips - chips[p.name] for p in game.players]
+    return decisions
+
+
+def test_from_game_replay_matches_poker_game():
+    decisions = 0
+    for seed in range(200):
+        decisions += _replay(seed, 2 + seed % 4, short_stacks=seed % 2 == 1)
+    assert decisions > 1000
+
+
+def test_clone_is_independent():
+    game = PokerGame(["Player_1", "Player_2", "Player_3"], seed=7)
+    steps = game._hand_steps()
+    state = GameState.from_game(game, next(steps))
+    copy = state.clone()
+    copy.step((0, 1))
+    assert state.hidden[0] != copy.hidden[0]
+    assert state.seat == 0 and copy.seat == 1
@@ -0,0 +1,53 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from hand_evaluator import evaluate, code_from_str
+from poker_env import CARDS, get_best_hand, evaluate_5_cards
+
+
+def _reference(cards):
+    """기존 방식: 21개(6장이면 6개) 5장 조합을 모두 판별해 가장 높은 튜플."""
+    return max(evaluate_5_cards(combo) for combo in combinations(cards, 5))
+
+
+def _cards(*texts):
+    return [CARDS[code_from_str(t)] for t in texts]
+
+
+@pytest.mark.parametrize("size", [5, 6, 7])
+def test_matches_reference_on_random_hands(size):
+    rng = random.Random(size)
+    hands = [rng.sample(CARDS, size) for _ in range(3000)]
+    references = [_reference(cards) for cards in hands]
+    scores = [evaluate([c.code for c in cards]) for cards in hands]
+    for cards, reference in zip(hands, references):
+        assert get_best_hand(cards) == reference
+    # 정수 점수의 순서가 튜플 순서와 같아야 함 (무승부 포함)
+    for i in range(len(hands) - 1):
+        a, b = references[i], references[i + 1]
+        assert (scores[i] > scores[i + 1]) == (a > b)
+        assert (scores[i] == scores[i + 1]) == (a == b)
+
+
+def test_back_straight_and_mountain():
+    back = _cards("SA", "H2", "D3", "C4", "S5")
+    mountain = _cards("SA", "HK", "DQ", "CJ", "ST")
+    six_high = _cards("S2", "H3", "D4", "C5", "S6")
+    for cards in (back, mountain, six_high):
+        assert get_best_hand(cards) == evaluate_5_cards(cards)
+    # 기준 구현에서 백스트레이트는 (4, 14): 6 하이 스트레이트보다 높고 마운틴과 같음
+    score = lambda cards: evaluate([c.code for c in cards])
+    assert score(back) > score(six_high)
+    assert score(back) == score(mountain)
+
+
+def test_back_straight_flush_and_royal():
+    back_flush = _cards("HA", "H2", "H3", "H4", "H5", "C9", "DK")
+    royal = _cards("SA", "SK", "SQ", "SJ", "ST", "H2", "D2")
+    for cards in (back_flush, royal):
+        assert get_best_hand(cards) == _reference(cards)
+        assert get_best_hand(cards)[0] == 8
+    assert ((evaluate([c.code for c in royal]) > evaluate([c.code for c in back_flush]))
+            == (_reference(royal) > _reference(back_flush)))
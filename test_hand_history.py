@@ -0,0 +1,61 @@
+import pytest
+
+from events import RECORD
+from hand_history import HandHistory, HandHistorySink, iter_hands
+from poker_env import PokerGame, create_agent, derive_seed
+
+
+def _write_history(path, hands=5):
+    names = ["Player_1", "Player_2", "Player_3"]
+    agents = {name: create_agent("random", name, verbose=False, seed=derive_seed(0, "agent", name)) for name in names}
+    sink = HandHistorySink(path)
+    for i in range(hands):
+        PokerGame(names, sink=sink, seed=derive_seed(0, "hand", i)).play_hand(agents)
+    sink.close()
+
+
+def test_close_with_live_views(tmp_path):
+    path = str(tmp_path / "history.bin")
+    _write_history(path)
+
+    history = HandHistory(path)
+    assert len(history) == 5
+    raw = history.raw(0)
+    records = history.records()
+    expected = bytes(raw)
+    history.close() # 뷰가 살아 있어도 BufferError 없이 닫혀야 합니다
+    assert bytes(raw) == expected
+    assert len(records) * RECORD.size >= len(expected)
+
+
+def test_records_copy(tmp_path):
+    path = str(tmp_path / "history.bin")
+    _write_history(path)
+
+    with HandHistory(path) as history:
+        view = history.records()
+        copied = history.records(copy=True)
+        assert (view == copied).all()
+        del view
+    assert copied["kind"].size > 0
+
+
+def test_torn_final_record_is_skipped(tmp_path):
+    path = str(tmp_path / "history.bin")
+    _write_history(path)
+    hands = list(iter_hands(path))
+    with open(path, 'ab') as f:
+        f.write(b"\x00\x01\x02") # 쓰다가 끊긴 레코드
+
+    assert list(iter_hands(path)) == hands
+    assert list(iter_hands(path, chunk_size=RECORD.size)) == hands
+    with HandHistory(path) as history:
+        assert list(history) == hands
+        assert len(history.records()) == sum(len(hand) for hand in hands)
+
+
+def test_iter_hands_rejects_small_chunks(tmp_path):
+    path = str(tmp_path / "history.bin")
+    _write_history(path)
+    with pytest.raises(ValueError):
+        list(iter_hands(path, chunk_size=RECORD.size - 1))
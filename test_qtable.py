@@ -0,0 +1,48 @@
+import pytest
+
+from LearningAgent import LearningAgent
+from qtable import QTable, QTableStore
+from state_abstraction import StateAbstraction
+
+
+def _key(abstraction, index):
+    return bytes([abstraction.version]) + index.to_bytes(4, 'big')
+
+
+def test_readonly_store_ignores_writes(tmp_path):
+    path = str(tmp_path / "q.qtab")
+    abstraction = StateAbstraction()
+    QTable(path, abstraction.num_states, abstraction.version).add(7, "CALL", 3.0)
+
+    store = QTableStore(path, readonly=True)
+    key = _key(abstraction, 7)
+    store.put(key, {"CALL": 0})
+    store.record(key, "CALL", 5.0)
+    store.commit()
+    assert store.get(key)["CALL"] == 3.0
+
+
+def test_readonly_learning_agent_end_hand(tmp_path, monkeypatch):
+    path = str(tmp_path / "q.qtab")
+    abstraction = StateAbstraction()
+    QTable(path, abstraction.num_states, abstraction.version).flush()
+    monkeypatch.setattr(LearningAgent, "shared_memory", None)
+    monkeypatch.setattr(LearningAgent, "db_filename", path)
+    monkeypatch.setattr(LearningAgent, "db_readonly", True)
+
+    agent = LearningAgent("Player_1", verbose=False, seed=0)
+    agent.decisions.append((_key(abstraction, 11), "HALF"))
+    agent.end_hand(10)
+    assert agent.memory.get(_key(abstraction, 11))["HALF"] == 0.0
+
+
+def test_abstraction_version_mismatch(tmp_path):
+    path = str(tmp_path / "q.qtab")
+    abstraction = StateAbstraction()
+    QTable(path, abstraction.num_states, abstraction.version).flush()
+
+    with pytest.raises(ValueError):
+        QTableStore(path, abstraction_version=abstraction.version + 1)
+    store = QTableStore(path, readonly=True)
+    with pytest.raises(ValueError):
+        store.get(bytes([abstraction.version + 1]) + (7).to_bytes(4, 'big'))
@@ -0,0 +1,20 @@
+import math
+
+import numpy as np
+import pytest
+
+from range_model import range_equity
+
+
+def test_range_equity_conflicting_ranges_not_nan():
+    combos = np.array([[0, 1], [2, 3], [4, 5]])
+    weights = np.array([1.0, 0.0, 0.0]) # 두 상대가 같은 조합에만 몰려 있어 모든 표본이 버려짐
+    result = range_equity([48, 49, 50], [((10,), combos, weights), ((11,), combos, weights)], seed=1)
+    assert not math.isnan(result.equity)
+    assert 0.0 <= result.equity <= 1.0
+
+
+def test_range_equity_impossible_ranges_raise():
+    combos = np.array([[0, 1]])
+    with pytest.raises(ValueError):
+        range_equity([48, 49, 50], [((10,), combos, np.ones(1)), ((11,), combos, np.ones(1))], seed=1)
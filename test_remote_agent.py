@@ -0,0 +1,36 @@
+import json
+import asyncio
+
+from poker_env import PokerGame, create_agent
+from remote_agent import parse_request, play_tables
+
+
+class BrokenAgent:
+    """답 대신 봇 쪽 오류를 내는 코루틴 에이전트."""
+
+    def __init__(self, error):
+        self.error = error
+
+    async def choose_discard_and_reveal(self, hidden_cards):
+        raise self.error
+
+    async def choose_action(self, state, valid_actions):
+        raise self.error
+
+
+def test_agent_errors_fall_back_to_default():
+    names = ["Player_1", "Player_2"]
+    tables = []
+    for seed, error in enumerate((json.JSONDecodeError("bad", "x", 0), ConnectionError("gone"))):
+        agents = {"Player_1": BrokenAgent(error), "Player_2": create_agent("random", "Player_2", verbose=False, seed=seed)}
+        tables.append((PokerGame(names, seed=seed), agents))
+    games = asyncio.run(play_tables(tables))
+    for game in games:
+        assert sum(p.chips for p in game.players) == 2000
+
+
+def test_parse_request_skips_bad_lines():
+    assert parse_request("not json\n") is None
+    assert parse_request("[1, 2]\n") is None
+    assert parse_request('{"id": 1}\n') is None
+    assert parse_request('{"id": 1, "type": "hello", "name": "Player_1"}\n')["type"] == "hello"
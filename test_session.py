@@ -0,0 +1,21 @@
+import pytest
+
+from poker_env import create_agent
+from session import Session, escalating_schedule
+
+
+def _agents():
+    return {name: create_agent("random", name, verbose=False, seed=i) for i, name in enumerate(["Player_1", "Player_2"])}
+
+
+@pytest.mark.parametrize("schedule", [[], [(10, 5)], [(1, 1), (20, 2)]])
+def test_schedule_must_start_at_hand_zero(schedule):
+    with pytest.raises(ValueError):
+        Session(_agents(), ante_schedule=schedule, seed=0)
+
+
+def test_escalating_schedule_levels():
+    session = Session(_agents(), ante_schedule=escalating_schedule(1, 10), seed=0)
+    assert [session.ante_for(h) for h in (0, 9, 10, 25)] == [1, 1, 2, 4]
+    session.run(30)
+    assert sum(p.chips for p in session.seats) == 2000
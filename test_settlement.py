@@ -0,0 +1,52 @@
+from settlement import build_pots, settle
+
+
+def test_single_winner_takes_pot():
+    result = settle([10, 10, 10], [False, False, False], [5, 9, 3])
+    assert result.payouts == (0, 30, 0)
+    assert len(result.pots) == 1 and result.pots[0].winners == (1,)
+
+
+def test_side_pots_for_short_all_in():
+    # 0번이 5칩 올인으로 가장 강하고, 1번과 2번은 20칩씩 넣음
+    invested = [5, 20, 20]
+    result = settle(invested, [False, False, False], [9, 7, 3])
+    main, side = result.pots
+    assert (main.amount, main.eligible, main.winners) == (15, (0, 1, 2), (0,))
+    assert (side.amount, side.eligible, side.winners) == (30, (1, 2), (1,))
+    assert result.payouts == (15, 30, 0)
+    assert sum(result.payouts) == sum(invested)
+
+
+def test_folded_chips_stay_in_pots():
+    # 폴드한 2번이 가장 많이 넣은 층은 자격자가 없으므로 아래 층에 합쳐짐
+    invested = [4, 10, 12]
+    assert build_pots(invested, [False, False, True]) == [(12, (0, 1)), (14, (1,))]
+    result = settle(invested, [False, False, True], [1, 2, 9])
+    assert result.scores[2] == -1
+    assert result.payouts == (0, 26, 0)
+
+
+def test_odd_chips_go_from_first_seat():
+    invested = [3, 3, 3]
+    folded = [False, False, False]
+    result = settle(invested, folded, [8, 8, 1], first_seat=1)
+    pot, = result.pots
+    assert pot.amount == 9 and pot.winners == (0, 1) and pot.share == 4
+    assert pot.odd_chips == (1,) # first_seat=1 부터 좌석 순서로
+    assert result.payouts == (4, 5, 0)
+
+    result = settle(invested, folded, [8, 8, 1], first_seat=2)
+    assert result.pots[0].odd_chips == (0,) # 2번은 승자가 아니므로 그다음 좌석인 0번
+
+
+def test_tie_in_side_pot_only():
+    # 메인 팟은 0번 단독 승, 사이드 팟은 1번과 2번이 나눠 가지며 홀수 칩 하나가 남음
+    invested = [2, 9, 9]
+    result = settle(invested, [False, False, False], [9, 5, 5], first_seat=2)
+    main, side = result.pots
+    assert main.winners == (0,) and main.amount == 6
+    assert side.winners == (1, 2) and side.amount == 14 and side.odd_chips == ()
+    result = settle([2, 10, 9], [False, False, False], [9, 5, 5], first_seat=2)
+    assert result.payouts == (6, 8, 7)
+    assert sum(result.payouts) == 21
@@ -0,0 +1,29 @@
+from storage import SQLiteStore
+
+
+def test_read_cache_is_bounded(tmp_path):
+    path = str(tmp_path / "memory.sqlite")
+    store = SQLiteStore(path)
+    for i in range(50):
+        store.put(bytes([i]), {"CALL": i})
+    store.commit()
+    store.close()
+
+    store = SQLiteStore(path, cache_size=8)
+    for i in range(50):
+        assert store.get(bytes([i])) == {"CALL": i}
+    assert len(store.cache) == 8
+    store.close()
+
+
+def test_pending_entries_survive_eviction(tmp_path):
+    store = SQLiteStore(str(tmp_path / "memory.sqlite"), cache_size=2)
+    store.record(b"a", "CALL", 3)
+    for i in range(10): # 읽기 캐시를 여러 번 밀어내도 아직 기록하지 않은 항목은 남아야 함
+        store.get(bytes([i]))
+    store.record(b"a", "CALL", 4)
+    assert store.get(b"a") == {"CALL": 7}
+    store.commit()
+    assert store.get(b"a") == {"CALL": 7}
+    assert not store.pinned
+    store.close()
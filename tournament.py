@@ -0,0 +1,131 @@
+import sys
+import json
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from poker_env import create_agent, derive_seed
+from session import Session, STARTING_CHIPS, ANTE
+from instrumentation import Instrumentation
+
+# --- 헤드리스 대량 대전 러너 ---
+# 여러 세션을 프로세스 풀에 나눠 화면 출력/파일 로그 없이(NullSink, 로거 기본 레벨) 돌리고, 에이전트별 성적을 합산합니다.
+# 한 세션 안에서는 칩이 다음 판으로 이어지고, 판마다 딜(첫 행동 순서)이 한 칸씩 돌아갑니다.
+
+
+def session_seed(root_seed, session_index):
+    """작업 배분 순서와 상관없이 세션마다 같은 시드가 나오도록 루트 시드에서 파생합니다."""
+    return (root_seed * 1_000_003 + session_index) & 0xFFFFFFFF
+
+
+def run_session(agent_types, hands, seed, starting_chips=STARTING_CHIPS, instruments=None):
+    """
+    한 세션(칩이 이어지는 연속된 판들)을 session.Session 으로 진행하고 에이전트별 누적 통계를 반환합니다.
+    칩이 앤티보다 적은 플레이어는 판에서 빠지고, 2명 미만이 남으면 세션이 끝납니다.
+    instruments(Instrumentation) 가 주어지면 모든 판의 계측을 모읍니다.
+    """
+    names = [f"Player_{i + 1}" for i in range(len(agent_types))]
+    agents = {name: create_agent(a_type, name, verbose=False, seed=derive_seed(seed, "agent", name))
+              for name, a_type in zip(names, agent_types)}
+    session = Session(agents, starting_chips, seed=seed, instruments=instruments)
+    session.run(hands)
+    return session.stats
+
+
+def _run_session_task(task):
+    """워커에서 세션 하나를 실행하고 (통계, 계측 또는 None) 을 반환합니다. hand_offset 은 세션 첫 판의 전체 판 번호입니다."""
+    agent_types, hands, seed, hand_offset, profile_every = task
+    instruments = Instrumentation(profile_every, hand_offset=hand_offset) if profile_every is not None else None
+    return run_session(agent_types, hands, seed, instruments=instruments), instruments
+
+
+def merge_stats(total, part):
+    for name, s in part.items():
+        t = total.setdefault(name, {"hands": 0, "wins": 0, "net": 0, "net_sq": 0})
+        for field in t:
+            t[field] += s[field]
+    return total
+
+
+def summarize(stats, agent_types):
+    """누적 통계 -> 에이전트별 승률, bb/100, 판당 손익 분산."""
+    summary = {}
+    for (name, s), a_type in zip(stats.items(), agent_types):
+        n = s["hands"]
+        mean = s["net"] / n if n else 0.0
+        variance = (s["net_sq"] - n * mean * mean) / (n - 1) if n > 1 else 0.0
+        summary[name] = {
+            "type": a_type,
+            "hands": n,
+            "win_rate": s["wins"] / n if n else 0.0,
+            "net": s["net"],
+            "bb_per_100": mean / ANTE * 100,
+            "variance": variance,
+            "stderr_bb_per_100": math.sqrt(variance / n) / ANTE * 100 if n else 0.0,
+        }
+    return summary
+
+
+def run_tournament(agent_types, hands, session_length=100, workers=1, seed=0, instruments=None):
+    """
+    총 hands 판을 session_length 판짜리 세션으로 나눠 workers 개 프로세스에서 실행하고 요약을 반환합니다.
+    같은 seed 면 workers 수와 관계없이 같은 결과가 나옵니다.
+    instruments(Instrumentation) 가 주어지면 워커마다 같은 설정으로 계측한 결과를 여기에 합칩니다.
+    """
+    profile_every = instruments.profile_every if instruments is not None else None
+    tasks = []
+    remaining = hands
+    while remaining > 0:
+        length = min(session_length, remaining)
+        tasks.append((list(agent_types), length, session_seed(seed, len(tasks)), hands - remaining, profile_every))
+        remaining -= length
+
+    total = {}
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if pool is None:
+            parts = map(_run_session_task, tasks)
+        else:
+            parts = pool.map(_run_session_task, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+        for part, part_instruments in parts:
+            merge_stats(total, part)
+            if instruments is not None:
+                instruments.merge(part_instruments)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return summarize(total, agent_types)
+
+
+# --- 실행 메인 블록 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="7 Poker headless tournament runner")
+    parser.add_argument('-a', '--agents', nargs='+', default=['random', 'random'], help='에이전트 타입 목록 (random, learning, cfr, mcts)')
+    parser.add_argument('-n', '--hands', type=int, default=1000, help='총 판 수')
+    parser.add_argument('--session-length', type=int, default=100, help='칩이 이어지는 세션당 판 수')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='워커 프로세스 수')
+    parser.add_argument('--seed', type=int, default=0, help='루트 시드')
+    parser.add_argument('--json', type=str, default=None, help='요약을 저장할 JSON 파일 경로')
+    parser.add_argument('--instrument', type=str, default=None, help='단계별 계측 보고서를 저장할 JSON 파일 경로')
+    parser.add_argument('--profile-every', type=int, default=0, help='계측 시 이 판 수마다 한 판을 cProfile 로 프로파일')
+    args = parser.parse_args()
+
+    if not 2 <= len(args.agents) <= 5 or any(a.lower() not in ('random', 'learning', 'cfr', 'mcts') for a in args.agents):
+        print("[오류] 2~5명의 random / learning / cfr / mcts 에이전트가 필요합니다.")
+        sys.exit(1)
+
+    instruments = Instrumentation(args.profile_every) if args.instrument else None
+    summary = run_tournament(args.agents, args.hands, args.session_length, args.workers, args.seed, instruments)
+
+    print(f"=== {args.hands}판 결과 요약 ===")
+    for name, s in summary.items():
+        print(f"{name} ({s['type']}): {s['hands']}판 | 승률 {s['win_rate']:.3f} | "
+              f"{s['bb_per_100']:+.2f} bb/100 (±{s['stderr_bb_per_100']:.2f}) | 분산 {s['variance']:.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=4)
+
+    if instruments is not None:
+        print(instruments.format_report())
+        instruments.dump(args.instrument)
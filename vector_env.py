@@ -0,0 +1,286 @@
+import numpy as np
+
+from events import ACTIONS, ACTION_INDEX
+from batch_evaluator import evaluate_batch
+from observation import MAX_SEATS, HIDDEN, PUBLIC, POT, CALL, SEATS, SEAT_FIELDS, OBS_SIZE
+
+# --- 벡터화 환경: K개 테이블을 한 번에 진행 ---
+# PokerGame 과 같은 규칙(앤티, 4장 딜 후 1장 버리고 1장 공개, 4구~7구 베팅, 사이드 팟)을 K개 독립 테이블에서 동시에 돌립니다.
+# 좌석별 칩/투자금/베팅/폴드/올인과 카드는 (K, N) 모양의 배열(struct-of-arrays)에 두고, 모든 전이를 테이블 축으로
+# 벡터화하므로 정책은 step() 마다 K개의 대기 중인 결정을 한 번의 배치 호출로 처리할 수 있습니다.
+#
+# gym 스타일 인터페이스:
+#   obs, info = env.reset()
+#   obs, rewards, dones, info = env.step(actions)   # actions: (K,) ACTIONS 인덱스
+# 한 판(에피소드)이 끝난 테이블은 보상(좌석별 칩 손익)을 내고 곧바로 새 판을 시작합니다 (자동 리셋).
+# obs 는 observation.py 와 같은 배치로, 각 테이블에서 지금 행동할 좌석 기준입니다 (info["seat"]).
+#
+# 버리기/공개 단계는 PokerAgent 기본값과 같이 항상 0번을 버리고 1번을 공개합니다. 그래서 카드 칸의 의미가 고정됩니다:
+#   칸 0, 1: 히든 (처음 받은 2, 3번째 카드) | 칸 2: 공개한 카드 | 칸 3~5: 4구~6구 공개 | 칸 6: 7구 히든
+
+FOLD, CALL_ACTION, QUARTER, HALF, BBING = (ACTION_INDEX[a] for a in ACTIONS)
+NUM_ACTIONS = len(ACTIONS)
+NUM_STREETS = 4
+CARD_SLOTS = 7
+HIDDEN_SLOTS = (0, 1, 6)
+PUBLIC_SLOTS = slice(2, 6)
+
+# 테이블 진행 단계
+BETTING, DEALING, FINISHED = range(3)
+
+
+class VectorPokerEnv:
+    def __init__(self, num_tables, num_players, starting_chips=1000, ante=1, seed=None):
+        if not 2 <= num_players <= MAX_SEATS:
+            raise ValueError(f"플레이어 수는 2~{MAX_SEATS} 명이어야 합니다: {num_players}")
+        self.num_tables = K = num_tables
+        self.num_players = N = num_players
+        self.starting_chips = starting_chips
+        self.ante = ante
+        self.rng = np.random.default_rng(seed)
+
+        # 좌석별 상태 (K, N)
+        self.chips = np.zeros((K, N), dtype=np.int64)
+        self.invested = np.zeros((K, N), dtype=np.int64)
+        self.current_bet = np.zeros((K, N), dtype=np.int64)
+        self.folded = np.zeros((K, N), dtype=bool)
+        self.all_in = np.zeros((K, N), dtype=bool)
+        self.acting = np.zeros((K, N), dtype=bool) # 이번 베팅 라운드 시작 때 행동 가능했던 좌석
+        self.cards = np.full((K, N, CARD_SLOTS), -1, dtype=np.int64)
+
+        # 테이블별 상태 (K,)
+        self.deck = np.zeros((K, 52), dtype=np.int64)
+        self.deck_pos = np.zeros(K, dtype=np.int64)
+        self.pot = np.zeros(K, dtype=np.int64)
+        self.highest_bet = np.zeros(K, dtype=np.int64)
+        self.players_to_act = np.zeros(K, dtype=np.int64)
+        self.current_seat = np.zeros(K, dtype=np.int64)
+        self.street = np.zeros(K, dtype=np.int64)
+        self.phase = np.zeros(K, dtype=np.int64)
+
+        self._tables = np.arange(K)
+        self._seat_ids = np.arange(N)
+        self.obs = np.zeros((K, OBS_SIZE), dtype=np.float32)
+        self.rewards = np.zeros((K, N), dtype=np.int64)
+
+    # --- gym 인터페이스 ---
+    def reset(self):
+        """모든 테이블에서 새 판을 시작하고 첫 결정의 (obs, info) 를 반환합니다."""
+        self._start_hands(np.ones(self.num_tables, dtype=bool))
+        self.rewards.fill(0)
+        self._advance()
+        return self._observe(), self._info()
+
+    def step(self, actions):
+        """
+        각 테이블의 현재 좌석에 actions[k] (ACTIONS 인덱스)를 적용하고 다음 결정까지 진행합니다.
+        반환: obs (K, OBS_SIZE), rewards (K, N) 이번에 끝난 판의 좌석별 손익, dones (K,), info.
+        obs 배열은 다음 step 에서 덮어써지므로 보관하려면 복사하세요.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        self.rewards.fill(0)
+        self._apply_actions(actions)
+        dones = self._advance()
+        return self._observe(), self.rewards.copy(), dones, self._info()
+
+    def valid_action_mask(self):
+        """(K, 5) 현재 좌석의 가능한 액션 마스크 (PokerGame.get_valid_actions 와 같은 조건)."""
+        t, s = self._tables, self.current_seat
+        chips = self.chips[t, s]
+        call = self.highest_bet - self.current_bet[t, s]
+        mask = np.zeros((self.num_tables, NUM_ACTIONS), dtype=bool)
+        mask[:, FOLD] = True
+        mask[:, CALL_ACTION] = True
+        mask[:, QUARTER] = chips >= call + self.pot * 0.25
+        mask[:, HALF] = chips >= call + self.pot * 0.5
+        mask[:, BBING] = chips >= call + self.ante
+        return mask
+
+    def _info(self):
+        return {"seat": self.current_seat.copy(), "action_mask": self.valid_action_mask()}
+
+    # --- 판 시작 ---
+    def _start_hands(self, mask):
+        """mask 테이블에서 칩을 되돌리고, 덱을 섞고, 앤티를 걷고, 4장씩 돌린 뒤 버리기/공개까지 처리합니다."""
+        m = int(mask.sum())
+        if m == 0:
+            return
+        N = self.num_players
+        self.chips[mask] = self.starting_chips - self.ante
+        self.invested[mask] = self.ante
+        self.current_bet[mask] = 0
+        self.folded[mask] = False
+        self.all_in[mask] = False
+        self.acting[mask] = False
+        self.pot[mask] = self.ante * N
+        self.highest_bet[mask] = 0
+        self.street[mask] = -1
+        self.phase[mask] = DEALING
+
+        deck = self.rng.random((m, 52)).argsort(axis=1)
+        self.deck[mask] = deck
+        self.deck_pos[mask] = 4 * N
+        # PokerGame 처럼 한 장씩 돌아가며 4장: 좌석 n 의 j번째 카드는 덱 위치 j*N + n
+        dealt = deck[:, :4 * N].reshape(m, 4, N).transpose(0, 2, 1) # (m, N, 4)
+        cards = np.full((m, N, CARD_SLOTS), -1, dtype=np.int64)
+        cards[:, :, 0] = dealt[:, :, 2]
+        cards[:, :, 1] = dealt[:, :, 3]
+        cards[:, :, 2] = dealt[:, :, 1] # 0번은 버림
+        self.cards[mask] = cards
+
+    # --- 액션 적용 (PokerGame.apply_action 과 같은 계산) ---
+    def _apply_actions(self, actions):
+        t, s = self._tables, self.current_seat
+        fold = actions == FOLD
+        call = self.highest_bet - self.current_bet[t, s]
+        base = self.pot + call
+        raise_amount = np.select([actions == HALF, actions == QUARTER, actions == BBING],
+                                 [base // 2, base // 4, np.full_like(base, self.ante)], 0)
+        total = call + raise_amount
+        chips = self.chips[t, s]
+        all_in = ~fold & (chips <= total)
+        total = np.where(fold, 0, np.where(all_in, chips, total))
+
+        self.folded[t[fold], s[fold]] = True
+        self.all_in[t[all_in], s[all_in]] = True
+        self.chips[t, s] -= total
+        self.invested[t, s] += total
+        self.current_bet[t, s] += total
+        self.pot += total
+
+        is_raise = self.current_bet[t, s] > self.highest_bet
+        self.highest_bet = np.maximum(self.highest_bet, self.current_bet[t, s])
+        can_act = (self.acting & ~self.folded & ~self.all_in).sum(axis=1)
+        self.players_to_act = np.where(is_raise, can_act - 1, self.players_to_act - 1)
+        self.current_seat = (s + 1) % self.num_players
+
+    # --- 다음 결정까지 진행 ---
+    def _advance(self):
+        """
+        모든 테이블이 '행동할 좌석이 정해진 베팅 중' 상태가 될 때까지 라운드 종료, 딜, 결산, 새 판 시작을 반복합니다.
+        이번 호출에서 판이 끝난 테이블의 마스크를 반환합니다.
+        """
+        t = self._tables
+        dones = np.zeros(self.num_tables, dtype=bool)
+        while True:
+            alive = ~self.folded
+            survivors = alive.sum(axis=1)
+            can_act = self.acting & alive & ~self.all_in
+
+            betting = self.phase == BETTING
+            round_over = betting & ((survivors <= 1) | (self.players_to_act <= 0) | ~can_act.any(axis=1))
+            self.phase[round_over] = DEALING
+            betting &= ~round_over
+
+            # 이번 라운드 행동 목록에 없거나 이미 폴드/올인한 좌석은 건너뜀
+            waiting = can_act[t, self.current_seat]
+            skip = betting & ~waiting
+            self.current_seat[skip] = (self.current_seat[skip] + 1) % self.num_players
+
+            dealing = self.phase == DEALING
+            if dealing.any():
+                self._next_street(dealing, survivors)
+
+            finished = self.phase == FINISHED
+            if finished.any():
+                self._settle(finished)
+                dones |= finished
+                self._start_hands(finished)
+                continue
+
+            if (betting & waiting).all():
+                return dones
+
+    def _next_street(self, mask, survivors):
+        self.street[mask] += 1
+        over = mask & ((self.street >= NUM_STREETS) | (survivors <= 1))
+        self.phase[over] = FINISHED
+        deal = mask & ~over
+        if not deal.any():
+            return
+
+        # 살아있는 좌석에 좌석 순서대로 한 장씩
+        tables = np.flatnonzero(deal)
+        alive = ~self.folded[tables]
+        positions = self.deck_pos[tables][:, None] + np.cumsum(alive, axis=1) - 1
+        drawn = np.take_along_axis(self.deck[tables], np.minimum(positions, 51), axis=1)
+        rows, seats = np.nonzero(alive)
+        self.cards[tables[rows], seats, 3 + self.street[tables[rows]]] = drawn[rows, seats]
+        self.deck_pos[tables] += alive.sum(axis=1)
+
+        # 베팅 가능한 사람이 2명 이상이면 라운드 시작 (아니면 DEALING 그대로 다음 스트리트로)
+        bettors = alive & ~self.all_in[tables]
+        start = np.zeros(self.num_tables, dtype=bool)
+        start[tables[bettors.sum(axis=1) >= 2]] = True
+        self.current_bet[start] = 0
+        self.highest_bet[start] = 0
+        self.acting[start] = ~self.folded[start] & ~self.all_in[start]
+        self.players_to_act[start] = self.acting[start].sum(axis=1)
+        self.current_seat[start] = 0
+        self.phase[start] = BETTING
+
+    # --- 결산 (PokerGame.resolve_showdown 과 같은 사이드 팟 분배) ---
+    def _settle(self, mask):
+        invested = self.invested[mask]
+        folded = self.folded[mask]
+        m, N = invested.shape
+
+        # 쇼다운까지 간 테이블(생존자 2명 이상)은 7장이 모두 있으므로 한 번에 배치 평가
+        scores = np.full((m, N), -1, dtype=np.int64)
+        showdown = (~folded).sum(axis=1) >= 2
+        live = ~folded & showdown[:, None]
+        if live.any():
+            scores[live] = evaluate_batch(self.cards[mask][live])
+        scores[~folded & ~showdown[:, None]] = 0
+
+        # 층별 크기와 자격 (settlement.build_pots 와 같은 층)
+        levels = np.sort(invested, axis=1)
+        previous = np.concatenate([np.zeros((m, 1), dtype=np.int64), levels[:, :-1]], axis=1)
+        amounts = (np.minimum(invested[:, None, :], levels[:, :, None])
+                   - np.minimum(invested[:, None, :], previous[:, :, None])).sum(axis=2) # (m, N)
+        eligible = ~folded[:, None, :] & (invested[:, None, :] >= levels[:, :, None]) & (levels > previous)[:, :, None]
+        contested = eligible.any(axis=2)
+        # 자격자 없는 층은 아래(없으면 위)의 자격 층에 합칩니다
+        for j in range(N - 1, 0, -1):
+            dead = ~contested[:, j]
+            amounts[dead, j - 1] += amounts[dead, j]
+            amounts[dead, j] = 0
+        for j in range(N - 1):
+            dead = ~contested[:, j]
+            amounts[dead, j + 1] += amounts[dead, j]
+            amounts[dead, j] = 0
+
+        chips = self.chips[mask]
+        for j in range(N):
+            best = np.where(eligible[:, j], scores, -2).max(axis=1)
+            winners = eligible[:, j] & (scores == best[:, None])
+            share, odd = np.divmod(amounts[:, j], np.maximum(winners.sum(axis=1), 1))
+            # 나머지 칩은 좌석 순서로 앞의 승자부터 1개씩
+            odd_chips = winners & (np.cumsum(winners, axis=1) <= odd[:, None])
+            chips += winners * share[:, None] + odd_chips
+        self.chips[mask] = chips
+        self.rewards[mask] += chips - self.starting_chips
+
+    # --- 관측 ---
+    def _observe(self):
+        """각 테이블의 현재 좌석 기준 관측을 self.obs 에 채웁니다 (observation.py 배치)."""
+        obs = self.obs
+        obs.fill(0)
+        t, s, N = self._tables, self.current_seat, self.num_players
+        rows = t[:, None]
+
+        hidden = self.cards[t, s][:, HIDDEN_SLOTS] # (K, 3), 아직 받지 않은 칸은 -1
+        k, j = np.nonzero(hidden >= 0)
+        obs[k, HIDDEN + hidden[k, j]] = 1
+
+        seats = (s[:, None] + self._seat_ids[None, :]) % N # (K, N) 상대 위치 r 의 실제 좌석
+        public = self.cards[rows, seats][:, :, PUBLIC_SLOTS] # (K, N, 4)
+        k, r, j = np.nonzero(public >= 0)
+        obs[k, PUBLIC + r * 52 + public[k, r, j]] = 1
+
+        obs[:, POT] = self.pot
+        obs[:, CALL] = self.highest_bet - self.current_bet[t, s]
+        base = SEATS + self._seat_ids * len(SEAT_FIELDS)
+        for offset, values in enumerate((self.chips, self.invested, self.current_bet, self.folded, self.all_in)):
+            obs[rows, base[None, :] + offset] = values[rows, seats]
+        return obs